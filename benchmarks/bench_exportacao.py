@@ -0,0 +1,138 @@
+"""
+Mede a exportação de clientes PF (a mesma usada por
+'GET /clientes/pessoas-fisicas/exportar') em NDJSON e CSV: linhas/s, MB/s
+e o pico de memória alocada durante a exportação, para bases de tamanhos
+crescentes. Com o cursor do lado do servidor, o pico deve ficar no tamanho
+de um lote (EXPORTACAO_LOTE), e não crescer com a base.
+
+Exige DATABASE_URL apontando para um Postgres de teste: as tabelas são
+criadas e clientes 'bench_export_*' são cadastrados até cada tamanho pedido.
+
+Uso:
+    python -m benchmarks.bench_exportacao [--tamanhos 10000,100000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from sqlalchemy import func, insert
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from src import models  # noqa: E402
+from src.database import Base, SessionLocal, engine, engine_async  # noqa: E402
+from src.services import exportacao_service  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+LOTE_CADASTRO = 5000
+
+
+def cadastrar_clientes_ate(total: int) -> int:
+    """Cadastra clientes PF até a base ter 'total'; retorna quantos há."""
+    with SessionLocal() as sessao_banco:
+        existentes = sessao_banco.query(func.count(models.PessoaFisica.id_pessoa)).scalar()
+        while existentes < total:
+            quantidade = min(LOTE_CADASTRO, total - existentes)
+            ids = sessao_banco.scalars(
+                insert(models.Pessoa.__table__).returning(
+                    models.Pessoa.__table__.c.id_pessoa
+                ),
+                [
+                    {
+                        "email": f"bench_export_{existentes + i}@frotanext.com",
+                        "telefone": "11999990000",
+                        "senha": "hash",
+                        "e_ativo": True,
+                        "token_version": 0,
+                        "tipo_pessoa": "pessoa_fisica",
+                    }
+                    for i in range(quantidade)
+                ],
+            ).all()
+            sessao_banco.execute(
+                insert(models.PessoaFisica.__table__),
+                [
+                    {
+                        "id_pessoa": id_pessoa,
+                        "nome_completo": f"Cliente Exportação {id_pessoa}",
+                        "cpf": f"bx{id_pessoa:09d}",
+                        "cnh": f"bx{id_pessoa:09d}",
+                    }
+                    for id_pessoa in ids
+                ],
+            )
+            sessao_banco.execute(
+                insert(models.Endereco.__table__),
+                [
+                    {
+                        "pessoa_id": id_pessoa,
+                        "rua": "Rua Benchmark",
+                        "numero": str(id_pessoa),
+                        "bairro": "Centro",
+                        "cidade": "São Paulo",
+                        "estado": "SP",
+                        "cep": "01000000",
+                    }
+                    for id_pessoa in ids
+                ],
+            )
+            sessao_banco.commit()
+            existentes += quantidade
+        return existentes
+
+
+async def _consumir(formato: str):
+    linhas = 0
+    tamanho = 0
+    async for pedaco in exportacao_service.exportar_pessoas_fisicas(formato):
+        linhas += pedaco.count("\n")
+        tamanho += len(pedaco.encode())
+    return linhas, tamanho
+
+
+async def _medir(formato: str, medir_memoria: bool):
+    if medir_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    linhas, tamanho = await _consumir(formato)
+    duracao = time.perf_counter() - inicio
+    pico = 0
+    if medir_memoria:
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return linhas, tamanho, duracao, pico
+
+
+async def _rodar(tamanhos):
+    print(
+        f"{'clientes':>10} {'formato':>8} {'linhas/s':>10} {'MB/s':>8}"
+        f" {'pico (MB)':>10}"
+    )
+    for tamanho in tamanhos:
+        total = cadastrar_clientes_ate(tamanho)
+        for formato in ("ndjson", "csv"):
+            linhas, bytes_saida, duracao, _ = await _medir(formato, False)
+            _, _, _, pico = await _medir(formato, True)
+            print(
+                f"{total:>10} {formato:>8} {linhas / duracao:>10.0f}"
+                f" {bytes_saida / duracao / 1e6:>8.1f} {pico / 1e6:>10.1f}"
+            )
+    await engine_async.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", default="10000,100000")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(_rodar([int(valor) for valor in args.tamanhos.split(",")]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Compara, para listas de 10, 1k e 100k ids, três formas de buscar as linhas
+de uma lista de ids: IN com um parâmetro por id, IN em lotes de --lote ids e
+'= ANY(:lista)' (o caminho de 'coluna_em_lista' acima de
+FILTRO_IDS_LIMITE_IN). Mede o tempo por busca e o tamanho do SQL enviado, no
+psycopg2 e no asyncpg (que recusa consultas com mais de 32767 parâmetros).
+
+Exige DATABASE_URL apontando para um Postgres de teste: as tabelas são
+criadas e clientes 'bench_export_*' são cadastrados até o maior tamanho.
+
+Uso:
+    python -m benchmarks.bench_filtro_ids [--tamanhos 10,1000,100000] [--lote 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from sqlalchemy import ARRAY, Integer, any_, event, literal, select
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from benchmarks.bench_exportacao import cadastrar_clientes_ate  # noqa: E402
+from src import models  # noqa: E402
+from src.database import (  # noqa: E402
+    Base,
+    SessionAsyncLocal,
+    SessionLocal,
+    engine,
+    engine_async,
+)
+
+# pylint: enable=wrong-import-position
+
+REPETICOES = 5
+
+_COLUNA = models.Pessoa.id_pessoa
+
+
+def _consultas_in(ids, _lote):
+    return [select(_COLUNA).where(_COLUNA.in_(ids))]
+
+
+def _consultas_in_em_lotes(ids, lote):
+    return [
+        select(_COLUNA).where(_COLUNA.in_(ids[inicio : inicio + lote]))
+        for inicio in range(0, len(ids), lote)
+    ]
+
+
+def _consultas_any(ids, _lote):
+    return [select(_COLUNA).where(_COLUNA == any_(literal(ids, ARRAY(Integer))))]
+
+
+ESTRATEGIAS = {
+    "IN": _consultas_in,
+    "IN em lotes": _consultas_in_em_lotes,
+    "ANY": _consultas_any,
+}
+
+
+class _TamanhoSql:
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    def __call__(self, _conexao, _cursor, sql, *_args):
+        self.bytes += len(sql)
+
+
+def _medir_psycopg2(consultas) -> float:
+    with SessionLocal() as sessao_banco:
+        inicio = time.perf_counter()
+        for _ in range(REPETICOES):
+            for consulta in consultas:
+                sessao_banco.execute(consulta).all()
+        return (time.perf_counter() - inicio) / REPETICOES
+
+
+async def _medir_asyncpg(consultas) -> float:
+    async with SessionAsyncLocal() as sessao_banco:
+        inicio = time.perf_counter()
+        for _ in range(REPETICOES):
+            for consulta in consultas:
+                (await sessao_banco.execute(consulta)).all()
+        return (time.perf_counter() - inicio) / REPETICOES
+
+
+async def _medir(driver: str, consultas):
+    engine_medido = engine if driver == "psycopg2" else engine_async.sync_engine
+    tamanho_sql = _TamanhoSql()
+    event.listen(engine_medido, "before_cursor_execute", tamanho_sql)
+    try:
+        if driver == "psycopg2":
+            duracao = _medir_psycopg2(consultas)
+        else:
+            duracao = await _medir_asyncpg(consultas)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return None, 0
+    finally:
+        event.remove(engine_medido, "before_cursor_execute", tamanho_sql)
+    return duracao, tamanho_sql.bytes // REPETICOES
+
+
+async def _rodar(tamanhos, lote: int, todos_ids) -> None:
+    print(
+        f"{'ids':>7} {'estratégia':>12} {'driver':>9} {'ms/busca':>9}"
+        f" {'SQL (bytes)':>12}"
+    )
+    for tamanho in tamanhos:
+        ids = random.sample(todos_ids, tamanho)
+        for nome, montar in ESTRATEGIAS.items():
+            consultas = montar(ids, lote)
+            for driver in ("psycopg2", "asyncpg"):
+                duracao, tamanho_sql = await _medir(driver, consultas)
+                tempo = "erro" if duracao is None else f"{duracao * 1e3:.2f}"
+                print(
+                    f"{tamanho:>7} {nome:>12} {driver:>9} {tempo:>9}"
+                    f" {tamanho_sql:>12}"
+                )
+    await engine_async.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", default="10,1000,100000")
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+    tamanhos = [int(valor) for valor in args.tamanhos.split(",")]
+
+    Base.metadata.create_all(bind=engine)
+    cadastrar_clientes_ate(max(tamanhos))
+    with SessionLocal() as sessao_banco:
+        todos_ids = sessao_banco.scalars(select(models.PessoaFisica.id_pessoa)).all()
+
+    asyncio.run(_rodar(tamanhos, args.lote, todos_ids))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Mede logins/segundo (verificações argon2) do pool de hashing variando o
+número de workers, de 1 até o número de núcleos da máquina.
+
+Uso:
+    python -m benchmarks.bench_hash_pool [--logins 200]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from src.seguranca import (  # noqa: E402 pylint: disable=wrong-import-position
+    ExecutorHash,
+    obter_hash_senha,
+    verificar_senha,
+)
+
+
+async def _medir(executor: ExecutorHash, hash_senha: str, logins: int) -> float:
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(
+            executor.executar(verificar_senha, "senhaBenchmark123", hash_senha)
+            for _ in range(logins)
+        )
+    )
+    return logins / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    hash_senha = obter_hash_senha("senhaBenchmark123")
+    nucleos = os.cpu_count() or 1
+
+    workers = 1
+    print(f"{'workers':>8} {'logins/s':>10}")
+    while True:
+        executor = ExecutorHash()
+        executor.iniciar(num_workers=workers)
+        try:
+            asyncio.run(_medir(executor, hash_senha, workers))
+            taxa = asyncio.run(_medir(executor, hash_senha, args.logins))
+        finally:
+            executor.encerrar()
+        print(f"{workers:>8} {taxa:>10.1f}")
+
+        if workers >= nucleos:
+            break
+        workers = min(workers * 2, nucleos)
+
+
+if __name__ == "__main__":
+    main()
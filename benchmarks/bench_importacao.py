@@ -0,0 +1,153 @@
+"""
+Mede a importação em lote de clientes PF (a mesma de
+'POST /clientes/pessoas-fisicas/importar') em clientes/s, em JSON e em CSV,
+contra o cadastro um a um ('criar_pessoa_fisica' com o hash no pool, como em
+'POST /clientes/pessoas-fisicas/'), medido numa amostra de --amostra clientes.
+
+Exige DATABASE_URL apontando para um Postgres de teste: as tabelas são
+criadas e clientes 'bench_import_*' são cadastrados a cada execução.
+
+Uso:
+    python -m benchmarks.bench_importacao [--clientes 10000] [--amostra 300]
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from src import seguranca  # noqa: E402
+from src.database import (  # noqa: E402
+    Base,
+    SessionAsyncLocal,
+    engine,
+    engine_async,
+    executar_servico,
+)
+from src.schemas import cliente_schema  # noqa: E402
+from src.services import cliente_service, importacao_service  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+_COLUNAS_CSV = [
+    "email",
+    "telefone",
+    "nome_completo",
+    "cpf",
+    "cnh",
+    "senha_texto_puro",
+    "endereco_rua",
+    "endereco_numero",
+    "endereco_bairro",
+    "endereco_cidade",
+    "endereco_estado",
+    "endereco_cep",
+]
+
+
+def _clientes(prefixo: str, quantidade: int) -> list:
+    return [
+        {
+            "email": f"bench_import_{prefixo}_{indice}@frotanext.com",
+            "telefone": "11999990000",
+            "nome_completo": f"Motorista Importado {indice}",
+            "cpf": f"bi{prefixo}{indice:07d}",
+            "cnh": f"bi{prefixo}{indice:07d}",
+            "senha_texto_puro": f"senhaImportacao{indice}",
+            "endereco": {
+                "rua": "Rua Benchmark",
+                "numero": str(indice),
+                "bairro": "Centro",
+                "cidade": "São Paulo",
+                "estado": "SP",
+                "cep": "01000000",
+            },
+        }
+        for indice in range(quantidade)
+    ]
+
+
+def _csv(clientes: list) -> bytes:
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(_COLUNAS_CSV)
+    for cliente in clientes:
+        endereco = cliente["endereco"]
+        escritor.writerow(
+            [cliente[coluna] for coluna in _COLUNAS_CSV[:6]]
+            + [endereco[coluna[len("endereco_") :]] for coluna in _COLUNAS_CSV[6:]]
+        )
+    return saida.getvalue().encode()
+
+
+async def _importar(corpo: bytes, tipo_conteudo: str) -> float:
+    async with SessionAsyncLocal() as sessao_banco:
+        inicio = time.perf_counter()
+        resultado = await importacao_service.importar_pessoas_fisicas(
+            sessao_banco, corpo, tipo_conteudo
+        )
+        duracao = time.perf_counter() - inicio
+    assert not resultado["erros"], resultado["erros"][:3]
+    return resultado["importados"] / duracao
+
+
+async def _cadastrar_um_a_um(clientes: list) -> float:
+    async def _cadastrar(dados: dict):
+        cliente = cliente_schema.SchemaPessoaFisicaCriar(**dados)
+        hash_senha = await seguranca.obter_hash_senha_async(cliente.senha_texto_puro)
+        async with SessionAsyncLocal() as sessao_banco:
+            await executar_servico(
+                sessao_banco,
+                cliente_service.criar_pessoa_fisica,
+                dados_entrada_cliente=cliente,
+                hash_senha=hash_senha,
+            )
+
+    inicio = time.perf_counter()
+    for dados in clientes:
+        await _cadastrar(dados)
+    return len(clientes) / (time.perf_counter() - inicio)
+
+
+async def _rodar(quantidade: int, amostra: int) -> None:
+    rodada = str(int(time.time()) % 100000)
+    seguranca.executor_hash.iniciar()
+    try:
+        taxas = {
+            "um a um": await _cadastrar_um_a_um(_clientes(f"{rodada}u", amostra)),
+            "lote JSON": await _importar(
+                json.dumps(_clientes(f"{rodada}j", quantidade)).encode(),
+                "application/json",
+            ),
+            "lote CSV": await _importar(
+                _csv(_clientes(f"{rodada}c", quantidade)), "text/csv"
+            ),
+        }
+    finally:
+        seguranca.executor_hash.encerrar()
+        await engine_async.dispose()
+
+    print(f"{quantidade} clientes por lote, {amostra} no cadastro um a um")
+    print(f"{'caminho':>10} {'clientes/s':>11} {'10k em (s)':>11}")
+    for nome, taxa in taxas.items():
+        print(f"{nome:>10} {taxa:>11.0f} {10_000 / taxa:>11.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=10_000)
+    parser.add_argument("--amostra", type=int, default=300)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(_rodar(args.clientes, args.amostra))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compara o tempo de banco por login do caminho antigo (entidade Pessoa
+polimórfica carregada pelo ORM) com a consulta de credenciais
+('buscar_credenciais_cliente'), que lê só as colunas do índice
+'ix_pessoas_email' (index-only scan). Mostra também o plano da consulta nova.
+
+Exige DATABASE_URL apontando para um Postgres de teste: as tabelas são
+criadas e clientes 'bench_export_*' são cadastrados até --clientes.
+
+Uso:
+    python -m benchmarks.bench_login_consulta [--clientes 100000] [--logins 5000]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from sqlalchemy import text
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from benchmarks.bench_exportacao import cadastrar_clientes_ate  # noqa: E402
+from src import models  # noqa: E402
+from src.database import Base, SessionLocal, engine  # noqa: E402
+from src.services.cliente_auth_service import buscar_credenciais_cliente  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+
+def _buscar_entidade(sessao_banco, email: str):
+    cliente = (
+        sessao_banco.query(models.Pessoa).filter(models.Pessoa.email == email).first()
+    )
+    return (
+        cliente.id_pessoa,
+        cliente.senha,
+        cliente.e_ativo,
+        cliente.tipo_pessoa,
+        cliente.token_version,
+    )
+
+
+def _buscar_credenciais(sessao_banco, email: str):
+    return buscar_credenciais_cliente(sessao_banco, email)
+
+
+def _medir(funcao, emails) -> float:
+    with SessionLocal() as sessao_banco:
+        inicio = time.perf_counter()
+        for email in emails:
+            funcao(sessao_banco, email)
+            sessao_banco.expunge_all()
+        return (time.perf_counter() - inicio) / len(emails)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--logins", type=int, default=5000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    total = cadastrar_clientes_ate(args.clientes)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+        conexao.execute(text("VACUUM ANALYZE pessoas"))
+
+    emails = [
+        f"bench_export_{random.randrange(total)}@frotanext.com"
+        for _ in range(args.logins)
+    ]
+
+    with SessionLocal() as sessao_banco:
+        plano = sessao_banco.execute(
+            text(
+                "EXPLAIN SELECT id_pessoa, email, senha, e_ativo, tipo_pessoa,"
+                " token_version FROM pessoas WHERE lower(email) = lower(:email)"
+            ),
+            {"email": emails[0]},
+        ).scalars()
+        print("\n".join(plano))
+
+    print(f"\n{total} clientes, {args.logins} logins")
+    print(f"{'caminho':>12} {'µs/login':>10}")
+    for nome, funcao in (
+        ("entidade", _buscar_entidade),
+        ("credenciais", _buscar_credenciais),
+    ):
+        _medir(funcao, emails[:200])
+        print(f"{nome:>12} {_medir(funcao, emails) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
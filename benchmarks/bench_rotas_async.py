@@ -0,0 +1,218 @@
+"""
+Compara o caminho de acesso ao banco síncrono (handler 'def' + psycopg2 no
+threadpool) com o assíncrono (handler 'async def' + AsyncSession/asyncpg)
+sob muitas conexões simultâneas. Mede requisições/s e latência p50/p99.
+
+As duas rotas usam o mesmo serviço ('buscar_pessoa_fisica_por_id') e o mesmo
+schema de saída; só muda o caminho até o banco. O servidor (uvicorn) roda
+num subprocesso, para não disputar o event loop com o cliente de carga.
+
+Exige DATABASE_URL apontando para um Postgres de teste (as tabelas são
+criadas e um cliente é cadastrado se ainda não existir). Os dois modos usam
+as mesmas variáveis DB_POOL_*. Respostas diferentes de 200 (no modo síncrono,
+tipicamente o "QueuePool limit ... timed out" quando há mais requisições em
+voo que conexões) e conexões perdidas são contadas na coluna 'erros'.
+
+Uso:
+    python -m benchmarks.bench_rotas_async [--conexoes 500] [--requisicoes 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Tuple
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from src import models  # noqa: E402
+from src.database import (  # noqa: E402
+    Base,
+    SessionLocal,
+    engine,
+    engine_async,
+    executar_servico,
+)
+from src.dependencies import obter_sessao_banco  # noqa: E402
+from src.schemas import cliente_schema  # noqa: E402
+from src.services import cliente_service  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+EMAIL_BENCHMARK = "benchmark_async@frotanext.com"
+
+
+def _obter_sessao_sincrona():
+    sessao_banco = SessionLocal()
+    try:
+        yield sessao_banco
+    finally:
+        sessao_banco.close()
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    yield
+    await engine_async.dispose()
+
+
+app = FastAPI(lifespan=_lifespan)
+
+
+@app.get("/sync/{id_pessoa}", response_model=cliente_schema.SchemaPessoaFisica)
+def rota_sincrona(
+    id_pessoa: int,
+    sessao_banco: Annotated[Session, Depends(_obter_sessao_sincrona)],
+):
+    return cliente_service.buscar_pessoa_fisica_por_id(
+        id_pessoa=id_pessoa, sessao_banco=sessao_banco
+    )
+
+
+@app.get("/async/{id_pessoa}", response_model=cliente_schema.SchemaPessoaFisica)
+async def rota_assincrona(
+    id_pessoa: int,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+):
+    return await executar_servico(
+        sessao_banco,
+        cliente_service.buscar_pessoa_fisica_por_id,
+        id_pessoa=id_pessoa,
+        esquema=cliente_schema.SchemaPessoaFisica,
+    )
+
+
+def _preparar_cliente() -> int:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as sessao_banco:
+        cliente = (
+            sessao_banco.query(models.PessoaFisica)
+            .filter(models.PessoaFisica.email == EMAIL_BENCHMARK)
+            .first()
+        )
+        if cliente is None:
+            cliente = cliente_service.criar_pessoa_fisica(
+                cliente_schema.SchemaPessoaFisicaCriar(
+                    email=EMAIL_BENCHMARK,
+                    telefone="11999990000",
+                    nome_completo="Cliente Benchmark",
+                    cpf="99999999901",
+                    cnh="99999999901",
+                    senha_texto_puro="senhaBenchmark123",
+                    endereco={
+                        "rua": "Rua Benchmark",
+                        "numero": "1",
+                        "bairro": "Centro",
+                        "cidade": "Cidade",
+                        "estado": "SP",
+                        "cep": "01000000",
+                    },
+                ),
+                sessao_banco=sessao_banco,
+            )
+        return cliente.id_pessoa
+
+
+async def _disparar(
+    url: str, conexoes: int, requisicoes: int
+) -> Tuple[List[float], int]:
+    latencias: List[float] = []
+    erros = 0
+    restantes = iter(range(requisicoes))
+    limites = httpx.Limits(max_connections=conexoes, max_keepalive_connections=conexoes)
+
+    async with httpx.AsyncClient(limits=limites, timeout=60) as cliente:
+
+        async def _trabalhador():
+            nonlocal erros
+            for _ in restantes:
+                inicio = time.perf_counter()
+                try:
+                    resposta = await cliente.get(url)
+                except httpx.TransportError:
+                    erros += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+                if resposta.status_code != 200:
+                    erros += 1
+
+        await asyncio.gather(*(_trabalhador() for _ in range(conexoes)))
+    return latencias, erros
+
+
+def _percentil(valores: List[float], fracao: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def _aguardar_servidor(base_url: str) -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/docs", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError("O servidor de benchmark não subiu.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conexoes", type=int, default=500)
+    parser.add_argument("--requisicoes", type=int, default=20_000)
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    id_pessoa = _preparar_cliente()
+    base_url = f"http://127.0.0.1:{args.porta}"
+    servidor = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.bench_rotas_async:app",
+            "--port",
+            str(args.porta),
+            "--log-level",
+            "critical",
+            "--timeout-keep-alive",
+            "120",
+            "--backlog",
+            str(max(2048, args.conexoes * 2)),
+        ]
+    )
+    try:
+        _aguardar_servidor(base_url)
+        print(f"{args.conexoes} conexões, {args.requisicoes} requisições por modo")
+        print(
+            f"{'modo':>6} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}"
+        )
+        for modo in ("sync", "async"):
+            url = f"{base_url}/{modo}/{id_pessoa}"
+            asyncio.run(_disparar(url, args.conexoes, min(1000, args.requisicoes)))
+            inicio = time.perf_counter()
+            latencias, erros = asyncio.run(
+                _disparar(url, args.conexoes, args.requisicoes)
+            )
+            duracao = time.perf_counter() - inicio
+            print(
+                f"{modo:>6} {len(latencias) / duracao:>10.0f}"
+                f" {_percentil(latencias, 0.50) * 1000:>10.1f}"
+                f" {_percentil(latencias, 0.99) * 1000:>10.1f}"
+                f" {erros:>7}"
+            )
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
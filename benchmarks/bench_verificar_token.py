@@ -0,0 +1,44 @@
+"""
+Compara a vazão de 'verificar_token' com cache e a decodificação completa
+do JWT (HMAC + JSON + validação de claims) a cada chamada.
+
+Uso:
+    python -m benchmarks.bench_verificar_token [--chamadas 50000]
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from src import seguranca  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def _medir(funcao, token: str, chamadas: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        funcao(token)
+    return chamadas / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chamadas", type=int, default=50_000)
+    args = parser.parse_args()
+
+    token = seguranca.criar_token_acesso(
+        dados={"sub": "42", "email": "bench@frotanext.com", "tipo": "pessoa_fisica"}
+    )
+
+    sem_cache = _medir(seguranca._decodificar_token, token, args.chamadas)
+    com_cache = _medir(seguranca.verificar_token, token, args.chamadas)
+
+    print(f"{'modo':>10} {'verificações/s':>16}")
+    print(f"{'sem cache':>10} {sem_cache:>16.0f}")
+    print(f"{'com cache':>10} {com_cache:>16.0f}")
+    print(f"ganho: {com_cache / sem_cache:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
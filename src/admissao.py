@@ -0,0 +1,134 @@
+"""
+Controle de admissão do hashing argon2.
+
+Limita quantas operações de hash/verificação rodam ao mesmo tempo e quantas
+podem esperar na fila. Acima disso (ou se a espera passar do prazo) a
+requisição falha rápido com 503 e 'Retry-After', em vez de acumular memória.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+
+from . import metricas
+
+
+class HashSobrecarregado(HTTPException):
+    def __init__(self, retry_after_segundos: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de autenticação sobrecarregado. Tente novamente em instantes.",
+            headers={"Retry-After": str(retry_after_segundos)},
+        )
+
+
+class _MetricasAdmissao:
+    def __init__(self, prefixo: str) -> None:
+        self.em_execucao = metricas.Medidor(
+            f"{prefixo}_em_execucao", "Operações de hash em execução."
+        )
+        self.fila = metricas.Medidor(
+            f"{prefixo}_fila_profundidade", "Operações de hash aguardando vaga."
+        )
+        self.espera = metricas.Histograma(
+            f"{prefixo}_espera_segundos", "Tempo de espera por uma vaga."
+        )
+        self.rejeitadas = metricas.Contador(
+            f"{prefixo}_rejeitadas_total",
+            "Operações rejeitadas por fila cheia ou prazo esgotado.",
+        )
+
+
+class ControleAdmissao:
+    """
+    Semáforo com fila limitada e prazo de espera. As vagas são repassadas em
+    ordem de chegada diretamente para quem está esperando.
+    """
+
+    def __init__(
+        self,
+        max_concorrentes: int,
+        max_fila: int,
+        timeout_fila_segundos: float,
+        retry_after_segundos: int,
+        prefixo_metricas: str,
+    ) -> None:
+        self.max_concorrentes = max_concorrentes
+        self.max_fila = max_fila
+        self.timeout_fila_segundos = timeout_fila_segundos
+        self.retry_after_segundos = retry_after_segundos
+        self._em_execucao = 0
+        self._fila: deque = deque()
+        self.metricas = _MetricasAdmissao(prefixo_metricas)
+
+    @property
+    def em_execucao(self) -> int:
+        return self._em_execucao
+
+    @property
+    def profundidade_fila(self) -> int:
+        return len(self._fila)
+
+    def _rejeitar(self) -> HashSobrecarregado:
+        self.metricas.rejeitadas.inc()
+        return HashSobrecarregado(self.retry_after_segundos)
+
+    def _atualizar_medidores(self) -> None:
+        self.metricas.em_execucao.set(self._em_execucao)
+        self.metricas.fila.set(len(self._fila))
+
+    async def _entrar(self) -> None:
+        if self._em_execucao < self.max_concorrentes and not self._fila:
+            self._em_execucao += 1
+            self._atualizar_medidores()
+            self.metricas.espera.observar(0.0)
+            return
+
+        if len(self._fila) >= self.max_fila:
+            raise self._rejeitar()
+
+        inicio = time.perf_counter()
+        vaga = asyncio.get_running_loop().create_future()
+        self._fila.append(vaga)
+        self._atualizar_medidores()
+        try:
+            await asyncio.wait_for(vaga, timeout=self.timeout_fila_segundos)
+        except asyncio.TimeoutError as exc:
+            self._remover_da_fila(vaga)
+            raise self._rejeitar() from exc
+        except asyncio.CancelledError:
+            if vaga.done() and not vaga.cancelled():
+                self._sair()
+            else:
+                self._remover_da_fila(vaga)
+            raise
+        finally:
+            self.metricas.espera.observar(time.perf_counter() - inicio)
+
+    def _remover_da_fila(self, vaga: asyncio.Future) -> None:
+        try:
+            self._fila.remove(vaga)
+        except ValueError:
+            pass
+        self._atualizar_medidores()
+
+    def _sair(self) -> None:
+        while self._fila:
+            proximo = self._fila.popleft()
+            if not proximo.done():
+                proximo.set_result(None)
+                self._atualizar_medidores()
+                return
+        self._em_execucao -= 1
+        self._atualizar_medidores()
+
+    @asynccontextmanager
+    async def reservar(self):
+        await self._entrar()
+        try:
+            yield
+        finally:
+            self._sair()
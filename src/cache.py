@@ -0,0 +1,72 @@
+"""
+Cache em memória com limite de itens (LRU) e expiração por item.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from . import metricas
+
+
+class CacheTTL:
+    def __init__(self, max_itens: int, ttl_segundos: float, prefixo_metricas: str) -> None:
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = metricas.Contador(
+            f"{prefixo_metricas}_acertos_total", "Consultas atendidas pelo cache."
+        )
+        self.falhas = metricas.Contador(
+            f"{prefixo_metricas}_falhas_total", "Consultas que não estavam no cache."
+        )
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def obter(self, chave: Hashable, agora: Optional[float] = None) -> Optional[Any]:
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > agora:
+                    self._itens.move_to_end(chave)
+                    self.acertos.inc()
+                    return valor
+                del self._itens[chave]
+        self.falhas.inc()
+        return None
+
+    def guardar(
+        self,
+        chave: Hashable,
+        valor: Any,
+        expira_em: Optional[float] = None,
+        agora: Optional[float] = None,
+    ) -> None:
+        """
+        Guarda 'valor' até o menor entre o TTL do cache e 'expira_em'
+        (timestamp Unix), quando informado.
+        """
+        agora = time.time() if agora is None else agora
+        limite = agora + self.ttl_segundos
+        if expira_em is not None:
+            limite = min(limite, expira_em)
+        if limite <= agora:
+            return
+        with self._lock:
+            self._itens[chave] = (limite, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, chave: Hashable) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
@@ -0,0 +1,92 @@
+"""
+Calibra os custos do argon2 para o hardware atual.
+
+Mede o tempo de hash nesta máquina e escolhe o maior time_cost (e, se
+necessário, reduz o memory_cost) que cabe no orçamento de latência.
+O resultado é impresso como variáveis de ambiente lidas por 'seguranca.py'.
+
+Uso:
+    python -m src.calibrar_argon2 --alvo-ms 250 --memoria-mib 64
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2
+
+MEMORIA_MINIMA_KIB = 19 * 1024
+TIME_COST_MAXIMO = 20
+
+
+def medir_hash_ms(
+    time_cost: int, memory_cost: int, parallelism: int, amostras: int = 5
+) -> float:
+    """
+    Retorna a mediana, em milissegundos, de 'amostras' hashes com os custos dados.
+    """
+    hasher = argon2.using(
+        rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        hasher.hash("senha-de-calibracao")
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def calibrar(
+    alvo_ms: float, memoria_kib: int, parallelism: int, amostras: int = 5
+) -> dict:
+    """
+    Procura os parâmetros mais caros cuja latência fica dentro de 'alvo_ms'.
+    Prioriza memória (a defesa contra GPUs) e depois sobe o time_cost.
+    """
+    memory_cost = memoria_kib
+    while (
+        memory_cost > MEMORIA_MINIMA_KIB
+        and medir_hash_ms(1, memory_cost, parallelism, amostras) > alvo_ms
+    ):
+        memory_cost = max(memory_cost // 2, MEMORIA_MINIMA_KIB)
+
+    time_cost = 1
+    latencia_ms = medir_hash_ms(time_cost, memory_cost, parallelism, amostras)
+    while time_cost < TIME_COST_MAXIMO:
+        proxima_ms = medir_hash_ms(time_cost + 1, memory_cost, parallelism, amostras)
+        if proxima_ms > alvo_ms:
+            break
+        time_cost += 1
+        latencia_ms = proxima_ms
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "latencia_ms": latencia_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alvo-ms", type=float, default=250.0)
+    parser.add_argument("--memoria-mib", type=int, default=64)
+    parser.add_argument("--paralelismo", type=int, default=1)
+    parser.add_argument("--amostras", type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = calibrar(
+        alvo_ms=args.alvo_ms,
+        memoria_kib=args.memoria_mib * 1024,
+        parallelism=args.paralelismo,
+        amostras=args.amostras,
+    )
+
+    print(f"# latência medida: {resultado['latencia_ms']:.1f} ms")
+    print(f"ARGON2_TIME_COST={resultado['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={resultado['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={resultado['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Conjunto de chaves assimétricas para assinar tokens (ES256 e afins).
+
+As chaves privadas ficam em arquivos '<kid>.pem' num diretório. A chave ativa
+assina os novos tokens; as demais continuam válidas para verificação até
+serem removidas do diretório, o que permite rotacionar sem derrubar sessões.
+A parte pública de todas é publicada em '/.well-known/jwks.json'.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from jose import jwk
+
+
+@dataclass(frozen=True)
+class ChaveAssinatura:
+    kid: str
+    algoritmo: str
+    chave_privada_pem: str
+    jwk_publica: dict
+
+
+def _carregar_chave(arquivo: Path, algoritmo: str) -> ChaveAssinatura:
+    kid = arquivo.stem
+    chave_privada_pem = arquivo.read_text(encoding="utf-8")
+    jwk_publica = jwk.construct(chave_privada_pem, algoritmo).public_key().to_dict()
+    jwk_publica.update({"kid": kid, "use": "sig"})
+    return ChaveAssinatura(
+        kid=kid,
+        algoritmo=algoritmo,
+        chave_privada_pem=chave_privada_pem,
+        jwk_publica=jwk_publica,
+    )
+
+
+class ConjuntoChaves:
+    def __init__(
+        self, diretorio: str, algoritmo: str, kid_ativo: Optional[str] = None
+    ) -> None:
+        self.diretorio = Path(diretorio)
+        self.algoritmo = algoritmo
+        self._kid_ativo_configurado = kid_ativo
+        self._chaves: Dict[str, ChaveAssinatura] = {}
+        self._kid_ativo = ""
+        self._assinatura_diretorio: tuple = ()
+        self.recarregar()
+
+    def _ler_assinatura_diretorio(self) -> tuple:
+        return tuple(
+            sorted(
+                (arquivo.name, arquivo.stat().st_mtime_ns)
+                for arquivo in self.diretorio.glob("*.pem")
+            )
+        )
+
+    def recarregar(self) -> None:
+        assinatura = self._ler_assinatura_diretorio()
+        chaves = {
+            chave.kid: chave
+            for chave in (
+                _carregar_chave(arquivo, self.algoritmo)
+                for arquivo in sorted(self.diretorio.glob("*.pem"))
+            )
+        }
+        if not chaves:
+            raise RuntimeError(
+                f"Nenhuma chave '*.pem' encontrada em {self.diretorio} para {self.algoritmo}."
+            )
+
+        kid_ativo = self._kid_ativo_configurado or max(chaves)
+        if kid_ativo not in chaves:
+            raise RuntimeError(f"A chave ativa '{kid_ativo}' não está em {self.diretorio}.")
+
+        self._chaves = chaves
+        self._kid_ativo = kid_ativo
+        self._assinatura_diretorio = assinatura
+
+    def recarregar_se_alterado(self) -> bool:
+        if self._ler_assinatura_diretorio() == self._assinatura_diretorio:
+            return False
+        self.recarregar()
+        return True
+
+    @property
+    def chave_ativa(self) -> ChaveAssinatura:
+        return self._chaves[self._kid_ativo]
+
+    def jwk_publica(self, kid: Optional[str]) -> Optional[dict]:
+        chave = self._chaves.get(kid) if kid else None
+        return chave.jwk_publica if chave else None
+
+    def jwks(self) -> dict:
+        return {"keys": [chave.jwk_publica for chave in self._chaves.values()]}
+
+
+def carregar_do_ambiente(algoritmo: str) -> ConjuntoChaves:
+    diretorio = os.getenv("JWT_CHAVES_DIR")
+    if not diretorio:
+        raise RuntimeError(
+            f"JWT_ALGORITMO={algoritmo} exige JWT_CHAVES_DIR com as chaves privadas."
+        )
+    return ConjuntoChaves(
+        diretorio=diretorio,
+        algoritmo=algoritmo,
+        kid_ativo=os.getenv("JWT_KID_ATIVO") or None,
+    )
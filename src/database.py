@@ -1,13 +1,104 @@
 import os
+from typing import Any, Callable, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from . import pool_banco
+from .replicas import RoteadorSessoes
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_banco.parametros_pool())
+pool_banco.instrumentar(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _url_assincrona(url: str) -> str:
+    return (
+        make_url(url)
+        .set(drivername="postgresql+asyncpg")
+        .render_as_string(hide_password=False)
+    )
+
+
+# As rotas usam o driver assíncrono (asyncpg) sobre o mesmo banco. Sem
+# ASYNC_DATABASE_URL, a URL é derivada de DATABASE_URL trocando o driver.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _url_assincrona(DATABASE_URL)
+
+engine_async = create_async_engine(
+    ASYNC_DATABASE_URL, **pool_banco.parametros_pool(assincrono=True)
+)
+pool_banco.instrumentar(engine_async.sync_engine, "frotanext_db_pool_async")
+
+SessionAsyncLocal = async_sessionmaker(
+    bind=engine_async, autoflush=False, expire_on_commit=False
+)
+
+# Réplicas de leitura, separadas por vírgula. Cada uma tem o seu pool, com as
+# mesmas variáveis DB_POOL_* do primário.
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URL", "").split(",")
+    if url.strip()
+]
+
+
+
+def _criar_engine_replica(indice: int, url: str):
+    engine_replica = create_async_engine(
+        _url_assincrona(url), **pool_banco.parametros_pool(assincrono=True)
+    )
+    pool_banco.instrumentar(
+        engine_replica.sync_engine, f"frotanext_db_pool_replica_{indice}"
+    )
+    return engine_replica
+
+
+engines_replica = [
+    _criar_engine_replica(indice, url)
+    for indice, url in enumerate(DATABASE_REPLICA_URLS)
+]
+
+roteador_sessoes = RoteadorSessoes(
+    SessionAsyncLocal,
+    [
+        async_sessionmaker(bind=engine_replica, autoflush=False, expire_on_commit=False)
+        for engine_replica in engines_replica
+    ],
+)
+
 Base = declarative_base()
+
+
+async def executar_servico(
+    sessao_banco: AsyncSession,
+    funcao: Callable[..., Any],
+    /,
+    *args,
+    esquema: Optional[type] = None,
+    **kwargs,
+) -> Any:
+    """
+    Executa uma função de serviço síncrona, que recebe 'sessao_banco', sobre a
+    AsyncSession via 'run_sync': o código do serviço é o mesmo, mas o I/O
+    passa pelo asyncpg no event loop, sem ocupar uma thread por requisição.
+
+    Com 'esquema', o resultado (ou cada item da lista) é convertido para o
+    schema Pydantic ainda dentro do 'run_sync', pois relacionamentos lazy
+    não podem ser carregados depois que ele termina.
+    """
+
+    def _executar(sessao_sincrona):
+        resultado = funcao(*args, sessao_banco=sessao_sincrona, **kwargs)
+        if esquema is None or resultado is None:
+            return resultado
+        if isinstance(resultado, list):
+            return [esquema.model_validate(item) for item in resultado]
+        return esquema.model_validate(resultado)
+
+    return await sessao_banco.run_sync(_executar)
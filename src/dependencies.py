@@ -1,55 +1,202 @@
-from typing import Annotated
+import hmac
+import os
+from typing import Annotated, AsyncIterator, Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import models
+from . import principais
 from . import seguranca as seguranca_service
-from .database import SessionLocal
+from . import replicas
+from .database import roteador_sessoes
 
 
-def obter_sessao_banco() -> Session:
-    sessao_banco: Session | None = None
-    try:
-        sessao_banco = SessionLocal()
+def _ultima_escrita(request: Request) -> Optional[float]:
+    return replicas.ler_ultima_escrita(
+        request.cookies.get(replicas.COOKIE_ULTIMA_ESCRITA)
+    )
+
+
+async def obter_sessao_banco(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Sessão da requisição: numa réplica para GET/HEAD (salvo escrita recente
+    do cliente), no primário para o resto. As dependências de autenticação
+    usam a mesma sessão da rota.
+    """
+    fabrica = roteador_sessoes.fabrica_para(request.method, _ultima_escrita(request))
+    async with fabrica() as sessao_banco:
         yield sessao_banco
-    finally:
-        if sessao_banco is not None:
-            sessao_banco.close()
+
+
+async def obter_sessao_leitura(request: Request) -> AsyncIterator[AsyncSession]:
+    """Para rotas que não escrevem mas não são GET, como a introspecção."""
+    fabrica = roteador_sessoes.fabrica_leitura(_ultima_escrita(request))
+    async with fabrica() as sessao_banco:
+        yield sessao_banco
+
+
+def prefere_resposta_minima(
+    prefer: Annotated[Optional[str], Header()] = None,
+) -> bool:
+    """
+    'Prefer: return=minimal' (RFC 7240): o cliente dispensa o corpo da
+    resposta de uma alteração.
+    """
+    if prefer is None:
+        return False
+    return any(
+        preferencia.split(";")[0].strip().lower() == "return=minimal"
+        for preferencia in prefer.split(",")
+    )
 
 
 oauth2_scheme_funcionario = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 oauth2_scheme_cliente = OAuth2PasswordBearer(tokenUrl="clientes/token")
 
+CHAVE_SERVICO_INTERNO = os.getenv("CHAVE_SERVICO_INTERNO")
 
-def obter_cliente_atual(
-    token: Annotated[str, Depends(oauth2_scheme_cliente)],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-) -> models.Pessoa:
-    credenciais_excecao = HTTPException(
+
+def verificar_chave_servico(
+    x_chave_servico: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """
+    Protege as rotas chamadas só pelos demais serviços (gateway, frota,
+    reservas). Sem CHAVE_SERVICO_INTERNO configurada, essas rotas ficam fechadas.
+    """
+    chave_valida = (
+        CHAVE_SERVICO_INTERNO is not None
+        and x_chave_servico is not None
+        and hmac.compare_digest(
+            x_chave_servico.encode("utf-8"), CHAVE_SERVICO_INTERNO.encode("utf-8")
+        )
+    )
+    if not chave_valida:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Chave de serviço inválida.",
+        )
+
+
+def _credenciais_cliente_excecao() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais do cliente.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _conta_cliente_bloqueada_excecao() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Sua conta está temporariamente bloqueada. Entre em contato com o suporte.",
+    )
+
+
+def _ler_token_cliente(token: str) -> Tuple[dict, int]:
     payload = seguranca_service.verificar_token(token)
     if payload is None:
-        raise credenciais_excecao
+        raise _credenciais_cliente_excecao()
 
     cliente_id_str = payload.get("sub")
     if cliente_id_str is None:
-        raise credenciais_excecao
+        raise _credenciais_cliente_excecao()
 
     try:
         id_pessoa = int(cliente_id_str)
     except ValueError as exc:
-        raise credenciais_excecao from exc
+        raise _credenciais_cliente_excecao() from exc
+
+    return payload, id_pessoa
 
-    cliente_encontrado = sessao_banco.get(models.Pessoa, id_pessoa)
+
+def _validar_versao_e_status(
+    payload: dict, token_version: int, e_ativo: bool
+) -> None:
+    versao_token = payload.get("ver")
+    if versao_token is not None and versao_token != token_version:
+        raise _credenciais_cliente_excecao()
+    if not e_ativo:
+        raise _conta_cliente_bloqueada_excecao()
+
+
+async def obter_cliente_atual(
+    token: Annotated[str, Depends(oauth2_scheme_cliente)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+) -> models.Pessoa:
+    payload, id_pessoa = _ler_token_cliente(token)
+
+    cliente_encontrado = await sessao_banco.get(models.Pessoa, id_pessoa)
 
     if cliente_encontrado is None:
-        raise credenciais_excecao
+        raise _credenciais_cliente_excecao()
+
+    _validar_versao_e_status(
+        payload, cliente_encontrado.token_version, cliente_encontrado.e_ativo
+    )
 
     return cliente_encontrado
+
+
+async def _obter_estado_cliente(
+    sessao_banco: AsyncSession, id_pessoa: int
+) -> Optional[principais.EstadoCliente]:
+    estado = principais.cache_estado_clientes.obter(id_pessoa)
+    if estado is not None:
+        return estado
+
+    resultado = await sessao_banco.execute(
+        select(models.Pessoa.token_version, models.Pessoa.e_ativo).where(
+            models.Pessoa.id_pessoa == id_pessoa
+        )
+    )
+    linha = resultado.first()
+    if linha is None:
+        return None
+
+    estado = principais.EstadoCliente(
+        token_version=linha.token_version, e_ativo=linha.e_ativo
+    )
+    principais.cache_estado_clientes.guardar(id_pessoa, estado)
+    return estado
+
+
+async def obter_principal_cliente(
+    token: Annotated[str, Depends(oauth2_scheme_cliente)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+) -> principais.PrincipalCliente:
+    """
+    Identifica o cliente logado. Com AUTH_CLIENTE_VIA_CLAIMS ligado e um token
+    que traz 'ver', o principal sai das claims e só o estado (versão e ativo)
+    é conferido, normalmente sem ir ao banco. Tokens antigos, ou o modo
+    desligado, caem na carga completa de 'obter_cliente_atual'.
+    """
+    payload, id_pessoa = _ler_token_cliente(token)
+
+    if (
+        principais.AUTH_CLIENTE_VIA_CLAIMS
+        and "ver" in payload
+        and "tipo" in payload
+        and "email" in payload
+    ):
+        estado = await _obter_estado_cliente(sessao_banco, id_pessoa)
+        if estado is None:
+            raise _credenciais_cliente_excecao()
+        _validar_versao_e_status(payload, estado.token_version, estado.e_ativo)
+        return principais.PrincipalCliente(
+            id_pessoa=id_pessoa,
+            email=payload["email"],
+            tipo_pessoa=payload["tipo"],
+            token_version=estado.token_version,
+        )
+
+    cliente = await obter_cliente_atual(token=token, sessao_banco=sessao_banco)
+    return principais.PrincipalCliente(
+        id_pessoa=cliente.id_pessoa,
+        email=cliente.email,
+        tipo_pessoa=cliente.tipo_pessoa,
+        token_version=cliente.token_version,
+    )
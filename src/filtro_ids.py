@@ -0,0 +1,30 @@
+"""
+Filtros "coluna está na lista" para listas de qualquer tamanho.
+
+Até FILTRO_IDS_LIMITE_IN valores o filtro é um IN (...) com um parâmetro por
+valor, que o planejador estima pelos valores. Acima disso vira
+'= ANY(:lista)', com a lista inteira num único parâmetro de array: o texto do
+SQL não cresce com a lista (nem as entradas dos caches de statements do
+asyncpg e do Postgres), e o limite de 32767 parâmetros por consulta do
+protocolo deixa de importar.
+
+MAX_IDS_POR_LISTA limita o tamanho das listas aceitas pelos schemas, para
+que pedidos absurdos sejam recusados na validação, antes de ir ao banco.
+"""
+
+import os
+from typing import Iterable
+
+from sqlalchemy import ARRAY, any_, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+FILTRO_IDS_LIMITE_IN = int(os.getenv("FILTRO_IDS_LIMITE_IN", "100"))
+
+MAX_IDS_POR_LISTA = int(os.getenv("MAX_IDS_POR_LISTA", "10000"))
+
+
+def coluna_em_lista(coluna, valores: Iterable) -> ColumnElement:
+    valores = list(valores)
+    if len(valores) <= FILTRO_IDS_LIMITE_IN:
+        return coluna.in_(valores)
+    return coluna == any_(literal(valores, ARRAY(coluna.type)))
@@ -0,0 +1,133 @@
+"""
+Limite de tentativas de login por email e por IP.
+
+Cada limitador é uma tabela de tamanho fixo ('array' de inteiros de 64 bits).
+A chave é reduzida a um hash com chave secreta (sorteada por processo, como a
+própria tabela); o hash escolhe a posição e 16 bits dele ficam guardados como
+impressão digital. Cada posição guarda, num único inteiro:
+
+    impressão (16 bits) | janela (16 bits) | contagem anterior (16) | atual (16)
+
+Uma chave nova que cai numa posição ocupada por outra simplesmente a
+sobrescreve, então a memória não cresce com o número de chaves distintas.
+Sem conhecer a chave do hash, um atacante não consegue escolher emails que
+caiam na posição de outro para zerar a contagem dele.
+A contagem usa janela deslizante aproximada: o total da janela anterior,
+ponderado pelo quanto dela ainda se sobrepõe, somado ao da janela atual.
+"""
+
+import hashlib
+import os
+import secrets
+import threading
+import time
+from array import array
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from . import metricas
+
+_MASCARA_16 = 0xFFFF
+
+
+class LimitadorJanelaDeslizante:
+    def __init__(self, limite: int, janela_segundos: int, num_posicoes: int) -> None:
+        self.limite = limite
+        self.janela_segundos = janela_segundos
+        self._tabela = array("Q", bytes(8 * num_posicoes))
+        self._chave_hash = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+
+    def _localizar(self, chave: str):
+        resumo = hashlib.blake2b(
+            chave.encode(), digest_size=8, key=self._chave_hash
+        ).digest()
+        valor = int.from_bytes(resumo, "big")
+        posicao = (valor >> 16) % len(self._tabela)
+        impressao = (valor & _MASCARA_16) or 1
+        return posicao, impressao
+
+    def registrar_tentativa(self, chave: str, agora: Optional[float] = None) -> int:
+        """
+        Conta uma tentativa para 'chave'. Retorna 0 se ela está dentro do
+        limite, ou os segundos até o início da próxima janela se não está
+        (nesse caso a tentativa não é contada).
+        """
+        agora = time.time() if agora is None else agora
+        janela_atual = int(agora // self.janela_segundos)
+        fracao_decorrida = (agora % self.janela_segundos) / self.janela_segundos
+        posicao, impressao = self._localizar(chave)
+
+        with self._lock:
+            estado = self._tabela[posicao]
+            anterior = atual = 0
+            if estado >> 48 == impressao:
+                janela_salva = (estado >> 32) & _MASCARA_16
+                if janela_salva == janela_atual & _MASCARA_16:
+                    anterior = (estado >> 16) & _MASCARA_16
+                    atual = estado & _MASCARA_16
+                elif janela_salva == (janela_atual - 1) & _MASCARA_16:
+                    anterior = estado & _MASCARA_16
+
+            estimativa = anterior * (1 - fracao_decorrida) + atual
+            if estimativa >= self.limite:
+                return max(int(self.janela_segundos * (1 - fracao_decorrida)), 1)
+
+            atual = min(atual + 1, _MASCARA_16)
+            self._tabela[posicao] = (
+                (impressao << 48)
+                | ((janela_atual & _MASCARA_16) << 32)
+                | (anterior << 16)
+                | atual
+            )
+        return 0
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._tabela = array("Q", bytes(8 * len(self._tabela)))
+
+
+LOGIN_JANELA_SEGUNDOS = int(os.getenv("LOGIN_JANELA_SEGUNDOS", "60"))
+LOGIN_POSICOES = int(os.getenv("LOGIN_LIMITADOR_POSICOES", str(1 << 20)))
+
+limitador_por_email = LimitadorJanelaDeslizante(
+    limite=int(os.getenv("LOGIN_LIMITE_POR_EMAIL", "10")),
+    janela_segundos=LOGIN_JANELA_SEGUNDOS,
+    num_posicoes=LOGIN_POSICOES,
+)
+limitador_por_ip = LimitadorJanelaDeslizante(
+    limite=int(os.getenv("LOGIN_LIMITE_POR_IP", "100")),
+    janela_segundos=LOGIN_JANELA_SEGUNDOS,
+    num_posicoes=LOGIN_POSICOES,
+)
+
+metrica_logins_bloqueados = metricas.Contador(
+    "frotanext_login_bloqueados_total",
+    "Tentativas de login recusadas pelo limite por email ou IP.",
+)
+
+
+def verificar_tentativa_login(email: str, ip: Optional[str]) -> None:
+    """
+    Deve ser chamada antes de qualquer consulta ao banco ou verificação de
+    senha. Levanta 429 com 'Retry-After' quando o IP ou o email passou do limite.
+
+    'ip' é o 'request.client.host'. Atrás de um proxy reverso ele só é o IP
+    do cliente se o uvicorn aceitar o 'X-Forwarded-For' desse proxy
+    ('--forwarded-allow-ips' / FORWARDED_ALLOW_IPS); sem isso todos os
+    logins contam para o IP do proxy e o limite por IP vira um bloqueio global.
+    """
+    espera = 0
+    if ip:
+        espera = limitador_por_ip.registrar_tentativa(ip)
+    if not espera:
+        espera = limitador_por_email.registrar_tentativa(email.strip().lower())
+
+    if espera:
+        metrica_logins_bloqueados.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas de login. Aguarde antes de tentar novamente.",
+            headers={"Retry-After": str(espera)},
+        )
@@ -1,23 +1,67 @@
+import math
+import os
+import time
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from . import metricas, replicas
+from . import seguranca as seguranca_service
+from .database import engine_async, engines_replica, roteador_sessoes
+from .dependencies import verificar_chave_servico
+from .services import revogacao_service, token_renovacao_service
+from .tarefas_periodicas import tarefas_periodicas
 from .routers import (
     auth_router,
+    chaves_router,
     cliente_auth_router,
     pessoa_fisica_router,
     pessoa_juridica_router,
     empresa_router,
 )
 
+INTERVALO_RECARGA_CHAVES_SEGUNDOS = float(
+    os.getenv("JWT_CHAVES_RECARGA_SEGUNDOS", "60")
+)
+INTERVALO_LIMPEZA_REFRESH_SEGUNDOS = float(
+    os.getenv("REFRESH_TOKEN_LIMPEZA_SEGUNDOS", "3600")
+)
+INTERVALO_SINCRONIA_REVOGACAO_SEGUNDOS = float(
+    os.getenv("REVOGACAO_SINCRONIA_SEGUNDOS", "30")
+)
+MAX_CORPO_BYTES = int(os.getenv("MAX_CORPO_BYTES", str(8 * 1024 * 1024)))
+
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     print("Iniciando Auth Service...")
+    seguranca_service.executor_hash.iniciar()
+    if seguranca_service.conjunto_chaves is not None:
+        tarefas_periodicas.agendar(
+            INTERVALO_RECARGA_CHAVES_SEGUNDOS,
+            seguranca_service.conjunto_chaves.recarregar_se_alterado,
+        )
+    tarefas_periodicas.agendar(
+        INTERVALO_LIMPEZA_REFRESH_SEGUNDOS,
+        token_renovacao_service.remover_tokens_expirados,
+    )
+    tarefas_periodicas.agendar(
+        INTERVALO_SINCRONIA_REVOGACAO_SEGUNDOS,
+        revogacao_service.sincronizar_revogacoes,
+        executar_ao_iniciar=True,
+    )
 
     yield
 
     print("Desligando Auth Service...")
+    await tarefas_periodicas.encerrar()
+    seguranca_service.executor_hash.encerrar()
+    await engine_async.dispose()
+    for engine_replica in engines_replica:
+        await engine_replica.dispose()
 
 
 app = FastAPI(
@@ -28,6 +72,7 @@ app = FastAPI(
 )
 
 app.include_router(auth_router.router)
+app.include_router(chaves_router.router)
 app.include_router(cliente_auth_router.router)
 app.include_router(pessoa_fisica_router.router)
 app.include_router(pessoa_juridica_router.router)
@@ -47,6 +92,90 @@ app.add_middleware(
 )
 
 
+def _corpo_grande_demais() -> str:
+    return f"O corpo da requisição passa de {MAX_CORPO_BYTES} bytes."
+
+
+class LimitarTamanhoCorpo:
+    """
+    Recusa com 413 requisições maiores que MAX_CORPO_BYTES. Com
+    Content-Length, antes de ler o corpo; sem ele (Transfer-Encoding:
+    chunked), contando os bytes à medida que chegam: a leitura que passa do
+    limite levanta 413 na rota, sem acumular o resto do corpo.
+    """
+
+    def __init__(self, aplicacao: ASGIApp) -> None:
+        self.app = aplicacao
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tamanho = Headers(scope=scope).get("content-length")
+        if tamanho is not None and tamanho.isdigit() and int(tamanho) > MAX_CORPO_BYTES:
+            resposta = JSONResponse(
+                status_code=413, content={"detail": _corpo_grande_demais()}
+            )
+            await resposta(scope, receive, send)
+            return
+
+        recebidos = 0
+
+        async def receber_com_limite() -> Message:
+            nonlocal recebidos
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                recebidos += len(mensagem.get("body", b""))
+                if recebidos > MAX_CORPO_BYTES:
+                    raise HTTPException(status_code=413, detail=_corpo_grande_demais())
+            return mensagem
+
+        await self.app(scope, receber_com_limite, send)
+
+
+# Registrado antes dos middlewares de função, fica por dentro deles: só as
+# leituras do corpo feitas pela rota passam pela contagem, e o 413 levantado
+# nelas vira resposta no tratamento de exceções do FastAPI.
+app.add_middleware(LimitarTamanhoCorpo)
+
+
+@app.middleware("http")
+async def marcar_ultima_escrita(request: Request, call_next):
+    """
+    Com réplicas configuradas, toda escrita bem-sucedida grava o instante no
+    cookie lido por 'obter_sessao_banco', para o cliente ler o que escreveu.
+    """
+    resposta = await call_next(request)
+    if (
+        roteador_sessoes.fabricas_replica
+        and request.method not in replicas.METODOS_LEITURA
+        and resposta.status_code < 400
+    ):
+        resposta.set_cookie(
+            replicas.COOKIE_ULTIMA_ESCRITA,
+            f"{time.time():.3f}",
+            max_age=math.ceil(roteador_sessoes.janela_escrita_segundos),
+            httponly=True,
+            samesite="lax",
+        )
+    return resposta
+
+
 @app.get("/")
 def read_root():
     return {"message": "FrotaNext Auth Service Online"}
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(verificar_chave_servico)],
+)
+def rota_metricas():
+    """
+    Exige o cabeçalho 'X-Chave-Servico', como as demais rotas internas: as
+    métricas expõem volume de logins, filas e tamanho dos caches.
+    """
+    return metricas.renderizar_prometheus()
@@ -0,0 +1,146 @@
+"""
+Métricas em memória do processo, expostas em formato texto do Prometheus
+pela rota '/metrics'.
+"""
+
+import bisect
+import threading
+from typing import Callable, List, Sequence
+
+
+class Contador:
+    def __init__(self, nome: str, descricao: str) -> None:
+        self.nome = nome
+        self.descricao = descricao
+        self._valor = 0.0
+        self._lock = threading.Lock()
+        registro.append(self)
+
+    @property
+    def valor(self) -> float:
+        return self._valor
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        with self._lock:
+            self._valor += quantidade
+
+    def renderizar(self) -> List[str]:
+        return [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} counter",
+            f"{self.nome} {self._valor}",
+        ]
+
+
+class Medidor:
+    def __init__(self, nome: str, descricao: str) -> None:
+        self.nome = nome
+        self.descricao = descricao
+        self._valor = 0.0
+        self._lock = threading.Lock()
+        registro.append(self)
+
+    @property
+    def valor(self) -> float:
+        return self._valor
+
+    def set(self, valor: float) -> None:
+        with self._lock:
+            self._valor = valor
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        with self._lock:
+            self._valor += quantidade
+
+    def dec(self, quantidade: float = 1.0) -> None:
+        with self._lock:
+            self._valor -= quantidade
+
+    def renderizar(self) -> List[str]:
+        return [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} gauge",
+            f"{self.nome} {self._valor}",
+        ]
+
+
+class MedidorCalculado:
+    """Medidor lido de 'funcao' no momento da coleta."""
+
+    def __init__(self, nome: str, descricao: str, funcao: Callable[[], float]) -> None:
+        self.nome = nome
+        self.descricao = descricao
+        self.funcao = funcao
+        registro.append(self)
+
+    @property
+    def valor(self) -> float:
+        return float(self.funcao())
+
+    def renderizar(self) -> List[str]:
+        return [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} gauge",
+            f"{self.nome} {self.valor}",
+        ]
+
+
+LIMITES_PADRAO_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histograma:
+    def __init__(
+        self,
+        nome: str,
+        descricao: str,
+        limites: Sequence[float] = LIMITES_PADRAO_SEGUNDOS,
+    ) -> None:
+        self.nome = nome
+        self.descricao = descricao
+        self.limites = tuple(sorted(limites))
+        self._baldes = [0] * (len(self.limites) + 1)
+        self._soma = 0.0
+        self._contagem = 0
+        self._lock = threading.Lock()
+        registro.append(self)
+
+    @property
+    def contagem(self) -> int:
+        return self._contagem
+
+    def observar(self, valor: float) -> None:
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self._baldes[indice] += 1
+            self._soma += valor
+            self._contagem += 1
+
+    def renderizar(self) -> List[str]:
+        linhas = [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} histogram",
+        ]
+        acumulado = 0
+        for limite, quantidade in zip(self.limites, self._baldes):
+            acumulado += quantidade
+            linhas.append(f'{self.nome}_bucket{{le="{limite}"}} {acumulado}')
+        linhas.append(f'{self.nome}_bucket{{le="+Inf"}} {self._contagem}')
+        linhas.append(f"{self.nome}_sum {self._soma}")
+        linhas.append(f"{self.nome}_count {self._contagem}")
+        return linhas
+
+
+registro: list = []
+
+
+def remover(*metricas) -> None:
+    """Tira as métricas de '/metrics' (ex.: as de um engine descartado)."""
+    for metrica in metricas:
+        registro.remove(metrica)
+
+
+def renderizar_prometheus() -> str:
+    linhas: List[str] = []
+    for metrica in registro:
+        linhas.extend(metrica.renderizar())
+    return "\n".join(linhas) + "\n"
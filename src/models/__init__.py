@@ -2,6 +2,10 @@ from ..database import Base
 
 from . import funcionario
 from . import pessoa
+from . import token_renovacao
+from . import token_revogado
 
 from .funcionario import Funcionario
 from .pessoa import Endereco, Pessoa, PessoaFisica, PessoaJuridica
+from .token_renovacao import TokenRenovacao
+from .token_revogado import TokenRevogado
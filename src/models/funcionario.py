@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String, func
 
 from ..database import Base
 
@@ -8,7 +8,18 @@ class Funcionario(Base):
 
     id_funcionario = Column(Integer, primary_key=True, index=True)
     nome_completo = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False)
     senha = Column(String, nullable=False)
     e_admin = Column(Boolean, default=False, nullable=False)
     e_ativado = Column(Boolean, default=True, nullable=False)
+
+    # Único por lower(email) e cobrindo as colunas lidas no login
+    # ('buscar_credenciais_funcionario').
+    __table_args__ = (
+        Index(
+            "ix_funcionarios_email",
+            func.lower(email),
+            unique=True,
+            postgresql_include=["email", "senha", "e_ativado", "id_funcionario"],
+        ),
+    )
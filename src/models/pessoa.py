@@ -1,6 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -13,8 +22,8 @@ class Endereco(Base):
     numero = Column(String, nullable=False)
     complemento = Column(String, nullable=True)
     bairro = Column(String, nullable=False)
-    cidade = Column(String, nullable=False)
-    estado = Column(String, nullable=False)
+    cidade = Column(String, nullable=False, index=True)
+    estado = Column(String, nullable=False, index=True)
     cep = Column(String, nullable=False, index=True)
     pessoa_id = Column(
         Integer, ForeignKey("pessoas.id_pessoa"), nullable=False, unique=True
@@ -25,12 +34,13 @@ class Endereco(Base):
 class Pessoa(Base):
     __tablename__ = "pessoas"
     id_pessoa = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False)
     telefone = Column(String, nullable=False)
     senha = Column(String, nullable=False)
 
     e_ativo = Column(Boolean, default=True, nullable=False)
-    data_criacao = Column(DateTime, default=datetime.now, nullable=False)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    data_criacao = Column(DateTime, default=datetime.now, nullable=False, index=True)
 
     endereco = relationship(
         "Endereco", back_populates="pessoa", uselist=False, cascade="all, delete-orphan"
@@ -42,6 +52,37 @@ class Pessoa(Base):
         "polymorphic_on": tipo_pessoa,
     }
 
+    __table_args__ = (
+        # Emails são comparados sem diferenciar maiúsculas: o índice único é
+        # sobre lower(email) e cobre as colunas lidas no login
+        # ('buscar_credenciais_cliente'), que é respondido só pelo índice.
+        Index(
+            "ix_pessoas_email",
+            func.lower(email),
+            unique=True,
+            postgresql_include=[
+                "email",
+                "senha",
+                "e_ativo",
+                "tipo_pessoa",
+                "id_pessoa",
+                "token_version",
+            ],
+        ),
+        # Listagens filtradas por 'e_ativo', já na ordem do cursor. Contas
+        # bloqueadas são poucas, e cada índice parcial só guarda o seu lado.
+        Index(
+            "ix_pessoas_ativas_id_pessoa",
+            "id_pessoa",
+            postgresql_where=e_ativo.is_(True),
+        ),
+        Index(
+            "ix_pessoas_bloqueadas_id_pessoa",
+            "id_pessoa",
+            postgresql_where=e_ativo.is_(False),
+        ),
+    )
+
 
 class PessoaFisica(Pessoa):
     __tablename__ = "pessoas_fisicas"
@@ -59,6 +100,12 @@ class PessoaFisica(Pessoa):
 
     __mapper_args__ = {"polymorphic_identity": "pessoa_fisica"}
 
+    __table_args__ = (
+        # Carga e alteração da frota por empresa e a listagem paginada de
+        # 'GET /minha-empresa/motoristas', já na ordem do cursor.
+        Index("ix_pessoas_fisicas_empresa_id", "empresa_id", "id_pessoa"),
+    )
+
 
 class PessoaJuridica(Pessoa):
     __tablename__ = "pessoas_juridicas"
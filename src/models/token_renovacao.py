@@ -0,0 +1,30 @@
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    String,
+)
+
+from ..database import Base
+
+
+class TokenRenovacao(Base):
+    """
+    Refresh token emitido no login. Só o HMAC-SHA256 do token é guardado.
+    Todos os tokens de uma mesma cadeia de rotação compartilham a 'familia'.
+    """
+
+    __tablename__ = "tokens_renovacao"
+
+    id_token = Column(Integer, primary_key=True)
+    hash_token = Column(LargeBinary(32), unique=True, index=True, nullable=False)
+    familia = Column(BigInteger, index=True, nullable=False)
+    tipo_sujeito = Column(String(20), nullable=False)
+    id_sujeito = Column(Integer, nullable=False)
+    versao_sujeito = Column(Integer, default=0, nullable=False)
+    expira_em = Column(DateTime(timezone=True), index=True, nullable=False)
+    usado_em = Column(DateTime(timezone=True), nullable=True)
+    revogado = Column(Boolean, default=False, nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, String
+
+from ..database import Base
+
+
+class TokenRevogado(Base):
+    """
+    Access token revogado antes do 'exp'. A linha pode ser apagada depois
+    de 'expira_em', quando o token já seria recusado de qualquer forma.
+    """
+
+    __tablename__ = "tokens_revogados"
+
+    jti = Column(String(32), primary_key=True)
+    expira_em = Column(DateTime(timezone=True), index=True, nullable=False)
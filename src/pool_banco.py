@@ -0,0 +1,151 @@
+"""
+Pool de conexões do SQLAlchemy configurável pelo ambiente e instrumentado.
+
+Cada engine instrumentado tem as suas métricas, prefixadas pelo nome do
+pool. A espera por uma conexão (incluindo o pre-ping) e os timeouts são
+medidos no 'connect' das classes de pool abaixo; conexões emprestadas,
+abertas e invalidadas vêm dos eventos do pool, e o overflow é lido do pool
+na coleta. Tudo aparece em '/metrics'.
+"""
+
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from . import metricas
+
+
+def _ler_booleano(nome: str, padrao: str) -> bool:
+    return os.getenv(nome, padrao).lower() in ("1", "true", "sim")
+
+
+def parametros_pool(assincrono: bool = False) -> dict:
+    """
+    Argumentos de 'create_engine' (ou 'create_async_engine', com
+    'assincrono'). Os padrões são os do próprio SQLAlchemy.
+    """
+    return {
+        "poolclass": PoolAsyncInstrumentado if assincrono else PoolInstrumentado,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        "pool_pre_ping": _ler_booleano("DB_POOL_PRE_PING", "false"),
+        "pool_use_lifo": _ler_booleano("DB_POOL_USE_LIFO", "false"),
+    }
+
+
+class MetricasPool:
+    """Métricas de um pool, com os nomes prefixados por 'prefixo'."""
+
+    def __init__(self, engine, prefixo: str) -> None:
+        # Tamanho e overflow são lidos de 'engine.pool' na coleta, e não do
+        # pool atual, porque 'engine.dispose()' troca o pool.
+        def _tamanho() -> int:
+            return engine.pool.size()
+
+        def _overflow() -> int:
+            return engine.pool.overflow()
+
+        self.espera_checkout = metricas.Histograma(
+            f"{prefixo}_espera_checkout_segundos",
+            "Tempo para obter uma conexão do pool.",
+        )
+        self.timeouts_checkout = metricas.Contador(
+            f"{prefixo}_timeouts_total",
+            "Pedidos de conexão que estouraram o pool_timeout.",
+        )
+        self.conexoes_emprestadas = metricas.Medidor(
+            f"{prefixo}_conexoes_emprestadas",
+            "Conexões do pool em uso no momento.",
+        )
+        self.conexoes_abertas = metricas.Contador(
+            f"{prefixo}_conexoes_abertas_total",
+            "Conexões novas abertas com o banco.",
+        )
+        self.conexoes_invalidadas = metricas.Contador(
+            f"{prefixo}_conexoes_invalidadas_total",
+            "Conexões descartadas por erro, pre-ping ou recycle.",
+        )
+        self.tamanho = metricas.MedidorCalculado(
+            f"{prefixo}_tamanho", "pool_size configurado.", _tamanho
+        )
+        self.overflow = metricas.MedidorCalculado(
+            f"{prefixo}_overflow",
+            "Conexões abertas além do pool_size (negativo enquanto o pool não enche).",
+            _overflow,
+        )
+
+    @property
+    def todas(self) -> tuple:
+        return (
+            self.espera_checkout,
+            self.timeouts_checkout,
+            self.conexoes_emprestadas,
+            self.conexoes_abertas,
+            self.conexoes_invalidadas,
+            self.tamanho,
+            self.overflow,
+        )
+
+    def ao_emprestar(self, _conexao_dbapi, _registro, _proxy):
+        self.conexoes_emprestadas.inc()
+
+    def ao_devolver(self, _conexao_dbapi, _registro):
+        self.conexoes_emprestadas.dec()
+
+    def ao_conectar(self, _conexao_dbapi, _registro):
+        self.conexoes_abertas.inc()
+
+    def ao_invalidar(self, _conexao_dbapi, _registro, _excecao):
+        self.conexoes_invalidadas.inc()
+
+
+class _InstrumentacaoPool(QueuePool):
+    metricas_pool: Optional[MetricasPool] = None
+
+    def connect(self):
+        if self.metricas_pool is None:
+            return super().connect()
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metricas_pool.timeouts_checkout.inc()
+            raise
+        finally:
+            self.metricas_pool.espera_checkout.observar(time.perf_counter() - inicio)
+
+    def recreate(self):
+        # 'engine.dispose()' troca o pool por uma cópia: as métricas vão junto.
+        novo_pool = super().recreate()
+        novo_pool.metricas_pool = self.metricas_pool
+        return novo_pool
+
+
+class PoolInstrumentado(_InstrumentacaoPool):
+    """Pool do engine síncrono (psycopg2)."""
+
+
+class PoolAsyncInstrumentado(_InstrumentacaoPool, AsyncAdaptedQueuePool):
+    """Pool do engine assíncrono (asyncpg)."""
+
+
+def instrumentar(engine, prefixo: str = "frotanext_db_pool") -> MetricasPool:
+    """
+    Cria as métricas do pool de 'engine' (síncrono, ou o 'sync_engine' de um
+    engine assíncrono) com os nomes prefixados por 'prefixo' e liga a elas os
+    eventos do pool. Os eventos são registrados no engine, e não no pool,
+    porque 'engine.dispose()' troca o pool.
+    """
+    metricas_pool = MetricasPool(engine, prefixo)
+    if isinstance(engine.pool, _InstrumentacaoPool):
+        engine.pool.metricas_pool = metricas_pool
+    event.listen(engine, "checkout", metricas_pool.ao_emprestar)
+    event.listen(engine, "checkin", metricas_pool.ao_devolver)
+    event.listen(engine, "connect", metricas_pool.ao_conectar)
+    event.listen(engine, "invalidate", metricas_pool.ao_invalidar)
+    return metricas_pool
@@ -0,0 +1,84 @@
+"""
+Principais autenticados montados a partir das claims do token, sem carregar
+a entidade completa do banco.
+
+O estado mínimo de cada cliente (token_version, e_ativo) fica num cache curto
+em memória. Exclusão, desativação e troca de senha incrementam o
+token_version e invalidam a entrada, derrubando os tokens já emitidos.
+Funcionários ficam num cache próprio, indexado pelo id_funcionario do token.
+"""
+
+import os
+from dataclasses import dataclass
+
+from .cache import CacheTTL
+
+
+@dataclass(frozen=True)
+class PrincipalCliente:
+    id_pessoa: int
+    email: str
+    tipo_pessoa: str
+    token_version: int
+
+
+@dataclass(frozen=True)
+class PrincipalFuncionario:
+    id_funcionario: int
+    email: str
+    nome_completo: str
+    e_admin: bool
+    e_ativado: bool
+
+
+@dataclass(frozen=True)
+class EstadoCliente:
+    token_version: int
+    e_ativo: bool
+
+
+AUTH_CLIENTE_VIA_CLAIMS = os.getenv("AUTH_CLIENTE_VIA_CLAIMS", "false").lower() in (
+    "1",
+    "true",
+    "sim",
+)
+
+cache_estado_clientes = CacheTTL(
+    max_itens=int(os.getenv("CACHE_PRINCIPAL_MAX_ITENS", "50000")),
+    ttl_segundos=float(os.getenv("CACHE_PRINCIPAL_TTL_SEGUNDOS", "30")),
+    prefixo_metricas="frotanext_cache_principal_cliente",
+)
+
+
+def invalidar_cliente(id_pessoa: int) -> None:
+    """
+    Só limpa o cache deste processo. Os outros workers continuam com a
+    entrada antiga até ela expirar, ou seja, aceitam tokens revogados por até
+    CACHE_PRINCIPAL_TTL_SEGUNDOS (30s por padrão).
+    """
+    cache_estado_clientes.invalidar(id_pessoa)
+
+
+cache_funcionarios = CacheTTL(
+    max_itens=int(os.getenv("CACHE_PRINCIPAL_MAX_ITENS", "50000")),
+    ttl_segundos=float(os.getenv("CACHE_PRINCIPAL_TTL_SEGUNDOS", "30")),
+    prefixo_metricas="frotanext_cache_principal_funcionario",
+)
+
+
+def principal_de_funcionario(funcionario) -> PrincipalFuncionario:
+    return PrincipalFuncionario(
+        id_funcionario=funcionario.id_funcionario,
+        email=funcionario.email,
+        nome_completo=funcionario.nome_completo,
+        e_admin=funcionario.e_admin,
+        e_ativado=funcionario.e_ativado,
+    )
+
+
+def invalidar_funcionario(id_funcionario: int) -> None:
+    """
+    Deve ser chamada em toda escrita que altere um funcionário (criação,
+    atualização, desativação), para que a próxima requisição releia o banco.
+    """
+    cache_funcionarios.invalidar(id_funcionario)
@@ -0,0 +1,87 @@
+"""
+Roteamento de sessões entre o banco primário e as réplicas de leitura.
+
+Requisições de leitura (GET/HEAD e as rotas marcadas como só-leitura) vão
+para as réplicas, em rodízio; as demais vão para o primário. Como a réplica
+fica um pouco atrás do primário, quem acabou de escrever lê do primário por
+REPLICA_JANELA_ESCRITA_SEGUNDOS: a resposta de toda escrita bem-sucedida
+grava o instante no cookie COOKIE_ULTIMA_ESCRITA, que vale em qualquer
+instância do serviço, sem estado compartilhado.
+
+As fábricas são 'sessionmaker' ou 'async_sessionmaker'; o roteador só escolhe
+qual delas usar.
+"""
+
+import itertools
+import os
+import time
+from typing import Callable, Optional, Sequence
+
+from . import metricas
+
+REPLICA_JANELA_ESCRITA_SEGUNDOS = float(
+    os.getenv("REPLICA_JANELA_ESCRITA_SEGUNDOS", "5")
+)
+
+COOKIE_ULTIMA_ESCRITA = "frotanext_ultima_escrita"
+
+METODOS_LEITURA = frozenset({"GET", "HEAD"})
+
+leituras_replica = metricas.Contador(
+    "frotanext_db_leituras_replica_total",
+    "Sessões de leitura servidas por uma réplica.",
+)
+leituras_primario = metricas.Contador(
+    "frotanext_db_leituras_primario_total",
+    "Sessões de leitura mandadas ao primário por escrita recente do cliente.",
+)
+
+
+def ler_ultima_escrita(valor_cookie: Optional[str]) -> Optional[float]:
+    if valor_cookie is None:
+        return None
+    try:
+        return float(valor_cookie)
+    except ValueError:
+        return None
+
+
+class RoteadorSessoes:
+    def __init__(
+        self,
+        fabrica_primaria: Callable,
+        fabricas_replica: Sequence[Callable] = (),
+        janela_escrita_segundos: float = REPLICA_JANELA_ESCRITA_SEGUNDOS,
+    ) -> None:
+        self.fabrica_primaria = fabrica_primaria
+        self.fabricas_replica = list(fabricas_replica)
+        self.janela_escrita_segundos = janela_escrita_segundos
+        self._rodizio = itertools.cycle(self.fabricas_replica)
+
+    def fabrica_leitura(
+        self, ultima_escrita: Optional[float], agora: Optional[float] = None
+    ) -> Callable:
+        """
+        Réplica da vez, ou o primário se não há réplicas configuradas ou se o
+        cliente escreveu há menos de 'janela_escrita_segundos'.
+        """
+        if not self.fabricas_replica:
+            return self.fabrica_primaria
+
+        agora = time.time() if agora is None else agora
+        if (
+            ultima_escrita is not None
+            and agora - ultima_escrita < self.janela_escrita_segundos
+        ):
+            leituras_primario.inc()
+            return self.fabrica_primaria
+
+        leituras_replica.inc()
+        return next(self._rodizio)
+
+    def fabrica_para(
+        self, metodo: str, ultima_escrita: Optional[float]
+    ) -> Callable:
+        if metodo in METODOS_LEITURA:
+            return self.fabrica_leitura(ultima_escrita)
+        return self.fabrica_primaria
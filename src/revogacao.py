@@ -0,0 +1,119 @@
+"""
+Registro em memória dos tokens revogados antes do 'exp' (logout).
+
+Os 'jti' revogados ficam num dicionário jti -> exp, espelho da tabela
+'tokens_revogados', na frente do qual há um filtro de Bloom. Quase nenhum
+token está revogado, e para esses o filtro responde "não" com poucas leituras
+de bits, sem tocar no dicionário nem no banco. Um "talvez" é confirmado no
+dicionário, então falsos positivos do filtro nunca derrubam um token válido.
+
+O filtro não remove itens: a compactação descarta os jti já expirados e
+reconstrói o filtro a partir dos que sobraram.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from . import metricas
+
+
+class FiltroBloom:
+    def __init__(self, num_bits: int, num_hashes: int) -> None:
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._bits = bytearray((num_bits + 7) // 8)
+
+    def _posicoes(self, item: str):
+        resumo = hashlib.blake2b(item.encode(), digest_size=4 * self.num_hashes).digest()
+        for i in range(self.num_hashes):
+            yield int.from_bytes(resumo[4 * i : 4 * i + 4], "big") % self.num_bits
+
+    def adicionar(self, item: str) -> None:
+        for posicao in self._posicoes(item):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+
+    def talvez_contem(self, item: str) -> bool:
+        return all(
+            self._bits[posicao >> 3] & (1 << (posicao & 7))
+            for posicao in self._posicoes(item)
+        )
+
+
+class RegistroRevogacao:
+    def __init__(self, num_bits: int, num_hashes: int) -> None:
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._revogados: Dict[str, float] = {}
+        self._filtro = FiltroBloom(num_bits, num_hashes)
+        self._lock = threading.Lock()
+        self.confirmados = metricas.Contador(
+            "frotanext_tokens_revogados_bloqueados_total",
+            "Tokens recusados por estarem na lista de revogação.",
+        )
+        self.falsos_positivos = metricas.Contador(
+            "frotanext_revogacao_falsos_positivos_total",
+            "Consultas em que o filtro de Bloom indicou revogação inexistente.",
+        )
+
+    def __len__(self) -> int:
+        return len(self._revogados)
+
+    def revogar(self, jti: str, expira_em: float) -> None:
+        with self._lock:
+            self._revogados[jti] = expira_em
+            self._filtro.adicionar(jti)
+
+    def esta_revogado(self, jti: Optional[str]) -> bool:
+        if jti is None or not self._filtro.talvez_contem(jti):
+            return False
+        if jti in self._revogados:
+            self.confirmados.inc()
+            return True
+        self.falsos_positivos.inc()
+        return False
+
+    def _reconstruir(self, revogados: Dict[str, float]) -> None:
+        filtro = FiltroBloom(self.num_bits, self.num_hashes)
+        for jti in revogados:
+            filtro.adicionar(jti)
+        self._revogados = revogados
+        self._filtro = filtro
+
+    def mesclar(self, revogados: Iterable[Tuple[str, float]]) -> None:
+        """
+        Acrescenta as revogações lidas do banco (feitas por outras instâncias).
+        Revogação nunca é desfeita, então mesclar não perde nada registrado
+        localmente durante a leitura.
+        """
+        with self._lock:
+            for jti, expira_em in revogados:
+                if jti not in self._revogados:
+                    self._revogados[jti] = expira_em
+                    self._filtro.adicionar(jti)
+
+    def compactar(self, agora: Optional[float] = None) -> int:
+        """Descarta os jti já expirados e reconstrói o filtro. Retorna quantos saíram."""
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            restantes = {
+                jti: expira_em
+                for jti, expira_em in self._revogados.items()
+                if expira_em > agora
+            }
+            removidos = len(self._revogados) - len(restantes)
+            if removidos:
+                self._reconstruir(restantes)
+        return removidos
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._reconstruir({})
+
+
+registro_revogacao = RegistroRevogacao(
+    num_bits=int(os.getenv("REVOGACAO_BLOOM_BITS", str(1 << 20))),
+    num_hashes=int(os.getenv("REVOGACAO_BLOOM_HASHES", "4")),
+)
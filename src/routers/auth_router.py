@@ -1,31 +1,61 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi.security import  OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .. import limitador_login
 from .. import models
+from .. import principais
 from .. import seguranca as seguranca_service
-from ..dependencies import oauth2_scheme_funcionario, obter_sessao_banco
+from ..database import executar_servico
+from ..dependencies import (
+    oauth2_scheme_funcionario,
+    obter_sessao_banco,
+    obter_sessao_leitura,
+    verificar_chave_servico,
+)
+from ..principais import PrincipalFuncionario
 from ..schemas import auth_schema
-from ..services import auth_service
+from ..services import (
+    auth_service,
+    introspeccao_service,
+    revogacao_service,
+    token_renovacao_service,
+)
 
 router = APIRouter(prefix="/auth", tags=["Autenticação e Funcionários"])
 
 
+def _criar_token_acesso_funcionario(funcionario) -> str:
+    dados_token = {
+        "sub": funcionario.email,
+        "id_funcionario": funcionario.id_funcionario,
+    }
+    return seguranca_service.criar_token_acesso(dados=dados_token)
+
+
 @router.post("/token", response_model=auth_schema.SchemaToken)
-def rota_login_para_token(
+async def rota_login_para_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    tarefas_segundo_plano: BackgroundTasks,
+    request: Request,
 ):
     """
     Endpoint de login. Recebe um formulário com 'username' (nosso email)
-    e 'password'. Retorna um token de acesso.
+    e 'password'. Retorna um token de acesso e um refresh token.
     """
-    funcionario_autenticado = auth_service.autenticar_funcionario(
+    limitador_login.verificar_tentativa_login(
+        email=form_data.username,
+        ip=request.client.host if request.client else None,
+    )
+
+    funcionario_autenticado = await auth_service.autenticar_funcionario_async(
         sessao_banco=sessao_banco,
         email_formulario=form_data.username,
         senha_formulario=form_data.password,
+        tarefas_segundo_plano=tarefas_segundo_plano,
     )
 
     if not funcionario_autenticado:
@@ -35,17 +65,99 @@ def rota_login_para_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    dados_token = {"sub": funcionario_autenticado.email}
+    token_acesso = _criar_token_acesso_funcionario(funcionario_autenticado)
+    token_renovacao = await executar_servico(
+        sessao_banco,
+        token_renovacao_service.emitir_token_renovacao,
+        tipo_sujeito=token_renovacao_service.SUJEITO_FUNCIONARIO,
+        id_sujeito=funcionario_autenticado.id_funcionario,
+    )
 
-    token_acesso = seguranca_service.criar_token_acesso(dados=dados_token)
+    return {
+        "access_token": token_acesso,
+        "token_type": "bearer",
+        "refresh_token": token_renovacao,
+    }
 
-    return {"access_token": token_acesso, "token_type": "bearer"}
+
+@router.post("/token/renovar", response_model=auth_schema.SchemaToken)
+async def rota_renovar_token(
+    dados_renovacao: auth_schema.SchemaRenovarToken,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+):
+    """
+    Troca um refresh token válido por um novo par de tokens, sem senha.
+    Cada refresh token só pode ser usado uma vez.
+    """
+    funcionario, token_renovacao = await executar_servico(
+        sessao_banco,
+        token_renovacao_service.renovar_token_funcionario,
+        token=dados_renovacao.refresh_token,
+    )
+
+    return {
+        "access_token": _criar_token_acesso_funcionario(funcionario),
+        "token_type": "bearer",
+        "refresh_token": token_renovacao,
+    }
 
 
-def obter_funcionario_atual(
+@router.post(
+    "/introspect",
+    response_model=auth_schema.SchemaIntrospeccaoResposta,
+    summary="Valida vários tokens de uma vez (uso entre serviços)",
+)
+async def rota_introspeccao_tokens(
+    dados_introspeccao: auth_schema.SchemaIntrospeccaoEntrada,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_leitura)],
+    _chave_servico: Annotated[None, Depends(verificar_chave_servico)],
+):
+    """
+    Recebe uma lista de tokens (de clientes ou funcionários) e devolve, na
+    mesma ordem, se cada um está ativo e as suas claims. Exige o cabeçalho
+    'X-Chave-Servico'.
+    """
+    resultados = await executar_servico(
+        sessao_banco,
+        introspeccao_service.introspectar_tokens,
+        tokens=dados_introspeccao.tokens,
+    )
+    return {"resultados": resultados}
+
+
+async def _carregar_principal_funcionario(
+    sessao_banco: AsyncSession, payload: dict
+) -> Optional[PrincipalFuncionario]:
+    id_funcionario = payload.get("id_funcionario")
+    if isinstance(id_funcionario, int):
+        principal = principais.cache_funcionarios.obter(id_funcionario)
+        if principal is not None:
+            return principal
+        funcionario = await sessao_banco.get(models.Funcionario, id_funcionario)
+    else:
+        email: str = payload.get("sub")
+        if email is None:
+            return None
+        funcionario = await executar_servico(
+            sessao_banco, auth_service.buscar_funcionario_por_email, email=email
+        )
+
+    if funcionario is None:
+        return None
+
+    principal = principais.principal_de_funcionario(funcionario)
+    principais.cache_funcionarios.guardar(principal.id_funcionario, principal)
+    return principal
+
+
+async def obter_funcionario_atual(
     token: Annotated[str, Depends(oauth2_scheme_funcionario)],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-) -> models.Funcionario:
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+) -> PrincipalFuncionario:
+    """
+    Resolve o funcionário logado. Tokens com 'id_funcionario' são atendidos
+    pelo cache de principais; tokens antigos (só com o email) consultam o banco.
+    """
     credenciais_excecao = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais.",
@@ -56,11 +168,7 @@ def obter_funcionario_atual(
     if payload is None:
         raise credenciais_excecao
 
-    email: str = payload.get("sub")
-    if email is None:
-        raise credenciais_excecao
-
-    funcionario = auth_service.buscar_funcionario_por_email(sessao_banco, email=email)
+    funcionario = await _carregar_principal_funcionario(sessao_banco, payload)
     if funcionario is None:
         raise credenciais_excecao
 
@@ -71,8 +179,8 @@ def obter_funcionario_atual(
 
 
 def obter_admin_atual(
-    funcionario_atual: Annotated[models.Funcionario, Depends(obter_funcionario_atual)],
-) -> models.Funcionario:
+    funcionario_atual: Annotated[PrincipalFuncionario, Depends(obter_funcionario_atual)],
+) -> PrincipalFuncionario:
     """
     Dependência que exige que o usuário logado seja um admin.
     """
@@ -84,9 +192,33 @@ def obter_admin_atual(
     return funcionario_atual
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def rota_logout_funcionario(
+    token: Annotated[str, Depends(oauth2_scheme_funcionario)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    funcionario_atual: Annotated[
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
+    ],
+    dados_logout: Optional[auth_schema.SchemaLogout] = None,
+):
+    """
+    Revoga o token usado na requisição antes do seu 'exp'. Se o corpo trouxer
+    o 'refresh_token' do login, a família dele também é revogada e a sessão
+    não pode mais ser renovada.
+    """
+    await executar_servico(
+        sessao_banco,
+        revogacao_service.encerrar_sessao,
+        payload=seguranca_service.verificar_token(token),
+        tipo_sujeito=token_renovacao_service.SUJEITO_FUNCIONARIO,
+        id_sujeito=funcionario_atual.id_funcionario,
+        token_renovacao=dados_logout.refresh_token if dados_logout else None,
+    )
+
+
 @router.get("/funcionarios/eu", response_model=auth_schema.SchemaFuncionario)
 def rota_ler_funcionario_logado(
-    funcionario_atual: Annotated[models.Funcionario, Depends(obter_funcionario_atual)],
+    funcionario_atual: Annotated[PrincipalFuncionario, Depends(obter_funcionario_atual)],
 ):
     return funcionario_atual
 
@@ -97,11 +229,17 @@ def rota_ler_funcionario_logado(
     status_code=status.HTTP_201_CREATED,
     summary="Cria um novo funcionário (Requer Admin)",
 )
-def rota_criar_funcionario(
+async def rota_criar_funcionario(
     dados_funcionario: auth_schema.SchemaFuncionarioCriar,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
-    _admin_logado: Annotated[models.Funcionario, Depends(obter_admin_atual)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    _admin_logado: Annotated[PrincipalFuncionario, Depends(obter_admin_atual)],
 ):
-    return auth_service.criar_funcionario(
-        sessao_banco=sessao_banco, dados_funcionario=dados_funcionario
+    hash_senha = await seguranca_service.obter_hash_senha_async(
+        dados_funcionario.senha_texto_puro
+    )
+    return await executar_servico(
+        sessao_banco,
+        auth_service.criar_funcionario,
+        dados_funcionario=dados_funcionario,
+        hash_senha=hash_senha,
     )
@@ -0,0 +1,22 @@
+import os
+
+from fastapi import APIRouter, Response
+
+from .. import seguranca as seguranca_service
+
+JWKS_MAX_AGE_SEGUNDOS = int(os.getenv("JWKS_MAX_AGE_SEGUNDOS", "300"))
+
+router = APIRouter(tags=["Chaves Públicas"])
+
+
+@router.get(
+    "/.well-known/jwks.json",
+    summary="Chaves públicas para validar os tokens localmente",
+)
+def rota_jwks(response: Response):
+    """
+    Publica as chaves de verificação (JWKS) para que os demais serviços
+    validem os tokens sem consultar o Auth Service a cada requisição.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_MAX_AGE_SEGUNDOS}"
+    return seguranca_service.obter_jwks()
@@ -1,26 +1,57 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from fastapi.security import  OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .. import limitador_login
 from .. import seguranca as seguranca_service
-from ..dependencies import  obter_sessao_banco
-from ..schemas import auth_schema
-from ..services import cliente_auth_service
+from ..database import executar_servico
+from ..dependencies import (
+    oauth2_scheme_cliente,
+    obter_principal_cliente,
+    obter_sessao_banco,
+)
+from ..principais import PrincipalCliente, PrincipalFuncionario
+from ..schemas import auth_schema, cliente_schema
+from ..services import (
+    cliente_auth_service,
+    cliente_service,
+    revogacao_service,
+    token_renovacao_service,
+)
+from .auth_router import obter_funcionario_atual
 
 router = APIRouter(prefix="/clientes", tags=["Autenticação - Clientes"])
 
 
+def _criar_token_acesso_cliente(cliente) -> str:
+    dados_token = {
+        "sub": str(cliente.id_pessoa),
+        "email": cliente.email,
+        "tipo": cliente.tipo_pessoa,
+        "ver": cliente.token_version,
+    }
+    return seguranca_service.criar_token_acesso(dados=dados_token)
+
+
 @router.post("/token", response_model=auth_schema.SchemaToken)
-def rota_login_cliente_para_token(
+async def rota_login_cliente_para_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    tarefas_segundo_plano: BackgroundTasks,
+    request: Request,
 ):
-    cliente_autenticado = cliente_auth_service.autenticar_cliente(
+    limitador_login.verificar_tentativa_login(
+        email=form_data.username,
+        ip=request.client.host if request.client else None,
+    )
+
+    cliente_autenticado = await cliente_auth_service.autenticar_cliente_async(
         sessao_banco=sessao_banco,
         email_formulario=form_data.username,
         senha_formulario=form_data.password,
+        tarefas_segundo_plano=tarefas_segundo_plano,
     )
 
     if not cliente_autenticado:
@@ -30,12 +61,86 @@ def rota_login_cliente_para_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    dados_token = {
-        "sub": str(cliente_autenticado.id_pessoa),
-        "email": cliente_autenticado.email,
-        "tipo": cliente_autenticado.tipo_pessoa,
+    token_acesso = _criar_token_acesso_cliente(cliente_autenticado)
+    token_renovacao = await executar_servico(
+        sessao_banco,
+        token_renovacao_service.emitir_token_renovacao,
+        tipo_sujeito=token_renovacao_service.SUJEITO_CLIENTE,
+        id_sujeito=cliente_autenticado.id_pessoa,
+        versao_sujeito=cliente_autenticado.token_version,
+    )
+
+    return {
+        "access_token": token_acesso,
+        "token_type": "bearer",
+        "refresh_token": token_renovacao,
+    }
+
+
+@router.post("/token/renovar", response_model=auth_schema.SchemaToken)
+async def rota_renovar_token_cliente(
+    dados_renovacao: auth_schema.SchemaRenovarToken,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+):
+    """
+    Troca um refresh token válido por um novo par de tokens, sem senha.
+    Cada refresh token só pode ser usado uma vez.
+    """
+    cliente, token_renovacao = await executar_servico(
+        sessao_banco,
+        token_renovacao_service.renovar_token_cliente,
+        token=dados_renovacao.refresh_token,
+    )
+
+    return {
+        "access_token": _criar_token_acesso_cliente(cliente),
+        "token_type": "bearer",
+        "refresh_token": token_renovacao,
     }
 
-    token_acesso = seguranca_service.criar_token_acesso(dados=dados_token)
 
-    return {"access_token": token_acesso, "token_type": "bearer"}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def rota_logout_cliente(
+    token: Annotated[str, Depends(oauth2_scheme_cliente)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    cliente_atual: Annotated[PrincipalCliente, Depends(obter_principal_cliente)],
+    dados_logout: Optional[auth_schema.SchemaLogout] = None,
+):
+    """
+    Revoga o token usado na requisição antes do seu 'exp'. Se o corpo trouxer
+    o 'refresh_token' do login, a família dele também é revogada e a sessão
+    não pode mais ser renovada.
+    """
+    await executar_servico(
+        sessao_banco,
+        revogacao_service.encerrar_sessao,
+        payload=seguranca_service.verificar_token(token),
+        tipo_sujeito=token_renovacao_service.SUJEITO_CLIENTE,
+        id_sujeito=cliente_atual.id_pessoa,
+        token_renovacao=dados_logout.refresh_token if dados_logout else None,
+    )
+
+
+@router.patch(
+    "/{id_pessoa}/status",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Ativa ou desativa um cliente por ID (Requer Funcionário)",
+)
+async def rota_alterar_status_cliente(
+    id_pessoa: int,
+    dados_status: cliente_schema.SchemaStatusCliente,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
+    ],
+):
+    """
+    Desativar a conta derruba os tokens de acesso e de renovação já emitidos.
+    """
+    await executar_servico(
+        sessao_banco,
+        cliente_service.alterar_status_cliente,
+        id_pessoa=id_pessoa,
+        e_ativo=dados_status.e_ativo,
+    )
@@ -1,23 +1,37 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models
-from ..dependencies import obter_cliente_atual, obter_sessao_banco
+from ..database import executar_servico
+from ..dependencies import (
+    obter_principal_cliente,
+    obter_sessao_banco,
+    prefere_resposta_minima,
+)
+from ..principais import PrincipalCliente
 from ..schemas import cliente_schema
 from ..services import cliente_service
 
 
-def obter_pj_logada(
-    cliente_logado: Annotated[models.Pessoa, Depends(obter_cliente_atual)],
+async def obter_pj_logada(
+    principal: Annotated[PrincipalCliente, Depends(obter_principal_cliente)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
 ) -> models.PessoaJuridica:
-    if not isinstance(cliente_logado, models.PessoaJuridica):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado: Esta ação é permitida apenas para Pessoas Jurídicas.",
-        )
-    return cliente_logado
+    acesso_negado = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Acesso negado: Esta ação é permitida apenas para Pessoas Jurídicas.",
+    )
+    if principal.tipo_pessoa != "pessoa_juridica":
+        raise acesso_negado
+
+    # Só a empresa: a frota é lida pelas rotas que a devolvem, depois de
+    # alterada, e nunca pela alteração em lote.
+    empresa_logada = await sessao_banco.get(models.PessoaJuridica, principal.id_pessoa)
+    if empresa_logada is None:
+        raise acesso_negado
+    return empresa_logada
 
 
 router = APIRouter(
@@ -27,37 +41,110 @@ router = APIRouter(
 )
 
 
+_RESPOSTA_MINIMA = {
+    status.HTTP_204_NO_CONTENT: {
+        "description": "Alteração feita, sem corpo ('Prefer: return=minimal')."
+    }
+}
+
+
+def _resposta_minima() -> Response:
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Preference-Applied": "return=minimal"},
+    )
+
+
+@router.get(
+    "/motoristas",
+    response_model=cliente_schema.SchemaPaginaPessoasFisicas,
+    summary="Lista os motoristas da empresa logada, paginados",
+)
+async def rota_listar_motoristas_empresa(
+    filtros: Annotated[cliente_schema.SchemaFiltroClientes, Query()],
+    empresa_logada: Annotated[models.PessoaJuridica, Depends(obter_pj_logada)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+):
+    pagina = await executar_servico(
+        sessao_banco,
+        cliente_service.listar_motoristas_empresa,
+        empresa_logada=empresa_logada,
+        filtros=filtros,
+        esquema=cliente_schema.SchemaPaginaPessoasFisicas,
+    )
+    return pagina
+
+
 @router.post(
     "/motoristas",
     response_model=cliente_schema.SchemaPessoaJuridica,
+    responses=_RESPOSTA_MINIMA,
     summary="Adiciona um motorista à empresa logada",
 )
-def rota_adicionar_motorista_empresa(
+async def rota_adicionar_motorista_empresa(
     dados_associacao: cliente_schema.SchemaMotoristaAssociar,
     empresa_logada: Annotated[models.PessoaJuridica, Depends(obter_pj_logada)],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    resposta_minima: Annotated[bool, Depends(prefere_resposta_minima)],
 ):
-    empresa_atualizada = cliente_service.adicionar_motorista_empresa(
+    """
+    Responde com a empresa e toda a frota; com 'Prefer: return=minimal',
+    responde 204 sem ler a frota (ela fica em 'GET /minha-empresa/motoristas').
+    """
+    empresa_atualizada = await executar_servico(
+        sessao_banco,
+        cliente_service.adicionar_motorista_empresa,
         empresa_logada=empresa_logada,
         id_motorista_adicionar=dados_associacao.id_pessoa_fisica,
-        sessao_banco=sessao_banco,
+        recarregar_empresa=not resposta_minima,
+        esquema=cliente_schema.SchemaPessoaJuridica,
     )
+    if resposta_minima:
+        return _resposta_minima()
     return empresa_atualizada
 
 
+@router.patch(
+    "/motoristas",
+    response_model=cliente_schema.SchemaResultadoMotoristasLote,
+    summary="Adiciona e remove motoristas da empresa logada em lote",
+)
+async def rota_atualizar_motoristas_empresa(
+    dados_lote: cliente_schema.SchemaMotoristasLote,
+    empresa_logada: Annotated[models.PessoaJuridica, Depends(obter_pj_logada)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+):
+    resultado = await executar_servico(
+        sessao_banco,
+        cliente_service.atualizar_motoristas_empresa,
+        empresa_logada=empresa_logada,
+        dados_lote=dados_lote,
+        esquema=cliente_schema.SchemaResultadoMotoristasLote,
+    )
+    return resultado
+
+
 @router.delete(
     "/motoristas/{id_motorista}",
     response_model=cliente_schema.SchemaPessoaJuridica,
+    responses=_RESPOSTA_MINIMA,
     summary="Remove um motorista da empresa logada",
 )
-def rota_remover_motorista_empresa(
+async def rota_remover_motorista_empresa(
     id_motorista: int,
     empresa_logada: Annotated[models.PessoaJuridica, Depends(obter_pj_logada)],
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    resposta_minima: Annotated[bool, Depends(prefere_resposta_minima)],
 ):
-    empresa_atualizada = cliente_service.remover_motorista_empresa(
+    """Como a adição: com 'Prefer: return=minimal', 204 sem ler a frota."""
+    empresa_atualizada = await executar_servico(
+        sessao_banco,
+        cliente_service.remover_motorista_empresa,
         empresa_logada=empresa_logada,
         id_motorista_remover=id_motorista,
-        sessao_banco=sessao_banco,
+        recarregar_empresa=not resposta_minima,
+        esquema=cliente_schema.SchemaPessoaJuridica,
     )
+    if resposta_minima:
+        return _resposta_minima()
     return empresa_atualizada
@@ -1,12 +1,15 @@
-from typing import Annotated, List
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .. import models
+from .. import seguranca as seguranca_service
+from ..database import executar_servico
 from ..dependencies import obter_sessao_banco
+from ..principais import PrincipalFuncionario
 from ..schemas import cliente_schema
-from ..services import cliente_service
+from ..services import cliente_service, exportacao_service, importacao_service
 from .auth_router import obter_funcionario_atual
 
 router = APIRouter(
@@ -20,29 +23,100 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="Cadastra um novo cliente Pessoa Física (Auto-cadastro)",
 )
-def rota_criar_pessoa_fisica(
+async def rota_criar_pessoa_fisica(
     dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
 ):
-    cliente_criado = cliente_service.criar_pessoa_fisica(
-        dados_entrada_cliente=dados_entrada_cliente, sessao_banco=sessao_banco
+    await executar_servico(
+        sessao_banco,
+        cliente_service.verificar_chaves_livres,
+        email=dados_entrada_cliente.email,
+        cpf=dados_entrada_cliente.cpf,
+        cnh=dados_entrada_cliente.cnh,
+    )
+    # Devolve a conexão ao pool enquanto o hash é calculado.
+    await sessao_banco.commit()
+
+    hash_senha = await seguranca_service.obter_hash_senha_async(
+        dados_entrada_cliente.senha_texto_puro
+    )
+    cliente_criado = await executar_servico(
+        sessao_banco,
+        cliente_service.criar_pessoa_fisica,
+        dados_entrada_cliente=dados_entrada_cliente,
+        hash_senha=hash_senha,
+        esquema=cliente_schema.SchemaPessoaFisica,
     )
     return cliente_criado
 
 
 @router.get(
     "/",
-    response_model=List[cliente_schema.SchemaPessoaFisica],
-    summary="Lista todas as Pessoas Físicas (Requer Funcionário)",
+    response_model=cliente_schema.SchemaPaginaPessoasFisicas,
+    summary="Lista as Pessoas Físicas, paginadas e filtradas (Requer Funcionário)",
+)
+async def rota_listar_pessoas_fisicas(
+    filtros: Annotated[cliente_schema.SchemaFiltroClientes, Query()],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
+    ],
+):
+    """
+    Lista paginada por cursor: a resposta traz até 'limit' itens e o
+    'next_cursor' para a página seguinte (nulo na última).
+    """
+    pagina = await executar_servico(
+        sessao_banco,
+        cliente_service.listar_pessoas_fisicas,
+        filtros=filtros,
+        esquema=cliente_schema.SchemaPaginaPessoasFisicas,
+    )
+    return pagina
+
+
+@router.get(
+    "/exportar",
+    response_class=StreamingResponse,
+    summary="Exporta todas as Pessoas Físicas em NDJSON ou CSV (Requer Funcionário)",
 )
-def rota_listar_pessoas_fisicas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+async def rota_exportar_pessoas_fisicas(
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
+    formato: Literal["ndjson", "csv"] = "ndjson",
 ):
-    lista_clientes = cliente_service.listar_pessoas_fisicas(sessao_banco=sessao_banco)
-    return lista_clientes
+    return StreamingResponse(
+        exportacao_service.exportar_pessoas_fisicas(formato),
+        media_type=exportacao_service.FORMATOS[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="pessoas_fisicas.{formato}"'
+        },
+    )
+
+
+@router.post(
+    "/importar",
+    response_model=cliente_schema.SchemaResultadoImportacao,
+    summary="Importa Pessoas Físicas em lote, de JSON ou CSV (Requer Funcionário)",
+)
+async def rota_importar_pessoas_fisicas(
+    request: Request,
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
+    ],
+):
+    """
+    Corpo 'application/json' (lista no formato do cadastro individual) ou
+    'text/csv' (uma coluna por campo, com o endereço nas colunas 'endereco_*',
+    como na exportação). Os registros com erro voltam em 'erros', pela
+    posição no lote; os demais são cadastrados.
+    """
+    resultado = await importacao_service.importar_pessoas_fisicas(
+        sessao_banco, await request.body(), request.headers.get("content-type", "")
+    )
+    return resultado
 
 
 @router.get(
@@ -50,15 +124,18 @@ def rota_listar_pessoas_fisicas(
     response_model=cliente_schema.SchemaPessoaFisica,
     summary="Busca Pessoa Física por ID (Requer Funcionário)",
 )
-def rota_buscar_pessoa_fisica_por_id(
+async def rota_buscar_pessoa_fisica_por_id(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    cliente = cliente_service.buscar_pessoa_fisica_por_id(
-        id_pessoa=id_pessoa, sessao_banco=sessao_banco
+    cliente = await executar_servico(
+        sessao_banco,
+        cliente_service.buscar_pessoa_fisica_por_id,
+        id_pessoa=id_pessoa,
+        esquema=cliente_schema.SchemaPessoaFisica,
     )
     return cliente
 
@@ -68,18 +145,20 @@ def rota_buscar_pessoa_fisica_por_id(
     response_model=cliente_schema.SchemaPessoaFisica,
     summary="Atualiza Pessoa Física por ID (Requer Funcionário)",
 )
-def rota_atualizar_pessoa_fisica(
+async def rota_atualizar_pessoa_fisica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaFisicaCriar,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    cliente_atualizado = cliente_service.atualizar_pessoa_fisica(
+    cliente_atualizado = await executar_servico(
+        sessao_banco,
+        cliente_service.atualizar_pessoa_fisica,
         id_pessoa=id_pessoa,
         dados_atualizacao=dados_atualizacao,
-        sessao_banco=sessao_banco,
+        esquema=cliente_schema.SchemaPessoaFisica,
     )
     return cliente_atualizado
 
@@ -89,13 +168,15 @@ def rota_atualizar_pessoa_fisica(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Deleta Pessoa Física por ID (Requer Funcionário)",
 )
-def rota_deletar_pessoa_fisica(
+async def rota_deletar_pessoa_fisica(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    cliente_service.deletar_pessoa_fisica(
-        id_pessoa=id_pessoa, sessao_banco=sessao_banco
+    await executar_servico(
+        sessao_banco,
+        cliente_service.deletar_pessoa_fisica,
+        id_pessoa=id_pessoa,
     )
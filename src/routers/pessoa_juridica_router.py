@@ -1,12 +1,15 @@
-from typing import Annotated, List
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .. import models
+from .. import seguranca as seguranca_service
+from ..database import executar_servico
 from ..dependencies import obter_sessao_banco
+from ..principais import PrincipalFuncionario
 from ..schemas import cliente_schema
-from ..services import cliente_service
+from ..services import cliente_service, exportacao_service
 from .auth_router import obter_funcionario_atual
 
 
@@ -21,29 +24,75 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="Cadastra um novo cliente Pessoa Jurídica (Auto-cadastro)",
 )
-def rota_criar_pessoa_juridica(
+async def rota_criar_pessoa_juridica(
     dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
 ):
-    empresa_criada = cliente_service.criar_pessoa_juridica(
-        dados_entrada_empresa=dados_entrada_empresa, sessao_banco=sessao_banco
+    await executar_servico(
+        sessao_banco,
+        cliente_service.verificar_chaves_livres,
+        email=dados_entrada_empresa.email,
+        cnpj=dados_entrada_empresa.cnpj,
+    )
+    # Devolve a conexão ao pool enquanto o hash é calculado.
+    await sessao_banco.commit()
+
+    hash_senha = await seguranca_service.obter_hash_senha_async(
+        dados_entrada_empresa.senha_texto_puro
+    )
+    empresa_criada = await executar_servico(
+        sessao_banco,
+        cliente_service.criar_pessoa_juridica,
+        dados_entrada_empresa=dados_entrada_empresa,
+        hash_senha=hash_senha,
+        esquema=cliente_schema.SchemaPessoaJuridica,
     )
     return empresa_criada
 
 
 @router.get(
     "/",
-    response_model=List[cliente_schema.SchemaPessoaJuridica],
-    summary="Lista todas as Pessoas Jurídicas (Requer Funcionário)",
+    response_model=cliente_schema.SchemaPaginaPessoasJuridicas,
+    summary="Lista as Pessoas Jurídicas, paginadas e filtradas (Requer Funcionário)",
+)
+async def rota_listar_pessoas_juridicas(
+    filtros: Annotated[cliente_schema.SchemaFiltroClientes, Query()],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
+    _funcionario_logado: Annotated[
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
+    ],
+):
+    """
+    Lista paginada por cursor: a resposta traz até 'limit' itens e o
+    'next_cursor' para a página seguinte (nulo na última).
+    """
+    pagina = await executar_servico(
+        sessao_banco,
+        cliente_service.listar_pessoas_juridicas,
+        filtros=filtros,
+        esquema=cliente_schema.SchemaPaginaPessoasJuridicas,
+    )
+    return pagina
+
+
+@router.get(
+    "/exportar",
+    response_class=StreamingResponse,
+    summary="Exporta todas as Pessoas Jurídicas em NDJSON ou CSV (Requer Funcionário)",
 )
-def rota_listar_pessoas_juridicas(
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+async def rota_exportar_pessoas_juridicas(
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
+    formato: Literal["ndjson", "csv"] = "ndjson",
 ):
-    lista_empresas = cliente_service.listar_pessoas_juridicas(sessao_banco=sessao_banco)
-    return lista_empresas
+    return StreamingResponse(
+        exportacao_service.exportar_pessoas_juridicas(formato),
+        media_type=exportacao_service.FORMATOS[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="pessoas_juridicas.{formato}"'
+        },
+    )
 
 
 @router.get(
@@ -51,15 +100,18 @@ def rota_listar_pessoas_juridicas(
     response_model=cliente_schema.SchemaPessoaJuridica,
     summary="Busca Pessoa Jurídica por ID (Requer Funcionário)",
 )
-def rota_buscar_pessoa_juridica_por_id(
+async def rota_buscar_pessoa_juridica_por_id(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    empresa = cliente_service.buscar_pessoa_juridica_por_id(
-        id_pessoa=id_pessoa, sessao_banco=sessao_banco
+    empresa = await executar_servico(
+        sessao_banco,
+        cliente_service.buscar_pessoa_juridica_por_id,
+        id_pessoa=id_pessoa,
+        esquema=cliente_schema.SchemaPessoaJuridica,
     )
     return empresa
 
@@ -69,18 +121,20 @@ def rota_buscar_pessoa_juridica_por_id(
     response_model=cliente_schema.SchemaPessoaJuridica,
     summary="Atualiza Pessoa Jurídica por ID (Requer Funcionário)",
 )
-def rota_atualizar_pessoa_juridica(
+async def rota_atualizar_pessoa_juridica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaJuridicaCriar,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    empresa_atualizada = cliente_service.atualizar_pessoa_juridica(
+    empresa_atualizada = await executar_servico(
+        sessao_banco,
+        cliente_service.atualizar_pessoa_juridica,
         id_pessoa=id_pessoa,
         dados_atualizacao=dados_atualizacao,
-        sessao_banco=sessao_banco,
+        esquema=cliente_schema.SchemaPessoaJuridica,
     )
     return empresa_atualizada
 
@@ -90,13 +144,15 @@ def rota_atualizar_pessoa_juridica(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Deleta Pessoa Jurídica por ID (Requer Funcionário)",
 )
-def rota_deletar_pessoa_juridica(
+async def rota_deletar_pessoa_juridica(
     id_pessoa: int,
-    sessao_banco: Annotated[Session, Depends(obter_sessao_banco)],
+    sessao_banco: Annotated[AsyncSession, Depends(obter_sessao_banco)],
     _funcionario_logado: Annotated[
-        models.Funcionario, Depends(obter_funcionario_atual)
+        PrincipalFuncionario, Depends(obter_funcionario_atual)
     ],
 ):
-    cliente_service.deletar_pessoa_juridica(
-        id_pessoa=id_pessoa, sessao_banco=sessao_banco
+    await executar_servico(
+        sessao_banco,
+        cliente_service.deletar_pessoa_juridica,
+        id_pessoa=id_pessoa,
     )
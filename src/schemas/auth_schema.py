@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class SchemaFuncionarioBase(BaseModel):
@@ -27,9 +29,43 @@ class SchemaToken(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class SchemaRenovarToken(BaseModel):
+    """Schema para ENTRADA do endpoint de renovação de token."""
+
+    refresh_token: str
+
+
+class SchemaLogout(BaseModel):
+    """Schema para ENTRADA (opcional) do endpoint de logout."""
+
+    refresh_token: Optional[str] = Field(
+        default=None,
+        description="Refresh token do login; a família dele também é revogada.",
+    )
 
 
 class SchemaTokenPayload(BaseModel):
     """Schema para os dados (payload) dentro do token JWT."""
 
     sub: str
+
+
+class SchemaIntrospeccaoEntrada(BaseModel):
+    """Schema para ENTRADA da introspecção de tokens em lote."""
+
+    tokens: List[str] = Field(min_length=1, max_length=500)
+
+
+class SchemaIntrospeccaoItem(BaseModel):
+    active: bool
+    tipo_sujeito: Optional[str] = None
+    claims: Optional[dict] = None
+
+
+class SchemaIntrospeccaoResposta(BaseModel):
+    """Schema para SAÍDA da introspecção, na mesma ordem dos tokens enviados."""
+
+    resultados: List[SchemaIntrospeccaoItem]
@@ -1,6 +1,9 @@
+from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+
+from ..filtro_ids import MAX_IDS_POR_LISTA
 
 
 class SchemaEnderecoBase(BaseModel):
@@ -43,7 +46,7 @@ class SchemaPessoaFisica(BaseModel):
     cpf: str
     cnh: str
 
-    endereco: SchemaEndereco
+    endereco: Optional[SchemaEndereco] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -57,7 +60,9 @@ class SchemaPessoaJuridicaCriar(BaseModel):
     senha_texto_puro: str = Field(..., min_length=8)
     endereco: SchemaEnderecoBase
 
-    motoristas_ids: Optional[List[int]] = Field(default=None)
+    motoristas_ids: Optional[List[int]] = Field(
+        default=None, max_length=MAX_IDS_POR_LISTA
+    )
 
 
 class SchemaPessoaJuridica(BaseModel):
@@ -67,14 +72,75 @@ class SchemaPessoaJuridica(BaseModel):
     razao_social: str
     cnpj: str
 
-    endereco: SchemaEndereco
+    endereco: Optional[SchemaEndereco] = None
 
     motoristas: List[SchemaPessoaFisica] = []
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class SchemaFiltroClientes(BaseModel):
+    limit: int = Field(default=50, ge=1, le=500)
+    cursor: Optional[str] = Field(
+        default=None, description="'next_cursor' devolvido pela página anterior."
+    )
+    e_ativo: Optional[bool] = None
+    cidade: Optional[str] = None
+    estado: Optional[str] = None
+    data_criacao_de: Optional[datetime] = None
+    data_criacao_ate: Optional[datetime] = None
+
+
+class SchemaStatusCliente(BaseModel):
+    e_ativo: bool = Field(
+        ..., description="False bloqueia a conta e derruba os tokens já emitidos."
+    )
+
+
+class SchemaPaginaPessoasFisicas(BaseModel):
+    itens: List[SchemaPessoaFisica]
+    next_cursor: Optional[str] = None
+
+
+class SchemaPaginaPessoasJuridicas(BaseModel):
+    itens: List[SchemaPessoaJuridica]
+    next_cursor: Optional[str] = None
+
+
+class SchemaErroImportacao(BaseModel):
+    linha: int = Field(..., description="Posição do registro (1 = primeiro).")
+    erros: List[str]
+
+
+class SchemaResultadoImportacao(BaseModel):
+    importados: int
+    ids: List[int] = Field(
+        ..., description="Ids criados, na ordem dos registros importados."
+    )
+    erros: List[SchemaErroImportacao]
+
+
 class SchemaMotoristaAssociar(BaseModel):
     id_pessoa_fisica: int = Field(
         ..., description="ID da Pessoa Física (motorista) a ser associada."
     )
+
+
+class SchemaMotoristasLote(BaseModel):
+    adicionar: List[int] = Field(default_factory=list, max_length=MAX_IDS_POR_LISTA)
+    remover: List[int] = Field(default_factory=list, max_length=MAX_IDS_POR_LISTA)
+
+    @model_validator(mode="after")
+    def _listas_disjuntas(self):
+        if set(self.adicionar) & set(self.remover):
+            raise ValueError("Um motorista não pode ser adicionado e removido juntos.")
+        return self
+
+
+class SchemaResultadoMotoristasLote(BaseModel):
+    adicionados: int
+    removidos: int
+    recusados: List[int] = Field(
+        ...,
+        description="Ids inexistentes, de outra empresa ou (na remoção) fora da empresa.",
+    )
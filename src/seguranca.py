@@ -1,11 +1,44 @@
+import asyncio
+import hashlib
 import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, List, Optional
 
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from . import chaves_jwt
+from .admissao import ControleAdmissao, HashSobrecarregado
+from .cache import CacheTTL
+from .revogacao import registro_revogacao
+
+
+def _parametros_argon2() -> dict:
+    """
+    Lê os custos do argon2 do ambiente (ver 'python -m src.calibrar_argon2').
+    'min_rounds' acompanha o time_cost para que hashes mais fracos sejam
+    marcados por 'needs_update'; memory_cost já é comparado pelo passlib.
+    """
+    parametros = {}
+    time_cost = os.getenv("ARGON2_TIME_COST")
+    if time_cost:
+        parametros["argon2__rounds"] = int(time_cost)
+        parametros["argon2__min_rounds"] = int(time_cost)
+    memory_cost = os.getenv("ARGON2_MEMORY_COST")
+    if memory_cost:
+        parametros["argon2__memory_cost"] = int(memory_cost)
+    parallelism = os.getenv("ARGON2_PARALLELISM")
+    if parallelism:
+        parametros["argon2__parallelism"] = int(parallelism)
+    return parametros
+
+
+pwd_context = CryptContext(
+    schemes=["argon2"], deprecated="auto", **_parametros_argon2()
+)
 
 
 def verificar_senha(senha_texto_puro: str, senha_hashada: str) -> bool:
@@ -19,14 +52,143 @@ def obter_hash_senha(senha: str) -> str:
     return pwd_context.hash(senha)
 
 
+def obter_hashes_senhas(senhas: List[str]) -> List[str]:
+    """
+    Hash de várias senhas numa só tarefa do pool (importação em lote).
+    """
+    return [pwd_context.hash(senha) for senha in senhas]
+
+
+def senha_precisa_rehash(senha_hashada: str) -> bool:
+    """
+    Indica se o hash foi gerado com parâmetros diferentes dos atuais.
+    """
+    return pwd_context.needs_update(senha_hashada)
+
+
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+
+class ExecutorHash:
+    """
+    Pool de processos dedicado ao argon2. Tira o hashing (CPU e GIL) do
+    threadpool do Starlette, que fica livre para as demais rotas.
+    Com 0 workers as operações rodam no próprio threadpool.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._pool is not None
+
+    def iniciar(self, num_workers: Optional[int] = None) -> None:
+        workers = HASH_POOL_WORKERS if num_workers is None else num_workers
+        if self._pool is None and workers > 0:
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+
+    def encerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def executar(self, funcao: Callable, *args):
+        if self._pool is None:
+            return await run_in_threadpool(funcao, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, funcao, *args)
+
+
+executor_hash = ExecutorHash()
+
+controle_admissao_hash = ControleAdmissao(
+    max_concorrentes=int(
+        os.getenv("HASH_MAX_CONCORRENTES", str(max(HASH_POOL_WORKERS, 1)))
+    ),
+    max_fila=int(os.getenv("HASH_MAX_FILA", "64")),
+    timeout_fila_segundos=float(os.getenv("HASH_TIMEOUT_FILA_SEGUNDOS", "2.0")),
+    retry_after_segundos=int(os.getenv("HASH_RETRY_AFTER_SEGUNDOS", "1")),
+    prefixo_metricas="frotanext_hash",
+)
+
+
+async def verificar_senha_async(senha_texto_puro: str, senha_hashada: str) -> bool:
+    async with controle_admissao_hash.reservar():
+        return await executor_hash.executar(
+            verificar_senha, senha_texto_puro, senha_hashada
+        )
+
+
+async def obter_hash_senha_async(senha: str) -> str:
+    """
+    Versão assíncrona de 'obter_hash_senha', executada no pool de hashing
+    sob o controle de admissão (503 quando a fila está cheia).
+    """
+    async with controle_admissao_hash.reservar():
+        return await executor_hash.executar(obter_hash_senha, senha)
+
+
+HASH_LOTE_IMPORTACAO = int(os.getenv("HASH_LOTE_IMPORTACAO", "16"))
+
+
+async def obter_hashes_senhas_async(senhas: List[str]) -> List[str]:
+    """
+    Hashes de uma importação, na ordem de 'senhas'. As senhas vão ao pool em
+    lotes de HASH_LOTE_IMPORTACAO, no máximo um por vaga do controle de
+    admissão: todos os núcleos trabalham na importação, e um login que chega
+    no meio espera só o fim de um lote, não da importação inteira.
+    """
+    vagas = asyncio.Semaphore(controle_admissao_hash.max_concorrentes)
+
+    async def _hash_lote(lote: List[str]) -> List[str]:
+        async with vagas, controle_admissao_hash.reservar():
+            return await executor_hash.executar(obter_hashes_senhas, lote)
+
+    # No primeiro erro (ex.: HashSobrecarregado) o TaskGroup cancela os lotes
+    # restantes, que deixam de ocupar o pool por uma importação já perdida.
+    try:
+        async with asyncio.TaskGroup() as grupo:
+            tarefas = [
+                grupo.create_task(
+                    _hash_lote(senhas[inicio : inicio + HASH_LOTE_IMPORTACAO])
+                )
+                for inicio in range(0, len(senhas), HASH_LOTE_IMPORTACAO)
+            ]
+    except ExceptionGroup as erros:
+        raise erros.exceptions[0] from None
+    return [hash_senha for tarefa in tarefas for hash_senha in tarefa.result()]
+
+
+async def regravar_hash_senha(
+    senha_texto_puro: str, gravar_hash: Callable[[str], None]
+) -> None:
+    """
+    Tarefa de segundo plano do rehash no login: gera o hash com os parâmetros
+    atuais e o entrega a 'gravar_hash' no threadpool. Com o hashing
+    sobrecarregado a tarefa é descartada e o próximo login tenta de novo.
+    """
+    try:
+        hash_novo = await obter_hash_senha_async(senha_texto_puro)
+    except HashSobrecarregado:
+        return
+    await run_in_threadpool(gravar_hash, hash_novo)
+
+
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
     raise RuntimeError(
         "A variável SECRET_KEY não foi definida. A aplicação não pode iniciar."
     )
-ALGORITHM = "HS256"
+ALGORITHM = os.getenv("JWT_ALGORITMO", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Com HS* os tokens são assinados com a SECRET_KEY; com algoritmos
+# assimétricos (ES256, RS256...) usa-se o conjunto de chaves de JWT_CHAVES_DIR.
+conjunto_chaves: Optional[chaves_jwt.ConjuntoChaves] = (
+    None if ALGORITHM.startswith("HS") else chaves_jwt.carregar_do_ambiente(ALGORITHM)
+)
+
 
 def criar_token_acesso(dados: dict, expira_em: Optional[timedelta] = None):
     copia_dados = dados.copy()
@@ -38,15 +200,71 @@ def criar_token_acesso(dados: dict, expira_em: Optional[timedelta] = None):
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    copia_dados.update({"exp": horario_expiracao})
+    copia_dados.update({"exp": horario_expiracao, "jti": secrets.token_hex(12)})
 
-    token_jwt_codificado = jwt.encode(copia_dados, SECRET_KEY, algorithm=ALGORITHM)
+    if conjunto_chaves is None:
+        token_jwt_codificado = jwt.encode(
+            copia_dados, SECRET_KEY, algorithm=ALGORITHM
+        )
+    else:
+        chave = conjunto_chaves.chave_ativa
+        token_jwt_codificado = jwt.encode(
+            copia_dados,
+            chave.chave_privada_pem,
+            algorithm=chave.algoritmo,
+            headers={"kid": chave.kid},
+        )
     return token_jwt_codificado
 
 
-def verificar_token(token: str) -> Optional[dict]:
+def obter_jwks() -> dict:
+    """
+    Chaves públicas no formato JWKS. Vazio quando os tokens usam HMAC.
+    """
+    if conjunto_chaves is None:
+        return {"keys": []}
+    return conjunto_chaves.jwks()
+
+
+CACHE_TOKEN_MAX_ITENS = int(os.getenv("CACHE_TOKEN_MAX_ITENS", "10000"))
+CACHE_TOKEN_TTL_SEGUNDOS = float(os.getenv("CACHE_TOKEN_TTL_SEGUNDOS", "300"))
+
+cache_tokens = CacheTTL(
+    max_itens=CACHE_TOKEN_MAX_ITENS,
+    ttl_segundos=CACHE_TOKEN_TTL_SEGUNDOS,
+    prefixo_metricas="frotanext_cache_token",
+)
+
+
+def _decodificar_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if conjunto_chaves is None:
+            chave_verificacao = SECRET_KEY
+        else:
+            chave_verificacao = conjunto_chaves.jwk_publica(
+                jwt.get_unverified_header(token).get("kid")
+            )
+            if chave_verificacao is None:
+                return None
+        payload = jwt.decode(token, chave_verificacao, algorithms=[ALGORITHM])
         return payload
     except JWTError:
         return None
+
+
+def verificar_token(token: str) -> Optional[dict]:
+    """
+    Decodifica e valida o token. Tokens válidos ficam em cache, indexados
+    pelo digest do token, até o seu 'exp' (ou o TTL do cache, o que vier antes).
+    A lista de revogação é consultada sempre, inclusive nos acertos do cache.
+    """
+    chave = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = cache_tokens.obter(chave)
+    if payload is None:
+        payload = _decodificar_token(token)
+        if payload is None:
+            return None
+        cache_tokens.guardar(chave, payload, expira_em=payload.get("exp"))
+    if registro_revogacao.esta_revogado(payload.get("jti")):
+        return None
+    return dict(payload)
@@ -1,10 +1,15 @@
+from functools import partial
 from typing import Optional
 
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
+from .. import principais
 from .. import seguranca as seguranca_service
+from ..database import SessionLocal, executar_servico
 from ..schemas import auth_schema
 
 
@@ -13,37 +18,112 @@ def buscar_funcionario_por_email(
 ) -> Optional[models.Funcionario]:
     return (
         sessao_banco.query(models.Funcionario)
-        .filter(models.Funcionario.email == email)
+        .filter(func.lower(models.Funcionario.email) == func.lower(email))
         .first()
     )
 
 
-def autenticar_funcionario(
-    sessao_banco: Session, email_formulario: str, senha_formulario: str
-) -> Optional[models.Funcionario]:
-    funcionario_encontrado = buscar_funcionario_por_email(
-        sessao_banco, email=email_formulario
+def buscar_credenciais_funcionario(
+    sessao_banco: Session, email: str
+) -> Optional[Row]:
+    """
+    Colunas usadas pelo login, todas no índice 'ix_funcionarios_email'
+    (index-only scan), sem carregar a entidade.
+    """
+    return sessao_banco.execute(
+        select(
+            models.Funcionario.id_funcionario,
+            models.Funcionario.email,
+            models.Funcionario.senha,
+            models.Funcionario.e_ativado,
+        ).where(func.lower(models.Funcionario.email) == func.lower(email))
+    ).first()
+
+
+def _validar_funcionario_ativado(funcionario: Row) -> None:
+    if not funcionario.e_ativado:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso administrativo bloqueado.",
+        )
+
+
+def gravar_novo_hash_funcionario(
+    id_funcionario: int, hash_antigo: str, hash_novo: str
+) -> None:
+    sessao_banco = SessionLocal()
+    try:
+        sessao_banco.query(models.Funcionario).filter(
+            models.Funcionario.id_funcionario == id_funcionario,
+            models.Funcionario.senha == hash_antigo,
+        ).update({models.Funcionario.senha: hash_novo}, synchronize_session=False)
+        sessao_banco.commit()
+    finally:
+        sessao_banco.close()
+
+
+async def rehash_senha_funcionario(
+    id_funcionario: int, senha_texto_puro: str, hash_antigo: str
+) -> None:
+    await seguranca_service.regravar_hash_senha(
+        senha_texto_puro, partial(gravar_novo_hash_funcionario, id_funcionario, hash_antigo)
+    )
+
+
+def _agendar_rehash_funcionario(
+    funcionario: Row,
+    senha_texto_puro: str,
+    tarefas_segundo_plano: Optional[BackgroundTasks],
+) -> None:
+    if tarefas_segundo_plano is None:
+        return
+    if seguranca_service.senha_precisa_rehash(funcionario.senha):
+        tarefas_segundo_plano.add_task(
+            rehash_senha_funcionario,
+            funcionario.id_funcionario,
+            senha_texto_puro,
+            funcionario.senha,
+        )
+
+
+async def autenticar_funcionario_async(
+    sessao_banco: AsyncSession,
+    email_formulario: str,
+    senha_formulario: str,
+    tarefas_segundo_plano: Optional[BackgroundTasks] = None,
+) -> Optional[Row]:
+    """
+    A consulta roda na AsyncSession e a verificação argon2 no pool de hashing.
+    """
+    funcionario_encontrado = await executar_servico(
+        sessao_banco, buscar_credenciais_funcionario, email=email_formulario
     )
 
+    # Devolve a conexão ao pool enquanto o hash é verificado: a espera na
+    # fila do argon2 não pode prender uma conexão numa transação aberta.
+    await sessao_banco.commit()
+
     if not funcionario_encontrado:
         return None
 
-    if not funcionario_encontrado.e_ativado:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso administrativo bloqueado.",
-        )
+    _validar_funcionario_ativado(funcionario_encontrado)
 
-    if not seguranca_service.verificar_senha(
+    if not await seguranca_service.verificar_senha_async(
         senha_texto_puro=senha_formulario, senha_hashada=funcionario_encontrado.senha
     ):
         return None
 
+    _agendar_rehash_funcionario(
+        funcionario_encontrado, senha_formulario, tarefas_segundo_plano
+    )
+
     return funcionario_encontrado
 
 
 def criar_funcionario(
-    sessao_banco: Session, dados_funcionario: auth_schema.SchemaFuncionarioCriar
+    sessao_banco: Session,
+    dados_funcionario: auth_schema.SchemaFuncionarioCriar,
+    hash_senha: Optional[str] = None,
 ) -> models.Funcionario:
     funcionario_existente = buscar_funcionario_por_email(
         sessao_banco, email=dados_funcionario.email
@@ -54,7 +134,10 @@ def criar_funcionario(
             detail="Já existe um funcionário cadastrado com este email.",
         )
 
-    hash_senha = seguranca_service.obter_hash_senha(dados_funcionario.senha_texto_puro)
+    if hash_senha is None:
+        hash_senha = seguranca_service.obter_hash_senha(
+            dados_funcionario.senha_texto_puro
+        )
 
     novo_funcionario_modelo = models.Funcionario(
         email=dados_funcionario.email,
@@ -67,5 +150,6 @@ def criar_funcionario(
     sessao_banco.add(novo_funcionario_modelo)
     sessao_banco.commit()
     sessao_banco.refresh(novo_funcionario_modelo)
+    principais.invalidar_funcionario(novo_funcionario_modelo.id_funcionario)
 
     return novo_funcionario_modelo
@@ -1,33 +1,102 @@
+from functools import partial
 from typing import Optional
 
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
 from .. import seguranca as seguranca_service
+from ..database import SessionLocal, executar_servico
 
 
-def autenticar_cliente(
-    sessao_banco: Session, email_formulario: str, senha_formulario: str
-) -> Optional[models.Pessoa]:
-    cliente_encontrado = (
-        sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == email_formulario)
-        .first()
-    )
+def buscar_credenciais_cliente(sessao_banco: Session, email: str) -> Optional[Row]:
+    """
+    Só as colunas que o login usa, lidas da tabela 'pessoas' sem montar a
+    entidade polimórfica. Todas estão no índice 'ix_pessoas_email', então o
+    Postgres responde com um index-only scan.
+    """
+    return sessao_banco.execute(
+        select(
+            models.Pessoa.id_pessoa,
+            models.Pessoa.email,
+            models.Pessoa.senha,
+            models.Pessoa.e_ativo,
+            models.Pessoa.tipo_pessoa,
+            models.Pessoa.token_version,
+        ).where(func.lower(models.Pessoa.email) == func.lower(email))
+    ).first()
 
-    if not cliente_encontrado:
-        return None
 
-    if not cliente_encontrado.e_ativo:
+def _validar_cliente_ativo(cliente: Row) -> None:
+    if not cliente.e_ativo:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Sua conta está temporariamente bloqueada. Entre em contato com o suporte.",
         )
 
-    if not seguranca_service.verificar_senha(
+
+def gravar_novo_hash_cliente(id_pessoa: int, hash_antigo: str, hash_novo: str) -> None:
+    sessao_banco = SessionLocal()
+    try:
+        sessao_banco.query(models.Pessoa).filter(
+            models.Pessoa.id_pessoa == id_pessoa,
+            models.Pessoa.senha == hash_antigo,
+        ).update({models.Pessoa.senha: hash_novo}, synchronize_session=False)
+        sessao_banco.commit()
+    finally:
+        sessao_banco.close()
+
+
+async def rehash_senha_cliente(
+    id_pessoa: int, senha_texto_puro: str, hash_antigo: str
+) -> None:
+    await seguranca_service.regravar_hash_senha(
+        senha_texto_puro, partial(gravar_novo_hash_cliente, id_pessoa, hash_antigo)
+    )
+
+
+def _agendar_rehash_cliente(
+    cliente: Row,
+    senha_texto_puro: str,
+    tarefas_segundo_plano: Optional[BackgroundTasks],
+) -> None:
+    if tarefas_segundo_plano is None:
+        return
+    if seguranca_service.senha_precisa_rehash(cliente.senha):
+        tarefas_segundo_plano.add_task(
+            rehash_senha_cliente, cliente.id_pessoa, senha_texto_puro, cliente.senha
+        )
+
+
+async def autenticar_cliente_async(
+    sessao_banco: AsyncSession,
+    email_formulario: str,
+    senha_formulario: str,
+    tarefas_segundo_plano: Optional[BackgroundTasks] = None,
+) -> Optional[Row]:
+    """
+    A consulta roda na AsyncSession e a verificação argon2 no pool de hashing.
+    """
+    cliente_encontrado = await executar_servico(
+        sessao_banco, buscar_credenciais_cliente, email=email_formulario
+    )
+
+    # Devolve a conexão ao pool enquanto o hash é verificado: a espera na
+    # fila do argon2 não pode prender uma conexão numa transação aberta.
+    await sessao_banco.commit()
+
+    if not cliente_encontrado:
+        return None
+
+    _validar_cliente_ativo(cliente_encontrado)
+
+    if not await seguranca_service.verificar_senha_async(
         senha_texto_puro=senha_formulario, senha_hashada=cliente_encontrado.senha
     ):
         return None
 
+    _agendar_rehash_cliente(cliente_encontrado, senha_formulario, tarefas_segundo_plano)
+
     return cliente_encontrado
@@ -1,53 +1,123 @@
-from typing import List
+import base64
+from typing import Dict, List, Optional, Set
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, literal, not_, or_, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 
 from .. import models
+from .. import principais
+from ..filtro_ids import coluna_em_lista
 from .. import seguranca as seguranca_service
 from ..schemas import cliente_schema
 
-
-def criar_pessoa_fisica(
-    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar, sessao_banco: Session
-) -> models.PessoaFisica:
-    email_existente = (
-        sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == dados_entrada_cliente.email)
-        .first()
-    )
-    if email_existente:
+# Carga dos relacionamentos serializados por SchemaPessoaFisica e
+# SchemaPessoaJuridica, para que listar N clientes custe um número fixo de
+# consultas (endereço no mesmo SELECT; motoristas e seus endereços num
+# segundo SELECT ... IN), e não uma por cliente e por motorista.
+_CARGA_MOTORISTAS = selectinload(models.PessoaJuridica.motoristas).joinedload(
+    models.PessoaFisica.endereco
+)
+CARGA_PESSOA_FISICA = (joinedload(models.PessoaFisica.endereco),)
+CARGA_PESSOA_JURIDICA = (joinedload(models.PessoaJuridica.endereco), _CARGA_MOTORISTAS)
+
+# Índices únicos criados pelos modelos (unique=True, index=True). Cadastro e
+# atualização gravam direto e traduzem a violação pelo nome do índice: uma
+# ida ao banco em vez de um SELECT por chave, e sem a corrida entre o
+# SELECT e o INSERT de dois cadastros simultâneos.
+_DUPLICIDADE_CADASTRO = {
+    "ix_pessoas_email": "Email já cadastrado.",
+    "ix_pessoas_fisicas_cpf": "CPF já cadastrado.",
+    "ix_pessoas_fisicas_cnh": "CNH já cadastrada.",
+    "ix_pessoas_juridicas_cnpj": "CNPJ já cadastrado.",
+}
+_DUPLICIDADE_ATUALIZACAO = {
+    "ix_pessoas_email": "Email já cadastrado para outro cliente.",
+    "ix_pessoas_fisicas_cpf": "CPF já cadastrado para outro cliente.",
+    "ix_pessoas_fisicas_cnh": "CNH já cadastrada para outro cliente.",
+    "ix_pessoas_juridicas_cnpj": "CNPJ já cadastrado para outra empresa.",
+}
+
+
+def _nome_restricao(erro: IntegrityError) -> Optional[str]:
+    # psycopg2 expõe o nome em 'diag'; o asyncpg, na exceção original.
+    diag = getattr(erro.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    return getattr(erro.orig.__cause__, "constraint_name", None)
+
+
+def _gravar(sessao_banco: Session, mensagens: dict) -> None:
+    try:
+        sessao_banco.commit()
+    except IntegrityError as exc:
+        sessao_banco.rollback()
+        mensagem = mensagens.get(_nome_restricao(exc))
+        if mensagem is None:
+            raise
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado."
-        )
+            status_code=status.HTTP_400_BAD_REQUEST, detail=mensagem
+        ) from exc
 
-    cpf_existente = (
-        sessao_banco.query(models.PessoaFisica)
-        .filter(models.PessoaFisica.cpf == dados_entrada_cliente.cpf)
-        .first()
-    )
-    if cpf_existente:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="CPF já cadastrado."
+
+def verificar_chaves_livres(
+    sessao_banco: Session,
+    email: str,
+    cpf: Optional[str] = None,
+    cnh: Optional[str] = None,
+    cnpj: Optional[str] = None,
+) -> None:
+    """
+    Sonda barata feita pelas rotas de cadastro antes do argon2: recusa com a
+    mesma mensagem do índice único um email, CPF, CNH ou CNPJ já cadastrado,
+    para que cadastros repetidos não custem um hash cada. Uma consulta, com
+    cada parte do UNION ALL no seu índice único; o índice continua sendo a
+    garantia contra dois cadastros simultâneos.
+    """
+    pessoas = models.Pessoa.__table__
+    pessoas_fisicas = models.PessoaFisica.__table__
+    partes = [
+        select(literal("ix_pessoas_email").label("indice")).where(
+            func.lower(pessoas.c.email) == email.lower()
+        )
+    ]
+    if cpf is not None:
+        partes.append(
+            select(literal("ix_pessoas_fisicas_cpf")).where(pessoas_fisicas.c.cpf == cpf)
+        )
+    if cnh is not None:
+        partes.append(
+            select(literal("ix_pessoas_fisicas_cnh")).where(pessoas_fisicas.c.cnh == cnh)
+        )
+    if cnpj is not None:
+        partes.append(
+            select(literal("ix_pessoas_juridicas_cnpj")).where(
+                models.PessoaJuridica.__table__.c.cnpj == cnpj
+            )
         )
 
-    cnh_existente = (
-        sessao_banco.query(models.PessoaFisica)
-        .filter(models.PessoaFisica.cnh == dados_entrada_cliente.cnh)
-        .first()
-    )
-    if cnh_existente:
+    indice = sessao_banco.execute(union_all(*partes).limit(1)).scalar()
+    if indice is not None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="CNH já cadastrada."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_DUPLICIDADE_CADASTRO[indice],
         )
 
+
+def criar_pessoa_fisica(
+    dados_entrada_cliente: cliente_schema.SchemaPessoaFisicaCriar,
+    sessao_banco: Session,
+    hash_senha: Optional[str] = None,
+) -> models.PessoaFisica:
     novo_endereco_modelo = models.Endereco(
         **dados_entrada_cliente.endereco.model_dump()
     )
 
-    hash_senha = seguranca_service.obter_hash_senha(
-        dados_entrada_cliente.senha_texto_puro
-    )
+    if hash_senha is None:
+        hash_senha = seguranca_service.obter_hash_senha(
+            dados_entrada_cliente.senha_texto_puro
+        )
 
     dados_pessoa_fisica = dados_entrada_cliente.model_dump(
         exclude={"endereco", "senha_texto_puro"}
@@ -60,7 +130,7 @@ def criar_pessoa_fisica(
     nova_pessoa_fisica_modelo.endereco = novo_endereco_modelo
 
     sessao_banco.add(nova_pessoa_fisica_modelo)
-    sessao_banco.commit()
+    _gravar(sessao_banco, _DUPLICIDADE_CADASTRO)
     sessao_banco.refresh(nova_pessoa_fisica_modelo)
 
     return nova_pessoa_fisica_modelo
@@ -69,34 +139,16 @@ def criar_pessoa_fisica(
 def criar_pessoa_juridica(
     dados_entrada_empresa: cliente_schema.SchemaPessoaJuridicaCriar,
     sessao_banco: Session,
+    hash_senha: Optional[str] = None,
 ) -> models.PessoaJuridica:
-    email_existente = (
-        sessao_banco.query(models.Pessoa)
-        .filter(models.Pessoa.email == dados_entrada_empresa.email)
-        .first()
-    )
-    if email_existente:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado."
-        )
-
-    cnpj_existente = (
-        sessao_banco.query(models.PessoaJuridica)
-        .filter(models.PessoaJuridica.cnpj == dados_entrada_empresa.cnpj)
-        .first()
-    )
-    if cnpj_existente:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="CNPJ já cadastrado."
-        )
-
     novo_endereco_modelo = models.Endereco(
         **dados_entrada_empresa.endereco.model_dump()
     )
 
-    hash_senha = seguranca_service.obter_hash_senha(
-        dados_entrada_empresa.senha_texto_puro
-    )
+    if hash_senha is None:
+        hash_senha = seguranca_service.obter_hash_senha(
+            dados_entrada_empresa.senha_texto_puro
+        )
 
     dados_empresa = dados_entrada_empresa.model_dump(
         exclude={"endereco", "motoristas_ids", "senha_texto_puro"}
@@ -110,7 +162,9 @@ def criar_pessoa_juridica(
         motoristas_encontrados = (
             sessao_banco.query(models.PessoaFisica)
             .filter(
-                models.PessoaFisica.id_pessoa.in_(dados_entrada_empresa.motoristas_ids)
+                coluna_em_lista(
+                    models.PessoaFisica.id_pessoa, dados_entrada_empresa.motoristas_ids
+                )
             )
             .all()
         )
@@ -124,21 +178,174 @@ def criar_pessoa_juridica(
         nova_empresa_modelo.motoristas.extend(motoristas_encontrados)
 
     sessao_banco.add(nova_empresa_modelo)
-    sessao_banco.commit()
+    _gravar(sessao_banco, _DUPLICIDADE_CADASTRO)
 
     sessao_banco.refresh(nova_empresa_modelo)
     return nova_empresa_modelo
 
 
-def listar_pessoas_fisicas(sessao_banco: Session) -> List[models.PessoaFisica]:
-    lista_clientes = sessao_banco.query(models.PessoaFisica).all()
-    return lista_clientes
+def buscar_chaves_cadastradas(
+    sessao_banco: Session, emails: List[str], cpfs: List[str], cnhs: List[str]
+) -> Dict[str, Set[str]]:
+    """
+    Quais dos emails (em minúsculas), CPFs e CNHs de uma importação já estão
+    cadastrados, numa única consulta: cada parte do UNION ALL lê o seu índice
+    único, com a lista em '= ANY(:lista)' nos lotes grandes.
+    """
+    pessoas = models.Pessoa.__table__
+    pessoas_fisicas = models.PessoaFisica.__table__
+    email_normalizado = func.lower(pessoas.c.email)
+    consulta = union_all(
+        select(literal("email").label("chave"), email_normalizado.label("valor")).where(
+            coluna_em_lista(email_normalizado, emails)
+        ),
+        select(literal("cpf"), pessoas_fisicas.c.cpf).where(
+            coluna_em_lista(pessoas_fisicas.c.cpf, cpfs)
+        ),
+        select(literal("cnh"), pessoas_fisicas.c.cnh).where(
+            coluna_em_lista(pessoas_fisicas.c.cnh, cnhs)
+        ),
+    )
+
+    cadastradas = {"email": set(), "cpf": set(), "cnh": set()}
+    for chave, valor in sessao_banco.execute(consulta):
+        cadastradas[chave].add(valor)
+    return cadastradas
+
+
+def cadastrar_pessoas_fisicas_em_lote(
+    clientes: List[cliente_schema.SchemaPessoaFisicaCriar],
+    hashes: List[str],
+    sessao_banco: Session,
+) -> List[int]:
+    """
+    Grava clientes já validados com um INSERT multi-linha por tabela
+    (paginado pelo 'insertmanyvalues' do SQLAlchemy) e um único commit, e
+    devolve os ids na ordem de 'clientes'. Se um cadastro concorrente tomar
+    uma das chaves depois da checagem, o lote inteiro é desfeito (400).
+    """
+    if not clientes:
+        return []
+
+    ids = sessao_banco.scalars(
+        insert(models.Pessoa.__table__).returning(
+            models.Pessoa.__table__.c.id_pessoa, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "email": cliente.email,
+                "telefone": cliente.telefone,
+                "senha": hash_senha,
+                "tipo_pessoa": "pessoa_fisica",
+            }
+            for cliente, hash_senha in zip(clientes, hashes)
+        ],
+    ).all()
+    sessao_banco.execute(
+        insert(models.PessoaFisica.__table__),
+        [
+            {
+                "id_pessoa": id_pessoa,
+                "nome_completo": cliente.nome_completo,
+                "cpf": cliente.cpf,
+                "cnh": cliente.cnh,
+            }
+            for cliente, id_pessoa in zip(clientes, ids)
+        ],
+    )
+    sessao_banco.execute(
+        insert(models.Endereco.__table__),
+        [
+            {**cliente.endereco.model_dump(), "pessoa_id": id_pessoa}
+            for cliente, id_pessoa in zip(clientes, ids)
+        ],
+    )
+    _gravar(sessao_banco, _DUPLICIDADE_CADASTRO)
+    return ids
+
+
+def _criar_cursor(id_pessoa: int) -> str:
+    return base64.urlsafe_b64encode(str(id_pessoa).encode()).decode().rstrip("=")
+
+
+# 'id_pessoa' é INTEGER (int4): um cursor fora da faixa chegaria ao asyncpg
+# e viraria erro 500 em vez de 400.
+_ID_MAXIMO = 2**31 - 1
+
+
+def _ler_cursor(cursor: str) -> int:
+    try:
+        id_pessoa = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido."
+        ) from exc
+    if not 0 <= id_pessoa <= _ID_MAXIMO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido."
+        )
+    return id_pessoa
+
+
+def _listar_pagina(
+    sessao_banco: Session,
+    modelo: type,
+    filtros: Optional[cliente_schema.SchemaFiltroClientes],
+    *opcoes,
+    criterios: tuple = (),
+) -> dict:
+    """
+    Página de clientes em ordem de id_pessoa, a partir do cursor (keyset): a
+    consulta lê só as 'limit' + 1 linhas seguintes pelo índice, qualquer que
+    seja a página, em vez de pular as anteriores com OFFSET.
+    """
+    filtros = filtros or cliente_schema.SchemaFiltroClientes()
+
+    # O endereço vem no mesmo SELECT. Só os filtros por cidade/estado pedem o
+    # JOIN interno; sem eles, clientes sem endereço também entram na página.
+    consulta = sessao_banco.query(modelo)
+    if filtros.cidade is not None or filtros.estado is not None:
+        consulta = consulta.join(modelo.endereco)
+    else:
+        consulta = consulta.outerjoin(modelo.endereco)
+    consulta = consulta.options(contains_eager(modelo.endereco), *opcoes).filter(
+        *criterios
+    )
+    if filtros.cursor is not None:
+        consulta = consulta.filter(models.Pessoa.id_pessoa > _ler_cursor(filtros.cursor))
+    if filtros.e_ativo is not None:
+        consulta = consulta.filter(models.Pessoa.e_ativo == filtros.e_ativo)
+    if filtros.cidade is not None:
+        consulta = consulta.filter(models.Endereco.cidade == filtros.cidade)
+    if filtros.estado is not None:
+        consulta = consulta.filter(models.Endereco.estado == filtros.estado)
+    if filtros.data_criacao_de is not None:
+        consulta = consulta.filter(models.Pessoa.data_criacao >= filtros.data_criacao_de)
+    if filtros.data_criacao_ate is not None:
+        consulta = consulta.filter(models.Pessoa.data_criacao < filtros.data_criacao_ate)
+
+    itens = consulta.order_by(models.Pessoa.id_pessoa).limit(filtros.limit + 1).all()
+
+    proximo_cursor = None
+    if len(itens) > filtros.limit:
+        itens = itens[: filtros.limit]
+        proximo_cursor = _criar_cursor(itens[-1].id_pessoa)
+    return {"itens": itens, "next_cursor": proximo_cursor}
+
+
+def listar_pessoas_fisicas(
+    sessao_banco: Session,
+    filtros: Optional[cliente_schema.SchemaFiltroClientes] = None,
+) -> dict:
+    return _listar_pagina(sessao_banco, models.PessoaFisica, filtros)
 
 
 def buscar_pessoa_fisica_por_id(
     id_pessoa: int, sessao_banco: Session
 ) -> models.PessoaFisica:
-    cliente_encontrado = sessao_banco.get(models.PessoaFisica, id_pessoa)
+    cliente_encontrado = sessao_banco.get(
+        models.PessoaFisica, id_pessoa, options=CARGA_PESSOA_FISICA
+    )
 
     if not cliente_encontrado:
         raise HTTPException(
@@ -148,48 +355,20 @@ def buscar_pessoa_fisica_por_id(
     return cliente_encontrado
 
 
+def _revogar_tokens_se_email_mudar(cliente: models.Pessoa, novo_email: str) -> None:
+    # O email vai nas claims do token de acesso: trocar o email de login
+    # derruba os tokens já emitidos, como a troca de senha.
+    if cliente.email.lower() != novo_email.lower():
+        cliente.token_version = models.Pessoa.token_version + 1
+
+
 def atualizar_pessoa_fisica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaFisicaCriar,
     sessao_banco: Session,
 ) -> models.PessoaFisica:
     cliente_para_atualizar = buscar_pessoa_fisica_por_id(id_pessoa, sessao_banco)
-
-    if dados_atualizacao.email != cliente_para_atualizar.email:
-        outro_cliente_email = (
-            sessao_banco.query(models.Pessoa)
-            .filter(models.Pessoa.email == dados_atualizacao.email)
-            .first()
-        )
-        if outro_cliente_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já cadastrado para outro cliente.",
-            )
-
-    if dados_atualizacao.cpf != cliente_para_atualizar.cpf:
-        outro_cliente_cpf = (
-            sessao_banco.query(models.PessoaFisica)
-            .filter(models.PessoaFisica.cpf == dados_atualizacao.cpf)
-            .first()
-        )
-        if outro_cliente_cpf:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CPF já cadastrado para outro cliente.",
-            )
-
-    if dados_atualizacao.cnh != cliente_para_atualizar.cnh:
-        outro_cliente_cnh = (
-            sessao_banco.query(models.PessoaFisica)
-            .filter(models.PessoaFisica.cnh == dados_atualizacao.cnh)
-            .first()
-        )
-        if outro_cliente_cnh:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CNH já cadastrada para outro cliente.",
-            )
+    _revogar_tokens_se_email_mudar(cliente_para_atualizar, dados_atualizacao.email)
 
     cliente_para_atualizar.email = dados_atualizacao.email
     cliente_para_atualizar.nome_completo = dados_atualizacao.nome_completo
@@ -205,7 +384,8 @@ def atualizar_pessoa_fisica(
         setattr(cliente_para_atualizar.endereco, key, value)
 
     sessao_banco.add(cliente_para_atualizar)
-    sessao_banco.commit()
+    _gravar(sessao_banco, _DUPLICIDADE_ATUALIZACAO)
+    principais.invalidar_cliente(id_pessoa)
     sessao_banco.refresh(cliente_para_atualizar)
 
     return cliente_para_atualizar
@@ -216,6 +396,7 @@ def deletar_pessoa_fisica(id_pessoa: int, sessao_banco: Session) -> None:
 
     sessao_banco.delete(cliente_para_deletar)
     sessao_banco.commit()
+    principais.invalidar_cliente(id_pessoa)
 
 
 def deletar_pessoa_juridica(id_pessoa: int, sessao_banco: Session) -> None:
@@ -223,17 +404,71 @@ def deletar_pessoa_juridica(id_pessoa: int, sessao_banco: Session) -> None:
 
     sessao_banco.delete(empresa_para_deletar)
     sessao_banco.commit()
+    principais.invalidar_cliente(id_pessoa)
+
+
+def _atualizar_estado_cliente(
+    id_pessoa: int, valores: dict, sessao_banco: Session
+) -> None:
+    """
+    Grava 'valores' (token_version, e_ativo) e derruba a entrada do cliente no
+    cache de principais. 'invalidar_cliente' só limpa o cache deste processo:
+    nos demais workers os tokens antigos podem seguir aceitos por até
+    CACHE_PRINCIPAL_TTL_SEGUNDOS (30s por padrão), até a entrada expirar.
+    """
+    linhas_afetadas = (
+        sessao_banco.query(models.Pessoa)
+        .filter(models.Pessoa.id_pessoa == id_pessoa)
+        .update(valores, synchronize_session=False)
+    )
+    sessao_banco.commit()
+    principais.invalidar_cliente(id_pessoa)
+
+    if not linhas_afetadas:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Cliente com ID {id_pessoa} não encontrado.",
+        )
 
 
-def listar_pessoas_juridicas(sessao_banco: Session) -> List[models.PessoaJuridica]:
-    lista_empresas = sessao_banco.query(models.PessoaJuridica).all()
-    return lista_empresas
+def revogar_tokens_cliente(id_pessoa: int, sessao_banco: Session) -> None:
+    """
+    Invalida todos os tokens já emitidos para o cliente incrementando o seu
+    token_version.
+    """
+    _atualizar_estado_cliente(
+        id_pessoa,
+        {models.Pessoa.token_version: models.Pessoa.token_version + 1},
+        sessao_banco,
+    )
+
+
+def alterar_status_cliente(id_pessoa: int, e_ativo: bool, sessao_banco: Session) -> None:
+    """
+    Ativa ou desativa a conta. A desativação também incrementa o
+    token_version, derrubando os tokens de acesso e de renovação já emitidos.
+    """
+    valores = {models.Pessoa.e_ativo: e_ativo}
+    if not e_ativo:
+        valores[models.Pessoa.token_version] = models.Pessoa.token_version + 1
+    _atualizar_estado_cliente(id_pessoa, valores, sessao_banco)
+
+
+def listar_pessoas_juridicas(
+    sessao_banco: Session,
+    filtros: Optional[cliente_schema.SchemaFiltroClientes] = None,
+) -> dict:
+    return _listar_pagina(
+        sessao_banco, models.PessoaJuridica, filtros, _CARGA_MOTORISTAS
+    )
 
 
 def buscar_pessoa_juridica_por_id(
-    id_pessoa: int, sessao_banco: Session
+    id_pessoa: int, sessao_banco: Session, opcoes: tuple = CARGA_PESSOA_JURIDICA
 ) -> models.PessoaJuridica:
-    empresa_encontrada = sessao_banco.get(models.PessoaJuridica, id_pessoa)
+    empresa_encontrada = sessao_banco.get(
+        models.PessoaJuridica, id_pessoa, options=opcoes
+    )
 
     if not empresa_encontrada:
         raise HTTPException(
@@ -243,36 +478,77 @@ def buscar_pessoa_juridica_por_id(
     return empresa_encontrada
 
 
+def _reconciliar_motoristas(
+    sessao_banco: Session, id_empresa: int, motoristas_ids: List[int]
+) -> None:
+    """
+    Deixa a frota da empresa igual a 'motoristas_ids' alterando só o que
+    muda, sem carregar a frota atual. Uma consulta (FOR UPDATE) lê a empresa
+    atual dos motoristas pedidos, acusando os inexistentes e os de outra
+    empresa; depois um UPDATE desassocia os que saíram e outro associa os
+    que entraram.
+    """
+    tabela = models.PessoaFisica.__table__
+    ids = sorted(set(motoristas_ids))
+
+    empresa_atual = {}
+    if ids:
+        empresa_atual = dict(
+            sessao_banco.execute(
+                select(tabela.c.id_pessoa, tabela.c.empresa_id)
+                .where(coluna_em_lista(tabela.c.id_pessoa, ids))
+                .with_for_update()
+            ).all()
+        )
+    if len(empresa_atual) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Um ou mais IDs de motoristas não encontrados.",
+        )
+
+    de_outra_empresa = [
+        id_motorista
+        for id_motorista, id_empresa_motorista in empresa_atual.items()
+        if id_empresa_motorista not in (None, id_empresa)
+    ]
+    if de_outra_empresa:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Motoristas já associados a outra empresa: "
+                f"{', '.join(str(id_motorista) for id_motorista in de_outra_empresa)}."
+            ),
+        )
+
+    sessao_banco.execute(
+        update(tabela)
+        .where(
+            tabela.c.empresa_id == id_empresa,
+            not_(coluna_em_lista(tabela.c.id_pessoa, ids)),
+        )
+        .values(empresa_id=None)
+    )
+    novos = [
+        id_motorista
+        for id_motorista, id_empresa_motorista in empresa_atual.items()
+        if id_empresa_motorista is None
+    ]
+    if novos:
+        associar_motoristas(sessao_banco, id_empresa, novos)
+
+
 def atualizar_pessoa_juridica(
     id_pessoa: int,
     dados_atualizacao: cliente_schema.SchemaPessoaJuridicaCriar,
     sessao_banco: Session,
 ) -> models.PessoaJuridica:
-    empresa_para_atualizar = buscar_pessoa_juridica_por_id(id_pessoa, sessao_banco)
-
-    if dados_atualizacao.cnpj != empresa_para_atualizar.cnpj:
-        outra_empresa_cnpj = (
-            sessao_banco.query(models.PessoaJuridica)
-            .filter(models.PessoaJuridica.cnpj == dados_atualizacao.cnpj)
-            .first()
-        )
-        if outra_empresa_cnpj:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CNPJ já cadastrado para outra empresa.",
-            )
+    empresa_para_atualizar = buscar_pessoa_juridica_por_id(
+        id_pessoa,
+        sessao_banco,
+        opcoes=(joinedload(models.PessoaJuridica.endereco),),
+    )
 
-    if dados_atualizacao.email != empresa_para_atualizar.email:
-        outro_cliente_email = (
-            sessao_banco.query(models.Pessoa)
-            .filter(models.Pessoa.email == dados_atualizacao.email)
-            .first()
-        )
-        if outro_cliente_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já cadastrado para outro cliente.",
-            )
+    _revogar_tokens_se_email_mudar(empresa_para_atualizar, dados_atualizacao.email)
 
     empresa_para_atualizar.razao_social = dados_atualizacao.razao_social
     empresa_para_atualizar.telefone = dados_atualizacao.telefone
@@ -287,87 +563,168 @@ def atualizar_pessoa_juridica(
         setattr(empresa_para_atualizar.endereco, key, value)
 
     if dados_atualizacao.motoristas_ids is not None:
-        motoristas_encontrados = []
-        if dados_atualizacao.motoristas_ids:
-            motoristas_encontrados = (
-                sessao_banco.query(models.PessoaFisica)
-                .filter(
-                    models.PessoaFisica.id_pessoa.in_(dados_atualizacao.motoristas_ids)
-                )
-                .all()
-            )
-            if len(motoristas_encontrados) != len(dados_atualizacao.motoristas_ids):
-                raise HTTPException(
-                    status_code=404,
-                    detail="Um ou mais IDs de motoristas não encontrados.",
-                )
-
-        empresa_para_atualizar.motoristas = motoristas_encontrados
+        _reconciliar_motoristas(
+            sessao_banco, id_pessoa, dados_atualizacao.motoristas_ids
+        )
 
     sessao_banco.add(empresa_para_atualizar)
-    sessao_banco.commit()
-    sessao_banco.refresh(empresa_para_atualizar)
+    _gravar(sessao_banco, _DUPLICIDADE_ATUALIZACAO)
+    principais.invalidar_cliente(id_pessoa)
 
-    return empresa_para_atualizar
+    return _recarregar_empresa(sessao_banco, id_pessoa)
 
 
-def adicionar_motorista_empresa(
-    empresa_logada: models.PessoaJuridica,
-    id_motorista_adicionar: int,
-    sessao_banco: Session,
+def _recarregar_empresa(
+    sessao_banco: Session, id_empresa: int
 ) -> models.PessoaJuridica:
-    motorista = sessao_banco.get(models.PessoaFisica, id_motorista_adicionar)
+    # A empresa logada já está na sessão, sem os motoristas, que acabaram de
+    # mudar: 'populate_existing' relê a linha e carrega a frota numa consulta.
+    return sessao_banco.get(
+        models.PessoaJuridica,
+        id_empresa,
+        options=CARGA_PESSOA_JURIDICA,
+        populate_existing=True,
+    )
 
-    if not motorista:
+
+def _empresa_do_motorista(sessao_banco: Session, id_motorista: int) -> Optional[int]:
+    # Só no caminho de erro: distingue o motorista inexistente (404) do que
+    # está em outra empresa, ou em nenhuma (400).
+    tabela = models.PessoaFisica.__table__
+    linha = sessao_banco.execute(
+        select(tabela.c.empresa_id).where(tabela.c.id_pessoa == id_motorista)
+    ).first()
+    if linha is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Motorista com ID {id_motorista_adicionar} (Pessoa Física) não encontrado.",
+            detail=f"Motorista com ID {id_motorista} (Pessoa Física) não encontrado.",
+        )
+    return linha.empresa_id
+
+
+def associar_motoristas(
+    sessao_banco: Session, id_empresa: int, ids_motoristas: List[int]
+) -> List[int]:
+    """
+    Um UPDATE condicional: associa à empresa os motoristas sem empresa (ou já
+    dela) e devolve os ids afetados. Os demais, inexistentes ou de outra
+    empresa, ficam como estão. Não faz commit.
+    """
+    tabela = models.PessoaFisica.__table__
+    return sessao_banco.scalars(
+        update(tabela)
+        .where(
+            coluna_em_lista(tabela.c.id_pessoa, ids_motoristas),
+            or_(tabela.c.empresa_id.is_(None), tabela.c.empresa_id == id_empresa),
         )
+        .values(empresa_id=id_empresa)
+        .returning(tabela.c.id_pessoa)
+    ).all()
+
+
+def desassociar_motoristas(
+    sessao_banco: Session, id_empresa: int, ids_motoristas: List[int]
+) -> List[int]:
+    """
+    Um UPDATE condicional: tira da empresa os motoristas que são dela e
+    devolve os ids afetados. Não faz commit.
+    """
+    tabela = models.PessoaFisica.__table__
+    return sessao_banco.scalars(
+        update(tabela)
+        .where(
+            coluna_em_lista(tabela.c.id_pessoa, ids_motoristas),
+            tabela.c.empresa_id == id_empresa,
+        )
+        .values(empresa_id=None)
+        .returning(tabela.c.id_pessoa)
+    ).all()
+
 
-    if (
-        motorista.empresa_id is not None
-        and motorista.empresa_id != empresa_logada.id_pessoa
+def listar_motoristas_empresa(
+    empresa_logada: models.PessoaJuridica,
+    sessao_banco: Session,
+    filtros: Optional[cliente_schema.SchemaFiltroClientes] = None,
+) -> dict:
+    """Página da frota da empresa, pelo mesmo cursor das listagens de clientes."""
+    return _listar_pagina(
+        sessao_banco,
+        models.PessoaFisica,
+        filtros,
+        criterios=(models.PessoaFisica.empresa_id == empresa_logada.id_pessoa,),
+    )
+
+
+def adicionar_motorista_empresa(
+    empresa_logada: models.PessoaJuridica,
+    id_motorista_adicionar: int,
+    sessao_banco: Session,
+    recarregar_empresa: bool = True,
+) -> Optional[models.PessoaJuridica]:
+    if not associar_motoristas(
+        sessao_banco, empresa_logada.id_pessoa, [id_motorista_adicionar]
     ):
+        _empresa_do_motorista(sessao_banco, id_motorista_adicionar)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Este motorista (ID {id_motorista_adicionar}) já está associado a outra empresa.",
         )
 
-    if motorista in empresa_logada.motoristas:
-        return empresa_logada
-
-    empresa_logada.motoristas.append(motorista)
-
-    sessao_banco.add(empresa_logada)
     sessao_banco.commit()
-    sessao_banco.refresh(empresa_logada)
-
-    return empresa_logada
+    if not recarregar_empresa:
+        return None
+    return _recarregar_empresa(sessao_banco, empresa_logada.id_pessoa)
 
 
 def remover_motorista_empresa(
     empresa_logada: models.PessoaJuridica,
     id_motorista_remover: int,
     sessao_banco: Session,
-) -> models.PessoaJuridica:
-    motorista = sessao_banco.get(models.PessoaFisica, id_motorista_remover)
-
-    if not motorista:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Motorista com ID {id_motorista_remover} (Pessoa Física) não encontrado.",
-        )
-
-    if motorista not in empresa_logada.motoristas:
+    recarregar_empresa: bool = True,
+) -> Optional[models.PessoaJuridica]:
+    if not desassociar_motoristas(
+        sessao_banco, empresa_logada.id_pessoa, [id_motorista_remover]
+    ):
+        _empresa_do_motorista(sessao_banco, id_motorista_remover)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Este motorista (ID {id_motorista_remover}) não está associado à sua empresa.",
         )
 
-    empresa_logada.motoristas.remove(motorista)
+    sessao_banco.commit()
+    if not recarregar_empresa:
+        return None
+    return _recarregar_empresa(sessao_banco, empresa_logada.id_pessoa)
 
-    sessao_banco.add(empresa_logada)
+
+def atualizar_motoristas_empresa(
+    empresa_logada: models.PessoaJuridica,
+    dados_lote: cliente_schema.SchemaMotoristasLote,
+    sessao_banco: Session,
+) -> dict:
+    """
+    Associa e desassocia listas de motoristas com um UPDATE para cada lista,
+    sem carregar a frota: o custo não depende do tamanho da empresa. Os ids
+    não aplicados (inexistentes, de outra empresa ou, na remoção, que não são
+    da empresa) voltam em 'recusados'.
+    """
+    adicionados = []
+    if dados_lote.adicionar:
+        adicionados = associar_motoristas(
+            sessao_banco, empresa_logada.id_pessoa, dados_lote.adicionar
+        )
+    removidos = []
+    if dados_lote.remover:
+        removidos = desassociar_motoristas(
+            sessao_banco, empresa_logada.id_pessoa, dados_lote.remover
+        )
     sessao_banco.commit()
-    sessao_banco.refresh(empresa_logada)
 
-    return empresa_logada
+    recusados = (set(dados_lote.adicionar) - set(adicionados)) | (
+        set(dados_lote.remover) - set(removidos)
+    )
+    return {
+        "adicionados": len(adicionados),
+        "removidos": len(removidos),
+        "recusados": sorted(recusados),
+    }
@@ -0,0 +1,151 @@
+"""
+Exportação da base de clientes em NDJSON ou CSV para a equipe de BI.
+
+As linhas vêm de um cursor do lado do servidor (AsyncSession.stream com
+'yield_per'), em lotes de EXPORTACAO_LOTE, e cada lote vira um pedaço da
+resposta antes do próximo ser lido: a memória fica no tamanho de um lote,
+seja a base de mil ou de dez milhões de clientes. A consulta lê colunas
+planas (sem montar objetos ORM) e roda numa sessão própria, numa réplica de
+leitura quando houver, aberta e fechada pelo próprio gerador.
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from .. import models
+from ..database import roteador_sessoes
+
+EXPORTACAO_LOTE = int(os.getenv("EXPORTACAO_LOTE", "2000"))
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+_COLUNAS_ENDERECO = (
+    models.Endereco.rua.label("endereco_rua"),
+    models.Endereco.numero.label("endereco_numero"),
+    models.Endereco.complemento.label("endereco_complemento"),
+    models.Endereco.bairro.label("endereco_bairro"),
+    models.Endereco.cidade.label("endereco_cidade"),
+    models.Endereco.estado.label("endereco_estado"),
+    models.Endereco.cep.label("endereco_cep"),
+)
+
+
+def _consulta_pessoas_fisicas():
+    return (
+        select(
+            models.PessoaFisica.id_pessoa,
+            models.PessoaFisica.email,
+            models.PessoaFisica.telefone,
+            models.PessoaFisica.nome_completo,
+            models.PessoaFisica.cpf,
+            models.PessoaFisica.cnh,
+            models.PessoaFisica.e_ativo,
+            models.PessoaFisica.data_criacao,
+            models.PessoaFisica.empresa_id,
+            *_COLUNAS_ENDERECO,
+        )
+        .select_from(models.PessoaFisica)
+        .outerjoin(
+            models.Endereco, models.Endereco.pessoa_id == models.PessoaFisica.id_pessoa
+        )
+        .order_by(models.PessoaFisica.id_pessoa)
+    )
+
+
+def _consulta_pessoas_juridicas():
+    motorista = aliased(models.PessoaFisica, flat=True)
+    motoristas_ids = (
+        select(func.array_agg(motorista.id_pessoa))
+        .where(motorista.empresa_id == models.PessoaJuridica.id_pessoa)
+        .correlate(models.PessoaJuridica)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            models.PessoaJuridica.id_pessoa,
+            models.PessoaJuridica.email,
+            models.PessoaJuridica.telefone,
+            models.PessoaJuridica.razao_social,
+            models.PessoaJuridica.nome_fantasia,
+            models.PessoaJuridica.cnpj,
+            models.PessoaJuridica.e_ativo,
+            models.PessoaJuridica.data_criacao,
+            *_COLUNAS_ENDERECO,
+            motoristas_ids.label("motoristas_ids"),
+        )
+        .select_from(models.PessoaJuridica)
+        .outerjoin(
+            models.Endereco,
+            models.Endereco.pessoa_id == models.PessoaJuridica.id_pessoa,
+        )
+        .order_by(models.PessoaJuridica.id_pessoa)
+    )
+
+
+def _valor_json(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, list):
+        return ";".join(str(item) for item in valor)
+    return valor
+
+
+def _lote_ndjson(colunas: Sequence[str], linhas: List) -> str:
+    return "".join(
+        json.dumps(
+            {coluna: _valor_json(valor) for coluna, valor in zip(colunas, linha)},
+            ensure_ascii=False,
+        )
+        + "\n"
+        for linha in linhas
+    )
+
+
+def _lote_csv(linhas: List) -> str:
+    saida = io.StringIO()
+    csv.writer(saida).writerows(
+        [_valor_csv(valor) for valor in linha] for linha in linhas
+    )
+    return saida.getvalue()
+
+
+async def _exportar(consulta, formato: str) -> AsyncIterator[str]:
+    fabrica = roteador_sessoes.fabrica_leitura(None)
+    async with fabrica() as sessao_banco:
+        resultado = await sessao_banco.stream(
+            consulta.execution_options(yield_per=EXPORTACAO_LOTE)
+        )
+        colunas = list(resultado.keys())
+        if formato == "csv":
+            yield _lote_csv([colunas])
+
+        async for linhas in resultado.partitions():
+            if formato == "csv":
+                yield _lote_csv(linhas)
+            else:
+                yield _lote_ndjson(colunas, linhas)
+
+
+def exportar_pessoas_fisicas(formato: str) -> AsyncIterator[str]:
+    """Um cliente PF por linha, com o endereço achatado e o 'empresa_id'."""
+    return _exportar(_consulta_pessoas_fisicas(), formato)
+
+
+def exportar_pessoas_juridicas(formato: str) -> AsyncIterator[str]:
+    """Uma empresa por linha, com o endereço achatado e os ids dos motoristas."""
+    return _exportar(_consulta_pessoas_juridicas(), formato)
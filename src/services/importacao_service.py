@@ -0,0 +1,185 @@
+"""
+Importação em lote de clientes PF, para cadastrar de uma vez os motoristas
+de uma empresa nova: um JSON com a lista de clientes no formato do cadastro
+individual, ou um CSV com uma coluna por campo e o endereço nas colunas
+'endereco_*' (as mesmas da exportação).
+
+Cada registro passa pelo schema do cadastro individual. Os inválidos, os
+repetidos dentro do próprio lote e os que já têm email, CPF ou CNH
+cadastrados voltam com os seus erros; os demais são gravados. A checagem
+contra o banco é uma consulta para o lote inteiro, os hashes são feitos em
+paralelo no pool de hashing e a gravação é um INSERT multi-linha por tabela.
+"""
+
+import csv
+import io
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import seguranca as seguranca_service
+from ..database import executar_servico
+from ..schemas import cliente_schema
+from . import cliente_service
+
+IMPORTACAO_MAX_REGISTROS = int(os.getenv("IMPORTACAO_MAX_REGISTROS", "10000"))
+
+_PREFIXO_ENDERECO = "endereco_"
+
+_MENSAGENS_DUPLICIDADE = {
+    "email": "Email já cadastrado.",
+    "cpf": "CPF já cadastrado.",
+    "cnh": "CNH já cadastrada.",
+}
+_MENSAGENS_REPETICAO = {
+    "email": "Email repetido no lote (registro {}).",
+    "cpf": "CPF repetido no lote (registro {}).",
+    "cnh": "CNH repetida no lote (registro {}).",
+}
+
+
+def _corpo_invalido(detalhe: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detalhe)
+
+
+def _ler_csv(corpo: bytes) -> List[dict]:
+    try:
+        texto = corpo.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise _corpo_invalido("O CSV deve estar em UTF-8.") from exc
+
+    registros = []
+    for linha in csv.DictReader(io.StringIO(texto)):
+        registro: Dict[str, Any] = {"endereco": {}}
+        for coluna, valor in linha.items():
+            # Células vazias ficam de fora: o schema aponta o campo que falta.
+            if coluna is None or not valor:
+                continue
+            if coluna.startswith(_PREFIXO_ENDERECO):
+                registro["endereco"][coluna[len(_PREFIXO_ENDERECO) :]] = valor
+            else:
+                registro[coluna] = valor
+        registros.append(registro)
+    return registros
+
+
+def ler_registros(corpo: bytes, tipo_conteudo: str) -> List[Any]:
+    tipo = tipo_conteudo.split(";")[0].strip().lower()
+    if tipo == "text/csv":
+        registros = _ler_csv(corpo)
+    elif tipo == "application/json":
+        try:
+            registros = json.loads(corpo)
+        except ValueError as exc:
+            raise _corpo_invalido("JSON inválido.") from exc
+        if not isinstance(registros, list):
+            raise _corpo_invalido("O corpo deve ser uma lista de clientes.")
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie os clientes como application/json ou text/csv.",
+        )
+
+    if len(registros) > IMPORTACAO_MAX_REGISTROS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f"A importação aceita até {IMPORTACAO_MAX_REGISTROS} "
+                "clientes por chamada."
+            ),
+        )
+    return registros
+
+
+def _chaves(cliente: cliente_schema.SchemaPessoaFisicaCriar) -> Dict[str, str]:
+    return {"email": cliente.email.lower(), "cpf": cliente.cpf, "cnh": cliente.cnh}
+
+
+def _mensagem_validacao(erro: dict) -> str:
+    campo = ".".join(str(parte) for parte in erro["loc"])
+    return f"{campo}: {erro['msg']}" if campo else erro["msg"]
+
+
+def validar_registros(
+    registros: List[Any],
+) -> Tuple[List[Tuple[int, cliente_schema.SchemaPessoaFisicaCriar]], List[dict]]:
+    """
+    Separa os registros válidos, com a sua posição, dos erros por registro
+    (schema ou chave repetida dentro do lote).
+    """
+    validos = []
+    erros = []
+    primeira_ocorrencia: Dict[str, Dict[str, int]] = {
+        chave: {} for chave in _MENSAGENS_REPETICAO
+    }
+
+    for linha, registro in enumerate(registros, start=1):
+        try:
+            cliente = cliente_schema.SchemaPessoaFisicaCriar.model_validate(registro)
+        except ValidationError as exc:
+            erros.append(
+                {
+                    "linha": linha,
+                    "erros": [_mensagem_validacao(erro) for erro in exc.errors()],
+                }
+            )
+            continue
+
+        mensagens = []
+        for chave, valor in _chaves(cliente).items():
+            anterior = primeira_ocorrencia[chave].setdefault(valor, linha)
+            if anterior != linha:
+                mensagens.append(_MENSAGENS_REPETICAO[chave].format(anterior))
+
+        if mensagens:
+            erros.append({"linha": linha, "erros": mensagens})
+        else:
+            validos.append((linha, cliente))
+
+    return validos, erros
+
+
+async def importar_pessoas_fisicas(
+    sessao_banco: AsyncSession, corpo: bytes, tipo_conteudo: str
+) -> dict:
+    validos, erros = validar_registros(ler_registros(corpo, tipo_conteudo))
+
+    chaves_validos = [_chaves(cliente) for _, cliente in validos]
+    cadastradas = await executar_servico(
+        sessao_banco,
+        cliente_service.buscar_chaves_cadastradas,
+        emails=[chaves["email"] for chaves in chaves_validos],
+        cpfs=[chaves["cpf"] for chaves in chaves_validos],
+        cnhs=[chaves["cnh"] for chaves in chaves_validos],
+    )
+    # Devolve a conexão ao pool enquanto os hashes são calculados.
+    await sessao_banco.commit()
+
+    novos = []
+    for (linha, cliente), chaves in zip(validos, chaves_validos):
+        mensagens = [
+            _MENSAGENS_DUPLICIDADE[chave]
+            for chave, valor in chaves.items()
+            if valor in cadastradas[chave]
+        ]
+        if mensagens:
+            erros.append({"linha": linha, "erros": mensagens})
+        else:
+            novos.append(cliente)
+
+    hashes = await seguranca_service.obter_hashes_senhas_async(
+        [cliente.senha_texto_puro for cliente in novos]
+    )
+    ids = await executar_servico(
+        sessao_banco,
+        cliente_service.cadastrar_pessoas_fisicas_em_lote,
+        clientes=novos,
+        hashes=hashes,
+    )
+
+    erros.sort(key=lambda erro: erro["linha"])
+    return {"importados": len(ids), "ids": ids, "erros": erros}
@@ -0,0 +1,129 @@
+"""
+Introspecção de tokens em lote para os demais serviços da FrotaNext.
+
+Todos os tokens são decodificados em memória (usando o cache de tokens) e os
+donos são conferidos numa única consulta UNION ALL sobre 'pessoas' e
+'funcionarios', então N tokens custam uma ida ao banco.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from .. import models
+from .. import seguranca as seguranca_service
+from ..filtro_ids import coluna_em_lista
+
+SUJEITO_FUNCIONARIO = "funcionario"
+SUJEITO_CLIENTE = "cliente"
+
+
+def _identificar_sujeito(payload: dict) -> Optional[Tuple[str, object]]:
+    """
+    Tokens de cliente trazem o id_pessoa no 'sub'. Tokens de funcionário trazem
+    'id_funcionario' ou, nos mais antigos, apenas o email no 'sub'.
+    """
+    id_funcionario = payload.get("id_funcionario")
+    if isinstance(id_funcionario, int):
+        return SUJEITO_FUNCIONARIO, id_funcionario
+
+    sub = payload.get("sub")
+    if not isinstance(sub, str):
+        return None
+    if sub.isdigit():
+        return SUJEITO_CLIENTE, int(sub)
+    # Emails de funcionário não diferenciam maiúsculas (índice em lower(email)).
+    return SUJEITO_FUNCIONARIO, sub.lower()
+
+
+def _carregar_estados(
+    sessao_banco: Session,
+    ids_clientes: set,
+    ids_funcionarios: set,
+    emails_funcionarios: set,
+) -> Dict[Tuple[str, object], Tuple[int, bool]]:
+    consultas = []
+    if ids_clientes:
+        consultas.append(
+            select(
+                literal(SUJEITO_CLIENTE, String).label("tipo"),
+                models.Pessoa.id_pessoa.label("id"),
+                models.Pessoa.email.label("email"),
+                models.Pessoa.token_version.label("versao"),
+                models.Pessoa.e_ativo.label("ativo"),
+            ).where(coluna_em_lista(models.Pessoa.id_pessoa, ids_clientes))
+        )
+    if ids_funcionarios or emails_funcionarios:
+        email_normalizado = func.lower(models.Funcionario.email)
+        consultas.append(
+            select(
+                literal(SUJEITO_FUNCIONARIO, String).label("tipo"),
+                models.Funcionario.id_funcionario.label("id"),
+                email_normalizado.label("email"),
+                literal(0, Integer).label("versao"),
+                models.Funcionario.e_ativado.label("ativo"),
+            ).where(
+                or_(
+                    coluna_em_lista(
+                        models.Funcionario.id_funcionario, ids_funcionarios
+                    ),
+                    coluna_em_lista(email_normalizado, emails_funcionarios),
+                )
+            )
+        )
+    if not consultas:
+        return {}
+
+    consulta = consultas[0] if len(consultas) == 1 else union_all(*consultas)
+    estados = {}
+    for linha in sessao_banco.execute(consulta):
+        estados[(linha.tipo, linha.id)] = (linha.versao, linha.ativo)
+        if linha.tipo == SUJEITO_FUNCIONARIO:
+            estados[(linha.tipo, linha.email)] = (linha.versao, linha.ativo)
+    return estados
+
+
+def _decodificar_tokens(tokens: List[str]) -> Tuple[list, set, set, set]:
+    decodificados = []
+    ids_clientes, ids_funcionarios, emails_funcionarios = set(), set(), set()
+    for token in tokens:
+        payload = seguranca_service.verificar_token(token)
+        sujeito = _identificar_sujeito(payload) if payload is not None else None
+        decodificados.append((payload, sujeito))
+        if sujeito is None:
+            continue
+        tipo, chave = sujeito
+        if tipo == SUJEITO_CLIENTE:
+            ids_clientes.add(chave)
+        elif isinstance(chave, int):
+            ids_funcionarios.add(chave)
+        else:
+            emails_funcionarios.add(chave)
+    return decodificados, ids_clientes, ids_funcionarios, emails_funcionarios
+
+
+def introspectar_tokens(sessao_banco: Session, tokens: List[str]) -> List[dict]:
+    """
+    Retorna, na mesma ordem de 'tokens', um dict com 'active', o tipo do
+    sujeito e as claims. Tokens inválidos, de contas inativas ou com
+    token_version defasado saem com 'active' falso e sem claims.
+    """
+    decodificados, *chaves = _decodificar_tokens(tokens)
+    estados = _carregar_estados(sessao_banco, *chaves)
+
+    resultados = []
+    for payload, sujeito in decodificados:
+        estado = estados.get(sujeito) if sujeito is not None else None
+        ativo = estado is not None and estado[1]
+        if ativo and sujeito[0] == SUJEITO_CLIENTE:
+            versao_token = payload.get("ver")
+            ativo = versao_token is None or versao_token == estado[0]
+
+        if not ativo:
+            resultados.append({"active": False, "tipo_sujeito": None, "claims": None})
+            continue
+        resultados.append(
+            {"active": True, "tipo_sujeito": sujeito[0], "claims": payload}
+        )
+    return resultados
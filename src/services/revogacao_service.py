@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+from ..revogacao import registro_revogacao
+from . import token_renovacao_service
+
+
+def revogar_token(sessao_banco: Session, payload: dict) -> None:
+    """
+    Revoga o access token descrito por 'payload' até o seu 'exp'. Tokens
+    emitidos antes do 'jti' existir não podem ser revogados individualmente.
+    """
+    jti = payload.get("jti")
+    if jti is None:
+        return
+
+    expira_em = float(payload["exp"])
+    sessao_banco.execute(
+        insert(models.TokenRevogado)
+        .values(jti=jti, expira_em=datetime.fromtimestamp(expira_em, tz=timezone.utc))
+        .on_conflict_do_nothing(index_elements=[models.TokenRevogado.jti])
+    )
+    sessao_banco.commit()
+    registro_revogacao.revogar(jti, expira_em)
+
+
+def encerrar_sessao(
+    sessao_banco: Session,
+    payload: dict,
+    tipo_sujeito: str,
+    id_sujeito: int,
+    token_renovacao: Optional[str] = None,
+) -> None:
+    """
+    Logout: revoga o access token e, se veio o refresh token do login, a
+    família dele, para que a sessão não possa mais ser renovada.
+    """
+    if token_renovacao:
+        token_renovacao_service.revogar_familia_do_token(
+            sessao_banco, token_renovacao, tipo_sujeito, id_sujeito
+        )
+    revogar_token(sessao_banco, payload)
+
+
+def sincronizar_revogacoes() -> None:
+    """
+    Tarefa periódica: apaga do banco as revogações já expiradas, traz as
+    feitas por outras instâncias e compacta o registro em memória.
+    """
+    agora = datetime.now(timezone.utc)
+    with SessionLocal() as sessao_banco:
+        sessao_banco.query(models.TokenRevogado).filter(
+            models.TokenRevogado.expira_em <= agora
+        ).delete(synchronize_session=False)
+        sessao_banco.commit()
+        linhas = sessao_banco.query(
+            models.TokenRevogado.jti, models.TokenRevogado.expira_em
+        ).all()
+
+    registro_revogacao.mesclar(
+        (linha.jti, linha.expira_em.timestamp()) for linha in linhas
+    )
+    registro_revogacao.compactar(agora.timestamp())
@@ -0,0 +1,230 @@
+"""
+Refresh tokens de uso único com rotação.
+
+O token entregue ao cliente é um valor aleatório opaco; o banco guarda apenas
+o HMAC-SHA256 dele (com a SECRET_KEY), então renovar custa um HMAC e uma
+busca pelo índice único, sem argon2. Cada renovação marca o token como usado
+e emite outro da mesma família. Se um token já usado voltar a aparecer, a
+família inteira é revogada: alguém está reutilizando um token vazado.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from .. import seguranca as seguranca_service
+from ..database import SessionLocal
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+SUJEITO_FUNCIONARIO = "funcionario"
+SUJEITO_CLIENTE = "cliente"
+
+
+def _hash_token(token: str) -> bytes:
+    return hmac.digest(
+        seguranca_service.SECRET_KEY.encode("utf-8"),
+        token.encode("utf-8"),
+        hashlib.sha256,
+    )
+
+
+def _token_invalido_excecao() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido ou expirado.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _adicionar_token(
+    sessao_banco: Session,
+    tipo_sujeito: str,
+    id_sujeito: int,
+    versao_sujeito: int,
+    familia: int,
+) -> str:
+    token = secrets.token_urlsafe(32)
+    sessao_banco.add(
+        models.TokenRenovacao(
+            hash_token=_hash_token(token),
+            familia=familia,
+            tipo_sujeito=tipo_sujeito,
+            id_sujeito=id_sujeito,
+            versao_sujeito=versao_sujeito,
+            expira_em=datetime.now(timezone.utc)
+            + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+def emitir_token_renovacao(
+    sessao_banco: Session,
+    tipo_sujeito: str,
+    id_sujeito: int,
+    versao_sujeito: int = 0,
+) -> str:
+    """Abre uma nova família de refresh tokens (chamada no login)."""
+    token = _adicionar_token(
+        sessao_banco,
+        tipo_sujeito=tipo_sujeito,
+        id_sujeito=id_sujeito,
+        versao_sujeito=versao_sujeito,
+        familia=secrets.randbits(63),
+    )
+    sessao_banco.commit()
+    return token
+
+
+def revogar_familia(sessao_banco: Session, familia: int) -> None:
+    sessao_banco.query(models.TokenRenovacao).filter(
+        models.TokenRenovacao.familia == familia
+    ).update({models.TokenRenovacao.revogado: True}, synchronize_session=False)
+    sessao_banco.commit()
+
+
+def revogar_familia_do_token(
+    sessao_banco: Session, token: str, tipo_sujeito: str, id_sujeito: int
+) -> None:
+    """
+    Revoga a família do refresh token entregue no logout, se ele for do
+    próprio sujeito logado. Tokens desconhecidos são ignorados: o logout é
+    idempotente e não revela se o token existe.
+    """
+    familia = (
+        select(models.TokenRenovacao.familia)
+        .where(
+            models.TokenRenovacao.hash_token == _hash_token(token),
+            models.TokenRenovacao.tipo_sujeito == tipo_sujeito,
+            models.TokenRenovacao.id_sujeito == id_sujeito,
+        )
+        .scalar_subquery()
+    )
+    sessao_banco.execute(
+        update(models.TokenRenovacao)
+        .where(models.TokenRenovacao.familia == familia)
+        .values(revogado=True)
+    )
+    sessao_banco.commit()
+
+
+def _rotacionar(sessao_banco: Session, registro, versao_atual: int, ativo: bool) -> str:
+    """
+    Valida o registro já travado (SELECT ... FOR UPDATE) e troca o token por
+    um novo da mesma família. Um token usado que reaparece derruba a família.
+    """
+    if registro.revogado:
+        sessao_banco.rollback()
+        raise _token_invalido_excecao()
+
+    if registro.usado_em is not None:
+        familia = registro.familia
+        sessao_banco.rollback()
+        revogar_familia(sessao_banco, familia)
+        raise _token_invalido_excecao()
+
+    agora = datetime.now(timezone.utc)
+    if registro.expira_em <= agora or registro.versao_sujeito != versao_atual:
+        sessao_banco.rollback()
+        raise _token_invalido_excecao()
+
+    if not ativo:
+        sessao_banco.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Conta inativa ou bloqueada.",
+        )
+
+    registro.usado_em = agora
+    novo_token = _adicionar_token(
+        sessao_banco,
+        tipo_sujeito=registro.tipo_sujeito,
+        id_sujeito=registro.id_sujeito,
+        versao_sujeito=versao_atual,
+        familia=registro.familia,
+    )
+    sessao_banco.commit()
+    return novo_token
+
+
+def renovar_token_cliente(sessao_banco: Session, token: str) -> Tuple[object, str]:
+    """
+    Retorna (linha do cliente, novo refresh token). A linha traz só as colunas
+    usadas nas claims do access token.
+    """
+    linha = (
+        sessao_banco.query(
+            models.TokenRenovacao,
+            models.Pessoa.id_pessoa,
+            models.Pessoa.email,
+            models.Pessoa.tipo_pessoa,
+            models.Pessoa.token_version,
+            models.Pessoa.e_ativo,
+        )
+        .join(
+            models.Pessoa,
+            models.Pessoa.id_pessoa == models.TokenRenovacao.id_sujeito,
+        )
+        .filter(
+            models.TokenRenovacao.hash_token == _hash_token(token),
+            models.TokenRenovacao.tipo_sujeito == SUJEITO_CLIENTE,
+        )
+        .with_for_update(of=models.TokenRenovacao)
+        .first()
+    )
+    if linha is None:
+        raise _token_invalido_excecao()
+
+    novo_token = _rotacionar(
+        sessao_banco, linha.TokenRenovacao, linha.token_version, linha.e_ativo
+    )
+    return linha, novo_token
+
+
+def renovar_token_funcionario(
+    sessao_banco: Session, token: str
+) -> Tuple[object, str]:
+    linha = (
+        sessao_banco.query(
+            models.TokenRenovacao,
+            models.Funcionario.id_funcionario,
+            models.Funcionario.email,
+            models.Funcionario.e_ativado,
+        )
+        .join(
+            models.Funcionario,
+            models.Funcionario.id_funcionario == models.TokenRenovacao.id_sujeito,
+        )
+        .filter(
+            models.TokenRenovacao.hash_token == _hash_token(token),
+            models.TokenRenovacao.tipo_sujeito == SUJEITO_FUNCIONARIO,
+        )
+        .with_for_update(of=models.TokenRenovacao)
+        .first()
+    )
+    if linha is None:
+        raise _token_invalido_excecao()
+
+    novo_token = _rotacionar(sessao_banco, linha.TokenRenovacao, 0, linha.e_ativado)
+    return linha, novo_token
+
+
+def remover_tokens_expirados() -> int:
+    """Compacta a tabela apagando tokens vencidos. Roda como tarefa periódica."""
+    with SessionLocal() as sessao_banco:
+        removidos = (
+            sessao_banco.query(models.TokenRenovacao)
+            .filter(models.TokenRenovacao.expira_em <= datetime.now(timezone.utc))
+            .delete(synchronize_session=False)
+        )
+        sessao_banco.commit()
+    return removidos
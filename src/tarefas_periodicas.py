@@ -0,0 +1,58 @@
+"""
+Tarefas de manutenção executadas em intervalos fixos enquanto a aplicação
+está no ar (iniciadas e encerradas pelo lifespan em 'main.py').
+"""
+
+import asyncio
+import logging
+from typing import Callable, List
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class TarefasPeriodicas:
+    def __init__(self) -> None:
+        self._tarefas: List[asyncio.Task] = []
+
+    def agendar(
+        self,
+        intervalo_segundos: float,
+        funcao: Callable[[], object],
+        executar_ao_iniciar: bool = False,
+    ) -> None:
+        """
+        Executa 'funcao' (síncrona, no threadpool) a cada 'intervalo_segundos'
+        e, com 'executar_ao_iniciar', também logo ao agendar. Falhas são
+        registradas em log e não interrompem as próximas execuções.
+        """
+        self._tarefas.append(
+            asyncio.create_task(
+                self._repetir(intervalo_segundos, funcao, executar_ao_iniciar)
+            )
+        )
+
+    @staticmethod
+    async def _repetir(
+        intervalo_segundos: float,
+        funcao: Callable[[], object],
+        executar_ao_iniciar: bool,
+    ) -> None:
+        if not executar_ao_iniciar:
+            await asyncio.sleep(intervalo_segundos)
+        while True:
+            try:
+                await run_in_threadpool(funcao)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Falha na tarefa periódica %s", funcao.__name__)
+            await asyncio.sleep(intervalo_segundos)
+
+    async def encerrar(self) -> None:
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*self._tarefas, return_exceptions=True)
+        self._tarefas.clear()
+
+
+tarefas_periodicas = TarefasPeriodicas()
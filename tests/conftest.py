@@ -4,7 +4,8 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from src import models
+from src import limitador_login, models, principais
+from src.revogacao import registro_revogacao
 from src import seguranca as seguranca_service
 from src.database import Base, SessionLocal
 from src.database import engine as engine_real
@@ -23,7 +24,9 @@ def db_session():
         "pessoas_juridicas",
         "enderecos",
         "pessoas",
-        "empresas" 
+        "empresas",
+        "tokens_renovacao",
+        "tokens_revogados",
     ]
     
     with engine_real.connect() as connection:
@@ -47,6 +50,11 @@ def db_session():
 
 @pytest.fixture(scope="function")
 def test_client(db_session):
+    limitador_login.limitador_por_email.limpar()
+    limitador_login.limitador_por_ip.limpar()
+    registro_revogacao.limpar()
+    principais.cache_estado_clientes.limpar()
+    principais.cache_funcionarios.limpar()
     with TestClient(app) as client:
         yield client
 
@@ -1,8 +1,15 @@
 import pytest
 from fastapi.testclient import TestClient
 from httpx import Response
+from passlib.hash import argon2
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from src import dependencies, limitador_login, models, principais
+from src.database import engine_async
+from src import seguranca as seguranca_service
+from src.services import cliente_service
+
 # Testes de Integração (API/DB) para os endpoints de Autenticação.
 # Cobre: /auth/token, /clientes/token, criação de funcionários e permissões de acesso.
 
@@ -32,6 +39,38 @@ def test_login_cliente_senha_incorreta_falha_401(
     print("\n[SUCESSO] Teste 'test_login_cliente_senha_incorreta_falha_401' passou!")
 
 
+@pytest.mark.integration
+def test_email_de_cliente_nao_diferencia_maiusculas(
+    test_client: TestClient, client_auth_data: dict
+):
+    email_maiusculo = client_auth_data["cliente_email"].upper()
+
+    _login_cliente(test_client, email_maiusculo, "senhaCliente123")
+
+    response: Response = test_client.post(
+        "/clientes/pessoas-fisicas/",
+        json={
+            "email": email_maiusculo,
+            "telefone": "11999999999",
+            "nome_completo": "Outro Cliente",
+            "cpf": "98765432100",
+            "cnh": "98765432100",
+            "senha_texto_puro": "senhaOutro123",
+            "endereco": {
+                "rua": "Rua X",
+                "numero": "1",
+                "bairro": "B",
+                "cidade": "C",
+                "estado": "SP",
+                "cep": "01000000",
+            },
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email já cadastrado."
+    print("\n[SUCESSO] Teste 'test_email_de_cliente_nao_diferencia_maiusculas' passou!")
+
+
 @pytest.mark.integration
 def test_pj_remove_motorista_sucesso_200(
     test_client: TestClient,
@@ -208,3 +247,546 @@ def test_admin_tenta_criar_funcionario_email_duplicado_falha_400(
     print(
         "\n[SUCESSO] Teste 'test_admin_tenta_criar_funcionario_email_duplicado_falha_400' passou!"
     )
+
+
+@pytest.mark.integration
+def test_login_admin_sucesso_retorna_token(
+    test_client: TestClient, admin_auth_headers: dict
+):
+    login_data = {"username": "admin_test@locadora.com", "password": "senhasegura123"}
+
+    response: Response = test_client.post("/auth/token", data=login_data)
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert response.json()["access_token"]
+    print("\n[SUCESSO] Teste 'test_login_admin_sucesso_retorna_token' passou!")
+
+
+@pytest.mark.integration
+def test_login_cliente_sucesso_retorna_token(
+    test_client: TestClient, client_auth_data: dict
+):
+    login_data = {
+        "username": client_auth_data["cliente_email"],
+        "password": "senhaCliente123",
+    }
+
+    response: Response = test_client.post("/clientes/token", data=login_data)
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert response.json()["access_token"]
+    print("\n[SUCESSO] Teste 'test_login_cliente_sucesso_retorna_token' passou!")
+
+
+@pytest.mark.integration
+def test_login_cliente_regrava_hash_com_parametros_antigos(
+    test_client: TestClient, client_auth_data: dict, db_session: Session
+):
+    hash_fraco = argon2.using(rounds=1, memory_cost=1024, parallelism=1).hash(
+        "senhaCliente123"
+    )
+    cliente = db_session.get(models.Pessoa, client_auth_data["cliente_id"])
+    cliente.senha = hash_fraco
+    db_session.commit()
+
+    login_data = {
+        "username": client_auth_data["cliente_email"],
+        "password": "senhaCliente123",
+    }
+    response: Response = test_client.post("/clientes/token", data=login_data)
+
+    assert response.status_code == 200
+    db_session.expire_all()
+    cliente = db_session.get(models.Pessoa, client_auth_data["cliente_id"])
+    assert cliente.senha != hash_fraco
+    assert seguranca_service.senha_precisa_rehash(cliente.senha) is False
+    assert seguranca_service.verificar_senha("senhaCliente123", cliente.senha)
+    print(
+        "\n[SUCESSO] Teste 'test_login_cliente_regrava_hash_com_parametros_antigos' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_login_cliente_excesso_de_tentativas_falha_429(
+    test_client: TestClient, mocker
+):
+    mock_autenticar = mocker.patch(
+        "src.routers.cliente_auth_router.cliente_auth_service.autenticar_cliente_async"
+    )
+    mock_autenticar.return_value = None
+    login_data = {"username": "alvo.ataque@cliente.com", "password": "chute"}
+
+    limite = limitador_login.limitador_por_email.limite
+    for _ in range(limite):
+        assert test_client.post("/clientes/token", data=login_data).status_code == 401
+
+    response: Response = test_client.post("/clientes/token", data=login_data)
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert mock_autenticar.call_count == limite
+    print("\n[SUCESSO] Teste 'test_login_cliente_excesso_de_tentativas_falha_429' passou!")
+
+
+@pytest.mark.integration
+def test_login_devolve_conexao_ao_pool_durante_o_hash(
+    test_client: TestClient, admin_auth_headers: dict, pj_auth_data: dict, monkeypatch
+):
+    verificar_senha_original = seguranca_service.verificar_senha_async
+    conexoes_durante_hash = []
+
+    async def _verificar_senha_medindo(**kwargs):
+        conexoes_durante_hash.append(engine_async.pool.checkedout())
+        return await verificar_senha_original(**kwargs)
+
+    monkeypatch.setattr(
+        seguranca_service, "verificar_senha_async", _verificar_senha_medindo
+    )
+
+    response_admin: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    response_cliente: Response = test_client.post(
+        "/clientes/token",
+        data={"username": pj_auth_data["cliente_email"], "password": "senhaEmpresa123"},
+    )
+
+    assert response_admin.status_code == 200
+    assert response_cliente.status_code == 200
+    assert conexoes_durante_hash == [0, 0]
+    print("\n[SUCESSO] Teste 'test_login_devolve_conexao_ao_pool_durante_o_hash' passou!")
+
+
+@pytest.mark.integration
+def test_jwks_publico_com_cache_control(test_client: TestClient):
+    response: Response = test_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "keys" in response.json()
+    assert "max-age" in response.headers["Cache-Control"]
+    print("\n[SUCESSO] Teste 'test_jwks_publico_com_cache_control' passou!")
+
+
+@pytest.mark.integration
+def test_metricas_exigem_chave_de_servico(test_client: TestClient, monkeypatch):
+    monkeypatch.setattr(dependencies, "CHAVE_SERVICO_INTERNO", "chave-interna")
+
+    response_sem_chave: Response = test_client.get("/metrics")
+    response: Response = test_client.get(
+        "/metrics", headers={"X-Chave-Servico": "chave-interna"}
+    )
+
+    assert response_sem_chave.status_code == 401
+    assert response.status_code == 200
+    assert "frotanext_" in response.text
+    print("\n[SUCESSO] Teste 'test_metricas_exigem_chave_de_servico' passou!")
+
+
+def _login_cliente(test_client: TestClient, email: str, senha: str) -> dict:
+    response: Response = test_client.post(
+        "/clientes/token", data={"username": email, "password": senha}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.integration
+def test_principal_via_claims_usa_cache_e_cai_apos_revogacao(
+    test_client: TestClient,
+    pj_auth_data: dict,
+    client_auth_data: dict,
+    db_session: Session,
+    monkeypatch,
+):
+    monkeypatch.setattr(principais, "AUTH_CLIENTE_VIA_CLAIMS", True)
+    principais.cache_estado_clientes.limpar()
+    headers_pj = _login_cliente(
+        test_client, pj_auth_data["cliente_email"], "senhaEmpresa123"
+    )
+    dados_associacao = {"id_pessoa_fisica": client_auth_data["cliente_id"]}
+
+    response1 = test_client.post(
+        "/minha-empresa/motoristas", json=dados_associacao, headers=headers_pj
+    )
+    acertos_antes = principais.cache_estado_clientes.acertos.valor
+    response2 = test_client.post(
+        "/minha-empresa/motoristas", json=dados_associacao, headers=headers_pj
+    )
+
+    assert response1.status_code == 200
+    assert response2.status_code == 200
+    assert principais.cache_estado_clientes.acertos.valor == acertos_antes + 1
+
+    cliente_service.revogar_tokens_cliente(
+        id_pessoa=pj_auth_data["cliente_id"], sessao_banco=db_session
+    )
+    response3 = test_client.post(
+        "/minha-empresa/motoristas", json=dados_associacao, headers=headers_pj
+    )
+
+    assert response3.status_code == 401
+    print(
+        "\n[SUCESSO] Teste 'test_principal_via_claims_usa_cache_e_cai_apos_revogacao' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_cliente_desativado_perde_acesso_com_token_valido(
+    test_client: TestClient, pj_auth_data: dict, db_session: Session
+):
+    empresa = db_session.get(models.PessoaJuridica, pj_auth_data["cliente_id"])
+    empresa.e_ativo = False
+    db_session.commit()
+
+    response: Response = test_client.post(
+        "/minha-empresa/motoristas",
+        json={"id_pessoa_fisica": 1},
+        headers=pj_auth_data["headers"],
+    )
+
+    assert response.status_code == 403
+    assert "bloqueada" in response.json()["detail"]
+    print(
+        "\n[SUCESSO] Teste 'test_cliente_desativado_perde_acesso_com_token_valido' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_desativar_cliente_derruba_token_de_acesso_e_renovacao(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    pj_auth_data: dict,
+    monkeypatch,
+):
+    monkeypatch.setattr(principais, "AUTH_CLIENTE_VIA_CLAIMS", True)
+    principais.cache_estado_clientes.limpar()
+    response_login: Response = test_client.post(
+        "/clientes/token",
+        data={"username": pj_auth_data["cliente_email"], "password": "senhaEmpresa123"},
+    )
+    headers_pj = {"Authorization": f"Bearer {response_login.json()['access_token']}"}
+    assert test_client.get("/minha-empresa/motoristas", headers=headers_pj).status_code == 200
+
+    url_status = f"/clientes/{pj_auth_data['cliente_id']}/status"
+    response_desativar = test_client.patch(
+        url_status, json={"e_ativo": False}, headers=admin_auth_headers
+    )
+
+    assert response_desativar.status_code == 204
+    assert test_client.get("/minha-empresa/motoristas", headers=headers_pj).status_code == 401
+    response_renovacao = test_client.post(
+        "/clientes/token/renovar",
+        json={"refresh_token": response_login.json()["refresh_token"]},
+    )
+    assert response_renovacao.status_code == 401
+    assert (
+        test_client.patch(
+            "/clientes/999999/status", json={"e_ativo": False}, headers=admin_auth_headers
+        ).status_code
+        == 404
+    )
+
+    response_reativar = test_client.patch(
+        url_status, json={"e_ativo": True}, headers=admin_auth_headers
+    )
+    assert response_reativar.status_code == 204
+    _login_cliente(test_client, pj_auth_data["cliente_email"], "senhaEmpresa123")
+    print(
+        "\n[SUCESSO] Teste 'test_desativar_cliente_derruba_token_de_acesso_e_renovacao' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_trocar_email_do_cliente_derruba_tokens_emitidos(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    pj_auth_data: dict,
+    monkeypatch,
+):
+    monkeypatch.setattr(principais, "AUTH_CLIENTE_VIA_CLAIMS", True)
+    principais.cache_estado_clientes.limpar()
+    headers_pj = _login_cliente(
+        test_client, pj_auth_data["cliente_email"], "senhaEmpresa123"
+    )
+    assert test_client.get("/minha-empresa/motoristas", headers=headers_pj).status_code == 200
+    dados_atualizacao = {
+        "email": "novo.email@empresa.com",
+        "telefone": "888888888",
+        "razao_social": "Empresa de Teste LTDA",
+        "cnpj": "12345678000199",
+        "senha_texto_puro": "senhaEmpresa123",
+        "endereco": {
+            "rua": "Rua Teste Empresa",
+            "numero": "200",
+            "bairro": "Bairro Empresarial",
+            "cidade": "Cidade Teste",
+            "estado": "TS",
+            "cep": "54321000",
+        },
+    }
+
+    response_atualizacao = test_client.put(
+        f"/clientes/pessoas-juridicas/{pj_auth_data['cliente_id']}",
+        json=dados_atualizacao,
+        headers=admin_auth_headers,
+    )
+
+    assert response_atualizacao.status_code == 200
+    assert test_client.get("/minha-empresa/motoristas", headers=headers_pj).status_code == 401
+    print(
+        "\n[SUCESSO] Teste 'test_trocar_email_do_cliente_derruba_tokens_emitidos' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_funcionario_token_com_id_usa_cache_de_principais(
+    test_client: TestClient, admin_auth_headers: dict, db_session: Session
+):
+    principais.cache_funcionarios.limpar()
+    response_login: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    token = response_login.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert isinstance(seguranca_service.verificar_token(token)["id_funcionario"], int)
+
+    assert test_client.get("/auth/funcionarios/eu", headers=headers).status_code == 200
+    acertos_antes = principais.cache_funcionarios.acertos.valor
+    response: Response = test_client.get("/auth/funcionarios/eu", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "admin_test@locadora.com"
+    assert principais.cache_funcionarios.acertos.valor == acertos_antes + 1
+
+    admin = (
+        db_session.query(models.Funcionario)
+        .filter_by(email="admin_test@locadora.com")
+        .first()
+    )
+    admin.e_ativado = False
+    db_session.commit()
+    principais.invalidar_funcionario(admin.id_funcionario)
+
+    response_inativo = test_client.get("/auth/funcionarios/eu", headers=headers)
+
+    assert response_inativo.status_code == 403
+    print(
+        "\n[SUCESSO] Teste 'test_funcionario_token_com_id_usa_cache_de_principais' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_refresh_token_rotaciona_e_reuso_revoga_familia(
+    test_client: TestClient, pj_auth_data: dict
+):
+    response_login: Response = test_client.post(
+        "/clientes/token",
+        data={"username": pj_auth_data["cliente_email"], "password": "senhaEmpresa123"},
+    )
+    refresh_original = response_login.json()["refresh_token"]
+
+    response_renovacao = test_client.post(
+        "/clientes/token/renovar", json={"refresh_token": refresh_original}
+    )
+    assert response_renovacao.status_code == 200
+    refresh_novo = response_renovacao.json()["refresh_token"]
+    assert refresh_novo != refresh_original
+    payload = seguranca_service.verificar_token(response_renovacao.json()["access_token"])
+    assert payload["sub"] == str(pj_auth_data["cliente_id"])
+    assert payload["tipo"] == "pessoa_juridica"
+
+    response_reuso = test_client.post(
+        "/clientes/token/renovar", json={"refresh_token": refresh_original}
+    )
+    assert response_reuso.status_code == 401
+
+    response_familia_revogada = test_client.post(
+        "/clientes/token/renovar", json={"refresh_token": refresh_novo}
+    )
+    assert response_familia_revogada.status_code == 401
+    print(
+        "\n[SUCESSO] Teste 'test_refresh_token_rotaciona_e_reuso_revoga_familia' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_refresh_token_funcionario_e_invalidado_pela_revogacao_do_cliente(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    pj_auth_data: dict,
+    db_session: Session,
+):
+    response_admin: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    response_renovacao = test_client.post(
+        "/auth/token/renovar",
+        json={"refresh_token": response_admin.json()["refresh_token"]},
+    )
+    assert response_renovacao.status_code == 200
+    assert (
+        seguranca_service.verificar_token(response_renovacao.json()["access_token"])[
+            "sub"
+        ]
+        == "admin_test@locadora.com"
+    )
+
+    response_cliente: Response = test_client.post(
+        "/clientes/token",
+        data={"username": pj_auth_data["cliente_email"], "password": "senhaEmpresa123"},
+    )
+    refresh_cliente = response_cliente.json()["refresh_token"]
+    assert (
+        test_client.post(
+            "/auth/token/renovar", json={"refresh_token": refresh_cliente}
+        ).status_code
+        == 401
+    )
+
+    cliente_service.revogar_tokens_cliente(
+        id_pessoa=pj_auth_data["cliente_id"], sessao_banco=db_session
+    )
+    response_revogado = test_client.post(
+        "/clientes/token/renovar", json={"refresh_token": refresh_cliente}
+    )
+
+    assert response_revogado.status_code == 401
+    print(
+        "\n[SUCESSO] Teste 'test_refresh_token_funcionario_e_invalidado_pela_revogacao_do_cliente' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_introspeccao_em_lote_resolve_tokens_com_uma_consulta(
+    test_client: TestClient,
+    admin_auth_headers: dict,
+    client_auth_data: dict,
+    pj_auth_data: dict,
+    db_session: Session,
+    monkeypatch,
+):
+    monkeypatch.setattr(dependencies, "CHAVE_SERVICO_INTERNO", "chave-interna")
+    token_admin = admin_auth_headers["Authorization"].split()[1]
+    token_pf = client_auth_data["headers"]["Authorization"].split()[1]
+    token_pj = seguranca_service.criar_token_acesso(
+        dados={"sub": str(pj_auth_data["cliente_id"]), "ver": 0}
+    )
+    cliente_service.revogar_tokens_cliente(
+        id_pessoa=pj_auth_data["cliente_id"], sessao_banco=db_session
+    )
+    corpo = {"tokens": [token_admin, "nao.e.um.token", token_pf, token_pj]}
+
+    assert test_client.post("/auth/introspect", json=corpo).status_code == 401
+
+    consultas = []
+
+    def _contar(*_args):
+        consultas.append(1)
+
+    event.listen(engine_async.sync_engine, "before_cursor_execute", _contar)
+    try:
+        response: Response = test_client.post(
+            "/auth/introspect", json=corpo, headers={"X-Chave-Servico": "chave-interna"}
+        )
+    finally:
+        event.remove(engine_async.sync_engine, "before_cursor_execute", _contar)
+
+    assert response.status_code == 200
+    resultados = response.json()["resultados"]
+    assert [item["active"] for item in resultados] == [True, False, True, False]
+    assert resultados[0]["tipo_sujeito"] == "funcionario"
+    assert resultados[2]["claims"]["sub"] == str(client_auth_data["cliente_id"])
+    assert len(consultas) == 1
+    print(
+        "\n[SUCESSO] Teste 'test_introspeccao_em_lote_resolve_tokens_com_uma_consulta' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_introspeccao_de_token_antigo_de_funcionario_ignora_maiusculas(
+    test_client: TestClient, admin_auth_headers: dict, monkeypatch
+):
+    monkeypatch.setattr(dependencies, "CHAVE_SERVICO_INTERNO", "chave-interna")
+    token_antigo = seguranca_service.criar_token_acesso(
+        dados={"sub": "Admin_Test@Locadora.com"}
+    )
+
+    response: Response = test_client.post(
+        "/auth/introspect",
+        json={"tokens": [token_antigo]},
+        headers={"X-Chave-Servico": "chave-interna"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["resultados"][0]["active"] is True
+    assert response.json()["resultados"][0]["tipo_sujeito"] == "funcionario"
+    print(
+        "\n[SUCESSO] Teste 'test_introspeccao_de_token_antigo_de_funcionario_ignora_maiusculas' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_logout_revoga_token_antes_do_exp(
+    test_client: TestClient, admin_auth_headers: dict, pj_auth_data: dict
+):
+    headers_pj = _login_cliente(
+        test_client, pj_auth_data["cliente_email"], "senhaEmpresa123"
+    )
+    response_admin: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    headers_admin = {"Authorization": f"Bearer {response_admin.json()['access_token']}"}
+
+    assert test_client.post("/clientes/logout", headers=headers_pj).status_code == 204
+    assert test_client.post("/auth/logout", headers=headers_admin).status_code == 204
+
+    response_pj = test_client.post(
+        "/minha-empresa/motoristas", json={"id_pessoa_fisica": 1}, headers=headers_pj
+    )
+    response_admin_eu = test_client.get("/auth/funcionarios/eu", headers=headers_admin)
+
+    assert response_pj.status_code == 401
+    assert response_admin_eu.status_code == 401
+    assert test_client.get(
+        "/auth/funcionarios/eu", headers=admin_auth_headers
+    ).status_code == 200
+    print("\n[SUCESSO] Teste 'test_logout_revoga_token_antes_do_exp' passou!")
+
+
+@pytest.mark.integration
+def test_logout_com_refresh_token_impede_renovacao(
+    test_client: TestClient, admin_auth_headers: dict, pj_auth_data: dict
+):
+    login_cliente: Response = test_client.post(
+        "/clientes/token",
+        data={"username": pj_auth_data["cliente_email"], "password": "senhaEmpresa123"},
+    )
+    login_admin: Response = test_client.post(
+        "/auth/token",
+        data={"username": "admin_test@locadora.com", "password": "senhasegura123"},
+    )
+    sessoes = [
+        ("/clientes", login_cliente.json()),
+        ("/auth", login_admin.json()),
+    ]
+
+    for prefixo, tokens in sessoes:
+        response_logout = test_client.post(
+            f"{prefixo}/logout",
+            json={"refresh_token": tokens["refresh_token"]},
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        )
+        assert response_logout.status_code == 204
+
+        response_renovacao = test_client.post(
+            f"{prefixo}/token/renovar",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response_renovacao.status_code == 401
+    print("\n[SUCESSO] Teste 'test_logout_com_refresh_token_impede_renovacao' passou!")
@@ -1,10 +1,25 @@
+import base64
+import csv
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from httpx import Response
+from sqlalchemy import event
 
+from src import dependencies, filtro_ids, main, models
+from src import seguranca as seguranca_service
+from src.database import SessionAsyncLocal, SessionLocal, engine_async
+from src.database import engine as engine_real
 from src.main import app
+from src.replicas import RoteadorSessoes
+from src.schemas import cliente_schema
+from src.services import cliente_service
 
 # Testes de Integração (API/DB) para os endpoints de Clientes.
 # Cobre: Auto-cadastro (PF/PJ), gerenciamento de admin (CRUD) e o portal /minha-empresa.
@@ -122,13 +137,50 @@ def test_admin_lista_pessoas_fisicas_sucesso(
         "/clientes/pessoas-fisicas/", headers=admin_auth_headers
     )
     assert response.status_code == 200
-    lista_pf = response.json()
+    lista_pf = response.json()["itens"]
     assert isinstance(lista_pf, list)
     assert len(lista_pf) >= 1
     assert lista_pf[0]["email"] == client_auth_data["cliente_email"]
     print("\n[SUCESSO] Teste 'test_admin_lista_pessoas_fisicas_sucesso' passou!")
 
 
+@pytest.mark.integration
+def test_leitura_na_replica_e_leitura_apos_escrita_no_primario(
+    test_client: TestClient, admin_auth_headers: dict, monkeypatch
+):
+    sessoes_replica = []
+
+    def _fabrica_replica():
+        sessoes_replica.append(1)
+        return SessionAsyncLocal()
+
+    roteador = RoteadorSessoes(SessionAsyncLocal, [_fabrica_replica])
+    monkeypatch.setattr(dependencies, "roteador_sessoes", roteador)
+    monkeypatch.setattr(main, "roteador_sessoes", roteador)
+
+    response = test_client.get("/clientes/pessoas-fisicas/", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert len(sessoes_replica) == 1
+
+    response = test_client.post(
+        "/clientes/pessoas-fisicas/", json=dados_validos_pessoa_fisica[0]
+    )
+    assert response.status_code == 201
+    assert "frotanext_ultima_escrita" in response.cookies
+
+    response = test_client.get("/clientes/pessoas-fisicas/", headers=admin_auth_headers)
+    assert response.status_code == 200
+    assert len(sessoes_replica) == 1
+    assert response.json()["itens"][0]["email"] == dados_validos_pessoa_fisica[0]["email"]
+
+    test_client.cookies.clear()
+    test_client.get("/clientes/pessoas-fisicas/", headers=admin_auth_headers)
+    assert len(sessoes_replica) == 2
+    print(
+        "\n[SUCESSO] Teste 'test_leitura_na_replica_e_leitura_apos_escrita_no_primario' passou!"
+    )
+
+
 @pytest.mark.integration
 def test_admin_lista_pessoas_juridicas_sucesso(
     test_client: TestClient, admin_auth_headers: dict, pj_auth_data: dict
@@ -141,7 +193,7 @@ def test_admin_lista_pessoas_juridicas_sucesso(
         "/clientes/pessoas-juridicas/", headers=admin_auth_headers
     )
     assert response.status_code == 200
-    lista_pj = response.json()
+    lista_pj = response.json()["itens"]
     assert isinstance(lista_pj, list)
     assert len(lista_pj) >= 1
     assert lista_pj[0]["email"] == pj_auth_data["cliente_email"]
@@ -363,6 +415,33 @@ def test_criar_pessoa_fisica_cpf_duplicado(test_client):
     print("\n[SUCESSO] Teste 'test_criar_pessoa_fisica_cpf_duplicado' passou")
 
 
+@pytest.mark.integration
+def test_cadastro_repetido_e_recusado_antes_do_hash(
+    test_client: TestClient, client_auth_data: dict, pj_auth_data: dict, mocker
+):
+    espiao_hash = mocker.spy(seguranca_service, "obter_hash_senha_async")
+    dados_pf = dict(dados_validos_pessoa_fisica[0])
+    dados_pf["cnh"] = "12345678901"
+    dados_pj = {
+        "email": "EMPRESA_TESTE@email.com",
+        "telefone": "888888888",
+        "razao_social": "Outra Empresa LTDA",
+        "cnpj": "00000000000100",
+        "senha_texto_puro": "senhaEmpresa123",
+        "endereco": dados_pf["endereco"],
+    }
+
+    response_pf = test_client.post("/clientes/pessoas-fisicas/", json=dados_pf)
+    response_pj = test_client.post("/clientes/pessoas-juridicas/", json=dados_pj)
+
+    assert response_pf.status_code == 400
+    assert response_pf.json()["detail"] == "CNH já cadastrada."
+    assert response_pj.status_code == 400
+    assert response_pj.json()["detail"] == "Email já cadastrado."
+    espiao_hash.assert_not_called()
+    print("\n[SUCESSO] Teste 'test_cadastro_repetido_e_recusado_antes_do_hash' passou!")
+
+
 @pytest.mark.integration
 def test_criar_pessoa_fisica_email_invalido(test_client):
     dados_email_invalido = {
@@ -520,3 +599,605 @@ def test_criar_pessoa_juridica_com_motoristas_validos_sucesso(
     print(
         "\n[SUCESSO] Teste 'test_criar_pessoa_juridica_com_motoristas_validos_sucesso' passou!"
     )
+
+
+def _endereco_modelo(numero: int) -> models.Endereco:
+    return models.Endereco(
+        rua="Rua Carga", numero=str(numero), bairro="B", cidade="C", estado="SP", cep="01000000"
+    )
+
+
+def _cadastrar_empresas(db_session, quantidade: int, motoristas_por_empresa: int):
+    inicio = db_session.query(models.Pessoa).count()
+    for i in range(inicio, inicio + quantidade):
+        empresa = models.PessoaJuridica(
+            email=f"carga_pj{i}@email.com",
+            telefone="1100000000",
+            senha="hash",
+            razao_social=f"Empresa Carga {i}",
+            cnpj=f"{i:014d}",
+            endereco=_endereco_modelo(i),
+        )
+        for j in range(motoristas_por_empresa):
+            empresa.motoristas.append(
+                models.PessoaFisica(
+                    email=f"carga_pf{i}_{j}@email.com",
+                    telefone="1100000000",
+                    senha="hash",
+                    nome_completo=f"Motorista {i}-{j}",
+                    cpf=f"{i:06d}{j:05d}",
+                    cnh=f"{i:06d}{j:05d}",
+                    endereco=_endereco_modelo(j),
+                )
+            )
+        db_session.add(empresa)
+    db_session.commit()
+
+
+def _contar_consultas(funcao, esquema):
+    consultas = []
+
+    def _contar(*_args):
+        consultas.append(1)
+
+    event.listen(engine_real, "before_cursor_execute", _contar)
+    try:
+        with SessionLocal() as sessao_banco:
+            serializado = esquema.model_validate(funcao(sessao_banco=sessao_banco))
+    finally:
+        event.remove(engine_real, "before_cursor_execute", _contar)
+    return len(consultas), serializado
+
+
+@pytest.mark.integration
+def test_listagens_de_clientes_usam_numero_fixo_de_consultas(db_session):
+    _cadastrar_empresas(db_session, quantidade=1, motoristas_por_empresa=1)
+    consultas_pj_poucas, _ = _contar_consultas(
+        cliente_service.listar_pessoas_juridicas,
+        cliente_schema.SchemaPaginaPessoasJuridicas,
+    )
+
+    _cadastrar_empresas(db_session, quantidade=20, motoristas_por_empresa=3)
+    consultas_pj, pagina_pj = _contar_consultas(
+        cliente_service.listar_pessoas_juridicas,
+        cliente_schema.SchemaPaginaPessoasJuridicas,
+    )
+    consultas_pf, pagina_pf = _contar_consultas(
+        lambda sessao_banco: cliente_service.listar_pessoas_fisicas(
+            sessao_banco=sessao_banco,
+            filtros=cliente_schema.SchemaFiltroClientes(limit=500),
+        ),
+        cliente_schema.SchemaPaginaPessoasFisicas,
+    )
+    empresas, motoristas = pagina_pj.itens, pagina_pf.itens
+    consultas_busca, empresa = _contar_consultas(
+        lambda sessao_banco: cliente_service.buscar_pessoa_juridica_por_id(
+            id_pessoa=empresas[-1].id_pessoa, sessao_banco=sessao_banco
+        ),
+        cliente_schema.SchemaPessoaJuridica,
+    )
+
+    assert len(empresas) == 21 and len(motoristas) == 61
+    assert consultas_pj == consultas_pj_poucas == 2
+    assert consultas_pf == 1
+    assert consultas_busca == 2
+    assert len(empresa.motoristas) == 3
+    assert empresa.motoristas[0].endereco.rua == "Rua Carga"
+    print("\n[SUCESSO] Teste 'test_listagens_de_clientes_usam_numero_fixo_de_consultas' passou!")
+
+
+@pytest.mark.integration
+def test_admin_lista_pessoas_fisicas_paginada_com_filtros(
+    test_client: TestClient, admin_auth_headers: dict, db_session
+):
+    _cadastrar_empresas(db_session, quantidade=2, motoristas_por_empresa=3)
+    motorista_inativo = (
+        db_session.query(models.PessoaFisica).order_by(models.Pessoa.id_pessoa).first()
+    )
+    motorista_inativo.e_ativo = False
+    db_session.commit()
+
+    emails = []
+    cursor = None
+    while True:
+        params = {"limit": 4, "cidade": "C", "e_ativo": True}
+        if cursor:
+            params["cursor"] = cursor
+        response = test_client.get(
+            "/clientes/pessoas-fisicas/", params=params, headers=admin_auth_headers
+        )
+        assert response.status_code == 200
+        pagina = response.json()
+        assert len(pagina["itens"]) <= 4
+        emails += [item["email"] for item in pagina["itens"]]
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(emails) == len(set(emails)) == 5
+    assert motorista_inativo.email not in emails
+
+    response = test_client.get(
+        "/clientes/pessoas-fisicas/",
+        params={"estado": "RJ"},
+        headers=admin_auth_headers,
+    )
+    assert response.json() == {"itens": [], "next_cursor": None}
+
+    response = test_client.get(
+        "/clientes/pessoas-fisicas/",
+        params={"cursor": "nao-e-um-cursor"},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 400
+
+    # Decodifica para um inteiro válido, mas fora da faixa da coluna INTEGER.
+    cursor_fora_da_faixa = (
+        base64.urlsafe_b64encode(b"99999999999999999999").decode().rstrip("=")
+    )
+    response = test_client.get(
+        "/clientes/pessoas-fisicas/",
+        params={"cursor": cursor_fora_da_faixa},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido."
+    print("\n[SUCESSO] Teste 'test_admin_lista_pessoas_fisicas_paginada_com_filtros' passou!")
+
+
+@pytest.mark.integration
+def test_listagem_inclui_clientes_sem_endereco(
+    test_client: TestClient, admin_auth_headers: dict, db_session
+):
+    _cadastrar_empresas(db_session, quantidade=1, motoristas_por_empresa=2)
+    sem_endereco = (
+        db_session.query(models.PessoaFisica).order_by(models.Pessoa.id_pessoa).first()
+    )
+    db_session.delete(sem_endereco.endereco)
+    db_session.commit()
+
+    response = test_client.get(
+        "/clientes/pessoas-fisicas/", headers=admin_auth_headers
+    )
+    response_filtrada = test_client.get(
+        "/clientes/pessoas-fisicas/", params={"cidade": "C"}, headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    itens = {item["id_pessoa"]: item for item in response.json()["itens"]}
+    assert len(itens) == 2
+    assert itens[sem_endereco.id_pessoa]["endereco"] is None
+    assert [item["id_pessoa"] for item in response_filtrada.json()["itens"]] == [
+        id_pessoa for id_pessoa in itens if id_pessoa != sem_endereco.id_pessoa
+    ]
+    print("\n[SUCESSO] Teste 'test_listagem_inclui_clientes_sem_endereco' passou!")
+
+
+@pytest.mark.integration
+def test_admin_exporta_clientes_em_ndjson_e_csv(
+    test_client: TestClient, admin_auth_headers: dict, db_session
+):
+    _cadastrar_empresas(db_session, quantidade=3, motoristas_por_empresa=2)
+
+    response = test_client.get(
+        "/clientes/pessoas-fisicas/exportar", headers=admin_auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas_pf = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(linhas_pf) == 6
+    assert linhas_pf[0]["endereco_cidade"] == "C"
+    assert linhas_pf[0]["empresa_id"] is not None
+
+    response = test_client.get(
+        "/clientes/pessoas-juridicas/exportar",
+        params={"formato": "csv"},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 200
+    linhas_pj = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(linhas_pj) == 3
+    assert len(linhas_pj[0]["motoristas_ids"].split(";")) == 2
+    assert linhas_pj[0]["endereco_rua"] == "Rua Carga"
+    print("\n[SUCESSO] Teste 'test_admin_exporta_clientes_em_ndjson_e_csv' passou!")
+
+
+@pytest.mark.integration
+def test_cadastros_simultaneos_com_mesmo_cpf_so_um_grava(db_session):
+    concorrentes = 8
+    barreira = threading.Barrier(concorrentes)
+
+    def _cadastrar(indice: int):
+        dados = dict(dados_validos_pessoa_fisica[0])
+        dados["email"] = f"concorrente{indice}@email.com"
+        dados["cnh"] = f"cnh-concorrente-{indice}"
+        with SessionLocal() as sessao_banco:
+            barreira.wait()
+            try:
+                cliente_service.criar_pessoa_fisica(
+                    cliente_schema.SchemaPessoaFisicaCriar(**dados),
+                    sessao_banco=sessao_banco,
+                    hash_senha="hash",
+                )
+                return "criado"
+            except HTTPException as exc:
+                return exc.detail
+
+    with ThreadPoolExecutor(max_workers=concorrentes) as executor:
+        resultados = list(executor.map(_cadastrar, range(concorrentes)))
+
+    assert resultados.count("criado") == 1
+    assert resultados.count("CPF já cadastrado.") == concorrentes - 1
+    assert (
+        db_session.query(models.PessoaFisica)
+        .filter_by(cpf=dados_validos_pessoa_fisica[0]["cpf"])
+        .count()
+        == 1
+    )
+    print("\n[SUCESSO] Teste 'test_cadastros_simultaneos_com_mesmo_cpf_so_um_grava' passou!")
+
+
+@pytest.mark.integration
+def test_admin_importa_pessoas_fisicas_em_lote_com_erros_por_registro(
+    test_client: TestClient, admin_auth_headers: dict, client_auth_data: dict
+):
+    lote = [dict(dados, endereco=dict(dados["endereco"])) for dados in dados_validos_pessoa_fisica]
+    lote.append({**dados_validos_pessoa_fisica[0], "email": "outro@email.com"})
+    lote.append({**dados_validos_pessoa_fisica[0], "email": "sem-arroba"})
+    lote.append(
+        {
+            **dados_validos_pessoa_fisica[1],
+            "email": client_auth_data["cliente_email"].upper(),
+            "cpf": "99900099900",
+            "cnh": "9000000009",
+        }
+    )
+
+    response = test_client.post(
+        "/clientes/pessoas-fisicas/importar", json=lote, headers=admin_auth_headers
+    )
+    assert response.status_code == 200
+    resultado = response.json()
+    assert resultado["importados"] == 3
+    assert [erro["linha"] for erro in resultado["erros"]] == [4, 5, 6]
+    assert "CPF repetido no lote (registro 1)." in resultado["erros"][0]["erros"]
+    assert resultado["erros"][2]["erros"] == ["Email já cadastrado."]
+
+    response = test_client.get(
+        f"/clientes/pessoas-fisicas/{resultado['ids'][1]}", headers=admin_auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["endereco"]["complemento"] == "Bloco B"
+
+    login = test_client.post(
+        "/clientes/token",
+        data={
+            "username": dados_validos_pessoa_fisica[2]["email"],
+            "password": dados_validos_pessoa_fisica[2]["senha_texto_puro"],
+        },
+    )
+    assert login.status_code == 200
+
+    colunas = (
+        "email,telefone,nome_completo,cpf,cnh,senha_texto_puro,endereco_rua,"
+        "endereco_numero,endereco_bairro,endereco_cidade,endereco_estado,endereco_cep"
+    )
+    csv_lote = (
+        f"{colunas}\n"
+        "csv1@email.com,11,Cliente CSV,55500055500,5000000005,senhaValida5,"
+        "Rua,1,Centro,SP,SP,01000000\n"
+        f"csv2@email.com,11,Cliente CSV 2,{dados_validos_pessoa_fisica[0]['cpf']},"
+        "6000000006,senhaValida6,Rua,2,Centro,SP,SP,01000000\n"
+    )
+    response = test_client.post(
+        "/clientes/pessoas-fisicas/importar",
+        content=csv_lote.encode(),
+        headers={**admin_auth_headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["importados"] == 1
+    assert response.json()["erros"] == [{"linha": 2, "erros": ["CPF já cadastrado."]}]
+
+    response = test_client.post(
+        "/clientes/pessoas-fisicas/importar",
+        json=lote,
+        headers=client_auth_data["headers"],
+    )
+    assert response.status_code == 401
+    print(
+        "\n[SUCESSO] Teste 'test_admin_importa_pessoas_fisicas_em_lote_com_erros_por_registro' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_corpo_sem_content_length_e_recusado_ao_passar_do_limite(
+    test_client: TestClient, admin_auth_headers: dict, monkeypatch
+):
+    monkeypatch.setattr(main, "MAX_CORPO_BYTES", 100)
+
+    def _corpo_em_partes():
+        for _ in range(1000):
+            yield b"x" * 50
+
+    response_importacao = test_client.post(
+        "/clientes/pessoas-fisicas/importar",
+        content=_corpo_em_partes(),
+        headers={**admin_auth_headers, "Content-Type": "text/csv"},
+    )
+    response_cadastro = test_client.post(
+        "/clientes/pessoas-fisicas/",
+        content=(parte for parte in [b"{" + b" " * 80, b" " * 80 + b"}"]),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response_importacao.status_code == 413
+    assert response_cadastro.status_code == 413
+    print(
+        "\n[SUCESSO] Teste 'test_corpo_sem_content_length_e_recusado_ao_passar_do_limite' passou!"
+    )
+
+
+def _cadastrar_motoristas_livres(db_session, quantidade: int) -> list:
+    inicio = db_session.query(models.Pessoa).count()
+    motoristas = [
+        models.PessoaFisica(
+            email=f"livre{i}@email.com",
+            telefone="1100000000",
+            senha="hash",
+            nome_completo=f"Motorista Livre {i}",
+            cpf=f"livre{i:06d}",
+            cnh=f"livre{i:06d}",
+            endereco=_endereco_modelo(i),
+        )
+        for i in range(inicio, inicio + quantidade)
+    ]
+    db_session.add_all(motoristas)
+    db_session.commit()
+    return [motorista.id_pessoa for motorista in motoristas]
+
+
+@pytest.mark.integration
+def test_pj_atualiza_motoristas_em_lote_sem_carregar_a_frota(
+    test_client: TestClient, pj_auth_data: dict, db_session
+):
+    headers_pj = pj_auth_data["headers"]
+    _cadastrar_empresas(db_session, quantidade=1, motoristas_por_empresa=1)
+    id_de_outra_empresa = (
+        db_session.query(models.PessoaFisica.id_pessoa)
+        .filter(models.PessoaFisica.empresa_id.isnot(None))
+        .scalar()
+    )
+    livres = _cadastrar_motoristas_livres(db_session, quantidade=33)
+
+    consultas = []
+
+    def _contar(*_args):
+        consultas.append(1)
+
+    def _patch(corpo: dict) -> Response:
+        consultas.clear()
+        event.listen(engine_async.sync_engine, "before_cursor_execute", _contar)
+        try:
+            return test_client.patch(
+                "/minha-empresa/motoristas", json=corpo, headers=headers_pj
+            )
+        finally:
+            event.remove(engine_async.sync_engine, "before_cursor_execute", _contar)
+
+    response = _patch(
+        {
+            "adicionar": [livres[0], livres[1], id_de_outra_empresa, 999999],
+            "remover": [livres[4]],
+        }
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "adicionados": 2,
+        "removidos": 0,
+        "recusados": sorted([id_de_outra_empresa, 999999, livres[4]]),
+    }
+    consultas_frota_pequena = len(consultas)
+
+    response = _patch({"adicionar": livres[2:], "remover": [livres[0]]})
+    assert response.json() == {"adicionados": 31, "removidos": 1, "recusados": []}
+
+    response = _patch({"adicionar": [livres[3]], "remover": [livres[4]]})
+    assert response.json() == {"adicionados": 1, "removidos": 1, "recusados": []}
+    assert len(consultas) == consultas_frota_pequena
+
+    db_session.expire_all()
+    frota = {
+        id_pessoa
+        for (id_pessoa,) in db_session.query(models.PessoaFisica.id_pessoa).filter_by(
+            empresa_id=pj_auth_data["cliente_id"]
+        )
+    }
+    assert frota == set(livres[1:4] + livres[5:])
+
+    response = test_client.delete(
+        f"/minha-empresa/motoristas/{livres[1]}", headers=headers_pj
+    )
+    assert response.status_code == 200
+    assert len(response.json()["motoristas"]) == len(frota) - 1
+
+    response = test_client.delete(
+        f"/minha-empresa/motoristas/{livres[0]}", headers=headers_pj
+    )
+    assert response.status_code == 400
+
+    response = _patch({"adicionar": [livres[0]], "remover": [livres[0]]})
+    assert response.status_code == 422
+    print(
+        "\n[SUCESSO] Teste 'test_pj_atualiza_motoristas_em_lote_sem_carregar_a_frota' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_pj_altera_frota_com_resposta_minima_e_lista_motoristas_paginados(
+    test_client: TestClient, pj_auth_data: dict, db_session
+):
+    headers_pj = pj_auth_data["headers"]
+    headers_minimo = {**headers_pj, "Prefer": "return=minimal"}
+    livres = _cadastrar_motoristas_livres(db_session, quantidade=25)
+
+    consultas = []
+
+    def _contar(*_args):
+        consultas.append(1)
+
+    def _adicionar(id_motorista: int) -> Response:
+        consultas.clear()
+        event.listen(engine_async.sync_engine, "before_cursor_execute", _contar)
+        try:
+            return test_client.post(
+                "/minha-empresa/motoristas",
+                json={"id_pessoa_fisica": id_motorista},
+                headers=headers_minimo,
+            )
+        finally:
+            event.remove(engine_async.sync_engine, "before_cursor_execute", _contar)
+
+    response = _adicionar(livres[0])
+    assert response.status_code == 204
+    assert response.headers["preference-applied"] == "return=minimal"
+    assert response.content == b""
+    consultas_frota_pequena = len(consultas)
+
+    test_client.patch(
+        "/minha-empresa/motoristas", json={"adicionar": livres[1:-1]}, headers=headers_pj
+    )
+    assert _adicionar(livres[-1]).status_code == 204
+    assert len(consultas) == consultas_frota_pequena
+
+    response = test_client.delete(
+        f"/minha-empresa/motoristas/{livres[0]}", headers=headers_minimo
+    )
+    assert response.status_code == 204
+
+    response = test_client.delete(
+        f"/minha-empresa/motoristas/{livres[1]}", headers=headers_pj
+    )
+    assert response.status_code == 200
+    assert len(response.json()["motoristas"]) == 23
+
+    vistos = []
+    cursor = None
+    while True:
+        params = {"limit": 10}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = test_client.get(
+            "/minha-empresa/motoristas", params=params, headers=headers_pj
+        )
+        assert response.status_code == 200
+        pagina = response.json()
+        vistos.extend(item["id_pessoa"] for item in pagina["itens"])
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+    assert vistos == livres[2:]
+    print(
+        "\n[SUCESSO] Teste 'test_pj_altera_frota_com_resposta_minima_e_lista_motoristas_paginados' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_admin_atualiza_motoristas_da_pj_alterando_so_a_diferenca(
+    test_client: TestClient, admin_auth_headers: dict, pj_auth_data: dict, db_session
+):
+    _cadastrar_empresas(db_session, quantidade=1, motoristas_por_empresa=1)
+    id_de_outra_empresa = (
+        db_session.query(models.PessoaFisica.id_pessoa)
+        .filter(models.PessoaFisica.empresa_id.isnot(None))
+        .scalar()
+    )
+    id_empresa = pj_auth_data["cliente_id"]
+    frota = _cadastrar_motoristas_livres(db_session, quantidade=7)
+    db_session.query(models.PessoaFisica).filter(
+        models.PessoaFisica.id_pessoa.in_(frota[:6])
+    ).update({models.PessoaFisica.empresa_id: id_empresa}, synchronize_session=False)
+    db_session.commit()
+
+    dados = {**dados_validos_pessoa_juridica, "email": pj_auth_data["cliente_email"]}
+    dados["cnpj"] = "12345678000199"
+
+    linhas_alteradas = []
+
+    def _contar_linhas(_conexao, cursor, sql, *_args):
+        if sql.startswith("UPDATE pessoas_fisicas"):
+            linhas_alteradas.append(cursor.rowcount)
+
+    def _put(motoristas_ids: list) -> Response:
+        linhas_alteradas.clear()
+        event.listen(engine_async.sync_engine, "after_cursor_execute", _contar_linhas)
+        try:
+            return test_client.put(
+                f"/clientes/pessoas-juridicas/{id_empresa}",
+                json={**dados, "motoristas_ids": motoristas_ids},
+                headers=admin_auth_headers,
+            )
+        finally:
+            event.remove(engine_async.sync_engine, "after_cursor_execute", _contar_linhas)
+
+    nova_frota = frota[1:]
+    response = _put(nova_frota)
+    assert response.status_code == 200
+    assert sorted(m["id_pessoa"] for m in response.json()["motoristas"]) == nova_frota
+    assert sum(linhas_alteradas) == 2
+
+    response = _put(nova_frota + [id_de_outra_empresa])
+    assert response.status_code == 400
+    assert str(id_de_outra_empresa) in response.json()["detail"]
+
+    response = _put(nova_frota + [999999])
+    assert response.status_code == 404
+
+    response = _put([])
+    assert response.status_code == 200
+    assert response.json()["motoristas"] == []
+    assert sum(linhas_alteradas) == len(nova_frota)
+    print(
+        "\n[SUCESSO] Teste 'test_admin_atualiza_motoristas_da_pj_alterando_so_a_diferenca' passou!"
+    )
+
+
+@pytest.mark.integration
+def test_listas_grandes_de_ids_usam_any_e_pedidos_absurdos_sao_recusados(
+    test_client: TestClient, admin_auth_headers: dict, db_session, monkeypatch
+):
+    monkeypatch.setattr(filtro_ids, "FILTRO_IDS_LIMITE_IN", 2)
+    livres = _cadastrar_motoristas_livres(db_session, quantidade=5)
+
+    response = test_client.post(
+        "/clientes/pessoas-juridicas/",
+        json={**dados_validos_pessoa_juridica, "motoristas_ids": livres[:4]},
+    )
+    assert response.status_code == 201
+    empresa = response.json()
+    assert sorted(m["id_pessoa"] for m in empresa["motoristas"]) == livres[:4]
+
+    response = test_client.put(
+        f"/clientes/pessoas-juridicas/{empresa['id_pessoa']}",
+        json={**dados_validos_pessoa_juridica, "motoristas_ids": livres[1:]},
+        headers=admin_auth_headers,
+    )
+    assert response.status_code == 200
+    assert sorted(m["id_pessoa"] for m in response.json()["motoristas"]) == livres[1:]
+
+    response = test_client.post(
+        "/clientes/pessoas-juridicas/",
+        json={
+            **dados_validos_pessoa_juridica,
+            "motoristas_ids": list(range(filtro_ids.MAX_IDS_POR_LISTA + 1)),
+        },
+    )
+    assert response.status_code == 422
+
+    monkeypatch.setattr(main, "MAX_CORPO_BYTES", 100)
+    response = test_client.post(
+        "/clientes/pessoas-juridicas/", json=dados_validos_pessoa_juridica
+    )
+    assert response.status_code == 413
+    print(
+        "\n[SUCESSO] Teste 'test_listas_grandes_de_ids_usam_any_e_pedidos_absurdos_sao_recusados' passou!"
+    )
@@ -0,0 +1,153 @@
+import os
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src.database import engine as engine_real
+from src import models
+from src.schemas import cliente_schema
+from src.services import auth_service, cliente_auth_service, cliente_service
+
+# Testes de Desempenho (EXPLAIN) para os índices das consultas quentes.
+# Cobre: login (cliente e funcionário), busca por ID e listagens paginadas,
+# executando as funções de serviço reais sobre uma base de 1M de pessoas e
+# conferindo o plano de cada SELECT que elas emitem.
+# Rodar com: pytest -m performance
+
+LINHAS = int(os.getenv("EXPLAIN_LINHAS", "1000000"))
+EMPRESAS = LINHAS // 10
+FUNCIONARIOS = LINHAS // 10
+
+CARGA_SQL = [
+    """
+    INSERT INTO pessoas (id_pessoa, email, telefone, senha, e_ativo,
+                         token_version, data_criacao, tipo_pessoa)
+    SELECT g, 'Carga' || g || '@Email.com', '1100000000', 'hash', g % 50 <> 0, 0,
+           now() - g * interval '1 second',
+           CASE WHEN g <= :empresas THEN 'pessoa_juridica' ELSE 'pessoa_fisica' END
+    FROM generate_series(1, :linhas) AS g
+    """,
+    """
+    INSERT INTO pessoas_juridicas (id_pessoa, razao_social, cnpj)
+    SELECT g, 'Empresa ' || g, lpad(g::text, 14, '0')
+    FROM generate_series(1, :empresas) AS g
+    """,
+    """
+    INSERT INTO pessoas_fisicas (id_pessoa, nome_completo, cpf, cnh, empresa_id)
+    SELECT g, 'Motorista ' || g, lpad(g::text, 11, '0'), lpad(g::text, 11, '0'),
+           CASE WHEN g % 10 = 0 THEN g % :empresas + 1 END
+    FROM generate_series(:empresas + 1, :linhas) AS g
+    """,
+    """
+    INSERT INTO enderecos (rua, numero, bairro, cidade, estado, cep, pessoa_id)
+    SELECT 'Rua Carga', g::text, 'Centro', 'Cidade ' || g % 1000, 'SP', '01000000', g
+    FROM generate_series(1, :linhas) AS g
+    """,
+    """
+    INSERT INTO funcionarios (nome_completo, email, senha, e_admin, e_ativado)
+    SELECT 'Funcionario ' || g, 'func' || g || '@frotanext.com', 'hash', false, true
+    FROM generate_series(1, :funcionarios) AS g
+    """,
+    "SELECT setval('pessoas_id_pessoa_seq', :linhas)",
+]
+
+
+def _carregar_base(db_session: Session) -> None:
+    parametros = {
+        "linhas": LINHAS,
+        "empresas": EMPRESAS,
+        "funcionarios": FUNCIONARIOS,
+    }
+    for comando in CARGA_SQL:
+        db_session.execute(text(comando), parametros)
+    db_session.commit()
+    with engine_real.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conexao:
+        conexao.execute(text("VACUUM ANALYZE"))
+
+
+def _planos_das_consultas(funcao) -> list:
+    """
+    Executa 'funcao' guardando os SELECTs emitidos e devolve o EXPLAIN de
+    cada um, com os mesmos parâmetros.
+    """
+    consultas = []
+
+    def _guardar(_conexao, _cursor, sql, parametros, _contexto, _executemany):
+        if sql.lstrip().upper().startswith("SELECT"):
+            consultas.append((sql, parametros))
+
+    event.listen(engine_real, "before_cursor_execute", _guardar)
+    try:
+        funcao()
+    finally:
+        event.remove(engine_real, "before_cursor_execute", _guardar)
+
+    planos = []
+    conexao = engine_real.raw_connection()
+    try:
+        cursor = conexao.cursor()
+        for sql, parametros in consultas:
+            cursor.execute("EXPLAIN " + sql, parametros)
+            planos.append("\n".join(linha[0] for linha in cursor.fetchall()))
+        cursor.close()
+    finally:
+        conexao.close()
+    return planos
+
+
+@pytest.mark.performance
+def test_consultas_quentes_usam_indices(db_session: Session):
+    _carregar_base(db_session)
+    id_empresa = EMPRESAS // 2
+    id_motorista = LINHAS // 2
+
+    casos = {
+        "login cliente": lambda: cliente_auth_service.buscar_credenciais_cliente(
+            db_session, email=f"carga{id_motorista}@email.COM"
+        ),
+        "login funcionário": lambda: auth_service.buscar_credenciais_funcionario(
+            db_session, email="FUNC7@frotanext.com"
+        ),
+        "funcionário por email": lambda: auth_service.buscar_funcionario_por_email(
+            db_session, email="func7@frotanext.com"
+        ),
+        "PF por id": lambda: cliente_service.buscar_pessoa_fisica_por_id(
+            id_motorista, db_session
+        ),
+        "PJ por id (com motoristas)": lambda: cliente_service.buscar_pessoa_juridica_por_id(
+            id_empresa, db_session
+        ),
+        "frota da empresa (paginada)": lambda: cliente_service.listar_motoristas_empresa(
+            db_session.get(models.PessoaJuridica, id_empresa),
+            db_session,
+            cliente_schema.SchemaFiltroClientes(limit=50),
+        ),
+        "listagem PF ativas": lambda: cliente_service.listar_pessoas_fisicas(
+            db_session,
+            cliente_schema.SchemaFiltroClientes(limit=50, e_ativo=True),
+        ),
+        "listagem PJ bloqueadas": lambda: cliente_service.listar_pessoas_juridicas(
+            db_session,
+            cliente_schema.SchemaFiltroClientes(limit=50, e_ativo=False),
+        ),
+    }
+
+    assert cliente_auth_service.buscar_credenciais_cliente(
+        db_session, email=f"CARGA{id_motorista}@email.com"
+    ).id_pessoa == id_motorista
+
+    for nome, funcao in casos.items():
+        db_session.expunge_all()
+        planos = _planos_das_consultas(funcao)
+        assert planos, nome
+        for plano in planos:
+            print(f"\n--- {nome}\n{plano}")
+            assert "Seq Scan" not in plano, f"{nome}:\n{plano}"
+
+    (plano_login,) = _planos_das_consultas(casos["login cliente"])
+    assert "Index Only Scan using ix_pessoas_email" in plano_login
+
+    print("\n[SUCESSO] Teste 'test_consultas_quentes_usam_indices' passou!")
@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
@@ -7,16 +8,31 @@ from src.services import auth_service, cliente_auth_service
 
 # Testes Unitários para a lógica de negócio dos Serviços de Autenticação.
 # Cobre: Todos os caminhos lógicos (sucesso, usuário não encontrado,
-# senha errada, usuário inativo) das funções 'autenticar_...'.
+# senha errada, usuário inativo) das funções 'autenticar_..._async'.
+
+
+async def _executar_direto(sessao_banco, funcao, /, *args, esquema=None, **kwargs):
+    # Substitui 'executar_servico': chama o serviço síncrono com a sessão mockada.
+    return funcao(sessao_banco, *args, **kwargs)
+
+
+def _sessao_mock() -> MagicMock:
+    sessao_banco = MagicMock()
+    sessao_banco.commit = AsyncMock()
+    return sessao_banco
 
 
 @pytest.mark.unit
-@patch("src.services.auth_service.buscar_funcionario_por_email")
-@patch("src.services.auth_service.seguranca_service.verificar_senha")
+@patch("src.services.auth_service.executar_servico", _executar_direto)
+@patch("src.services.auth_service.buscar_credenciais_funcionario")
+@patch(
+    "src.services.auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_funcionario_sucesso(
     mock_verificar_senha, mock_buscar_por_email, mocker
 ):
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_mock()
 
     mock_funcionario = MagicMock()
     mock_funcionario.e_ativado = True
@@ -25,66 +41,85 @@ def test_autenticar_funcionario_sucesso(
     mock_buscar_por_email.return_value = mock_funcionario
     mock_verificar_senha.return_value = True
 
-    resultado = auth_service.autenticar_funcionario(
-        sessao_banco=mock_sessao,
-        email_formulario="admin@frotanext.com",
-        senha_formulario="senha123",
+    resultado = asyncio.run(
+        auth_service.autenticar_funcionario_async(
+            sessao_banco=mock_sessao,
+            email_formulario="admin@frotanext.com",
+            senha_formulario="senha123",
+        )
     )
 
     assert resultado == mock_funcionario
     mock_buscar_por_email.assert_called_with(mock_sessao, email="admin@frotanext.com")
-    mock_verificar_senha.assert_called_with(
+    mock_sessao.commit.assert_awaited_once()
+    mock_verificar_senha.assert_awaited_with(
         senha_texto_puro="senha123", senha_hashada="hash_secreto_do_banco"
     )
 
 
 @pytest.mark.unit
-@patch("src.services.auth_service.buscar_funcionario_por_email")
-@patch("src.services.auth_service.seguranca_service.verificar_senha")
+@patch("src.services.auth_service.executar_servico", _executar_direto)
+@patch("src.services.auth_service.buscar_credenciais_funcionario")
+@patch(
+    "src.services.auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_funcionario_nao_encontrado(
     mock_verificar_senha, mock_buscar_por_email
 ):
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_mock()
     mock_buscar_por_email.return_value = None
 
-    resultado = auth_service.autenticar_funcionario(
-        sessao_banco=mock_sessao,
-        email_formulario="falso@frotanext.com",
-        senha_formulario="senha123",
+    resultado = asyncio.run(
+        auth_service.autenticar_funcionario_async(
+            sessao_banco=mock_sessao,
+            email_formulario="falso@frotanext.com",
+            senha_formulario="senha123",
+        )
     )
 
     assert resultado is None
-    mock_verificar_senha.assert_not_called()
+    mock_verificar_senha.assert_not_awaited()
 
 
 @pytest.mark.unit
-@patch("src.services.auth_service.buscar_funcionario_por_email")
-@patch("src.services.auth_service.seguranca_service.verificar_senha")
+@patch("src.services.auth_service.executar_servico", _executar_direto)
+@patch("src.services.auth_service.buscar_credenciais_funcionario")
+@patch(
+    "src.services.auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_funcionario_inativo(mock_verificar_senha, mock_buscar_por_email):
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_mock()
     mock_funcionario_inativo = MagicMock()
     mock_funcionario_inativo.e_ativado = False
     mock_buscar_por_email.return_value = mock_funcionario_inativo
     with pytest.raises(HTTPException) as exc_info:
-        auth_service.autenticar_funcionario(
-            sessao_banco=mock_sessao,
-            email_formulario="inativo@frotanext.com",
-            senha_formulario="senha123",
+        asyncio.run(
+            auth_service.autenticar_funcionario_async(
+                sessao_banco=mock_sessao,
+                email_formulario="inativo@frotanext.com",
+                senha_formulario="senha123",
+            )
         )
 
     assert exc_info.value.status_code == 403
     assert "Acesso administrativo bloqueado" in exc_info.value.detail
 
-    mock_verificar_senha.assert_not_called()
+    mock_verificar_senha.assert_not_awaited()
 
 
 @pytest.mark.unit
-@patch("src.services.auth_service.buscar_funcionario_por_email")
-@patch("src.services.auth_service.seguranca_service.verificar_senha")
+@patch("src.services.auth_service.executar_servico", _executar_direto)
+@patch("src.services.auth_service.buscar_credenciais_funcionario")
+@patch(
+    "src.services.auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_funcionario_senha_incorreta(
     mock_verificar_senha, mock_buscar_por_email
 ):
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_mock()
 
     mock_funcionario = MagicMock()
     mock_funcionario.e_ativado = True
@@ -93,54 +128,133 @@ def test_autenticar_funcionario_senha_incorreta(
     mock_buscar_por_email.return_value = mock_funcionario
     mock_verificar_senha.return_value = False
 
-    resultado = auth_service.autenticar_funcionario(
-        sessao_banco=mock_sessao,
-        email_formulario="admin@frotanext.com",
-        senha_formulario="senhaErrada",
+    resultado = asyncio.run(
+        auth_service.autenticar_funcionario_async(
+            sessao_banco=mock_sessao,
+            email_formulario="admin@frotanext.com",
+            senha_formulario="senhaErrada",
+        )
     )
 
     assert resultado is None
-    mock_verificar_senha.assert_called_with(
+    mock_verificar_senha.assert_awaited_with(
         senha_texto_puro="senhaErrada", senha_hashada="hash_secreto_do_banco"
     )
 
 
 @pytest.mark.unit
-@patch("src.services.cliente_auth_service.seguranca_service.verificar_senha")
+@patch("src.services.cliente_auth_service.executar_servico", _executar_direto)
+@patch(
+    "src.services.cliente_auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_cliente_sucesso(mock_verificar_senha, mocker):
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_mock()
 
     mock_cliente = MagicMock()
     mock_cliente.senha = "hash_cliente_secreto"
 
-    mock_query = mocker.patch("src.services.cliente_auth_service.Session.query")
-    mock_sessao.query.return_value.filter.return_value.first.return_value = mock_cliente
+    mock_sessao.execute.return_value.first.return_value = mock_cliente
 
     mock_verificar_senha.return_value = True
 
-    resultado = cliente_auth_service.autenticar_cliente(
-        sessao_banco=mock_sessao,
-        email_formulario="cliente@email.com",
-        senha_formulario="senhaCliente",
+    resultado = asyncio.run(
+        cliente_auth_service.autenticar_cliente_async(
+            sessao_banco=mock_sessao,
+            email_formulario="cliente@email.com",
+            senha_formulario="senhaCliente",
+        )
     )
 
     assert resultado == mock_cliente
-    mock_verificar_senha.assert_called_with(
+    mock_verificar_senha.assert_awaited_with(
         senha_texto_puro="senhaCliente", senha_hashada="hash_cliente_secreto"
     )
 
 
 @pytest.mark.unit
-@patch("src.services.cliente_auth_service.seguranca_service.verificar_senha")
+@patch("src.services.cliente_auth_service.executar_servico", _executar_direto)
+@patch(
+    "src.services.cliente_auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
 def test_autenticar_cliente_nao_encontrado(mock_verificar_senha, mocker):
-    mock_sessao = MagicMock()
-    mock_sessao.query.return_value.filter.return_value.first.return_value = None
+    mock_sessao = _sessao_mock()
+    mock_sessao.execute.return_value.first.return_value = None
 
-    resultado = cliente_auth_service.autenticar_cliente(
-        sessao_banco=mock_sessao,
-        email_formulario="falso@cliente.com",
-        senha_formulario="senhaCliente",
+    resultado = asyncio.run(
+        cliente_auth_service.autenticar_cliente_async(
+            sessao_banco=mock_sessao,
+            email_formulario="falso@cliente.com",
+            senha_formulario="senhaCliente",
+        )
     )
 
     assert resultado is None
-    mock_verificar_senha.assert_not_called()
+    mock_verificar_senha.assert_not_awaited()
+
+
+@pytest.mark.unit
+@patch("src.services.auth_service.executar_servico", _executar_direto)
+@patch("src.services.auth_service.seguranca_service.senha_precisa_rehash")
+@patch("src.services.auth_service.buscar_credenciais_funcionario")
+@patch(
+    "src.services.auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
+def test_autenticar_funcionario_agenda_rehash_quando_parametros_mudaram(
+    mock_verificar_senha, mock_buscar_por_email, mock_precisa_rehash
+):
+    mock_funcionario = MagicMock()
+    mock_funcionario.e_ativado = True
+    mock_funcionario.id_funcionario = 7
+    mock_funcionario.senha = "hash_antigo"
+    mock_buscar_por_email.return_value = mock_funcionario
+    mock_verificar_senha.return_value = True
+    mock_precisa_rehash.return_value = True
+    mock_tarefas = MagicMock()
+
+    resultado = asyncio.run(
+        auth_service.autenticar_funcionario_async(
+            sessao_banco=_sessao_mock(),
+            email_formulario="admin@frotanext.com",
+            senha_formulario="senha123",
+            tarefas_segundo_plano=mock_tarefas,
+        )
+    )
+
+    assert resultado == mock_funcionario
+    mock_tarefas.add_task.assert_called_once_with(
+        auth_service.rehash_senha_funcionario, 7, "senha123", "hash_antigo"
+    )
+
+
+@pytest.mark.unit
+@patch("src.services.cliente_auth_service.executar_servico", _executar_direto)
+@patch("src.services.cliente_auth_service.seguranca_service.senha_precisa_rehash")
+@patch(
+    "src.services.cliente_auth_service.seguranca_service.verificar_senha_async",
+    new_callable=AsyncMock,
+)
+def test_autenticar_cliente_nao_agenda_rehash_com_parametros_atuais(
+    mock_verificar_senha, mock_precisa_rehash
+):
+    mock_sessao = _sessao_mock()
+    mock_cliente = MagicMock()
+    mock_cliente.senha = "hash_atual"
+    mock_sessao.execute.return_value.first.return_value = mock_cliente
+    mock_verificar_senha.return_value = True
+    mock_precisa_rehash.return_value = False
+    mock_tarefas = MagicMock()
+
+    resultado = asyncio.run(
+        cliente_auth_service.autenticar_cliente_async(
+            sessao_banco=mock_sessao,
+            email_formulario="cliente@email.com",
+            senha_formulario="senhaCliente",
+            tarefas_segundo_plano=mock_tarefas,
+        )
+    )
+
+    assert resultado == mock_cliente
+    mock_tarefas.add_task.assert_not_called()
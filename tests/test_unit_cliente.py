@@ -1,8 +1,10 @@
 import pytest
 from unittest.mock import MagicMock
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from src.services.cliente_service import criar_pessoa_fisica, criar_pessoa_juridica
 from src.schemas import cliente_schema
+from src.services import importacao_service
 
 # Testes Unitários para a lógica de negócio dos Serviços de Cliente.
 # Cobre: Lógica de associação/remoção de motoristas em Pessoas Jurídicas.
@@ -11,21 +13,26 @@ from src.services.cliente_service import (
     adicionar_motorista_empresa,
     remover_motorista_empresa,
 )
-from src.models.pessoa import PessoaFisica, PessoaJuridica
+from src.models.pessoa import PessoaJuridica
+
+
+def _sessao_sem_motoristas_afetados(empresa_id_atual):
+    # O UPDATE condicional não afeta nenhuma linha; a consulta do caminho de
+    # erro devolve a empresa atual do motorista (ou nenhuma linha).
+    mock_sessao = MagicMock()
+    mock_sessao.scalars.return_value.all.return_value = []
+    mock_sessao.execute.return_value.first.return_value = (
+        None if empresa_id_atual is False else MagicMock(empresa_id=empresa_id_atual)
+    )
+    return mock_sessao
 
 
 @pytest.mark.unit
 def test_adicionar_motorista_associado_outra_empresa_falha():
-    mock_sessao = MagicMock()
+    mock_sessao = _sessao_sem_motoristas_afetados(empresa_id_atual=2)
 
     mock_empresa_logada = MagicMock(spec=PessoaJuridica)
     mock_empresa_logada.id_pessoa = 1
-    mock_empresa_logada.motoristas = []
-
-    mock_motorista = MagicMock(spec=PessoaFisica)
-    mock_motorista.empresa_id = 2
-
-    mock_sessao.get.return_value = mock_motorista
 
     with pytest.raises(HTTPException) as exc_info:
         adicionar_motorista_empresa(
@@ -36,20 +43,33 @@ def test_adicionar_motorista_associado_outra_empresa_falha():
 
     assert exc_info.value.status_code == 400
     assert "associado a outra empresa" in exc_info.value.detail
+    mock_sessao.commit.assert_not_called()
 
 
 @pytest.mark.unit
-def test_adicionar_motorista_ja_associado_retorna_empresa(mocker):
-    mock_sessao = MagicMock()
-
-    mock_motorista = MagicMock(spec=PessoaFisica)
-    mock_motorista.empresa_id = 1
+def test_adicionar_motorista_inexistente_falha_404():
+    mock_sessao = _sessao_sem_motoristas_afetados(empresa_id_atual=False)
 
     mock_empresa_logada = MagicMock(spec=PessoaJuridica)
     mock_empresa_logada.id_pessoa = 1
-    mock_empresa_logada.motoristas = [mock_motorista]
 
-    mock_sessao.get.return_value = mock_motorista
+    with pytest.raises(HTTPException) as exc_info:
+        adicionar_motorista_empresa(
+            empresa_logada=mock_empresa_logada,
+            id_motorista_adicionar=10,
+            sessao_banco=mock_sessao,
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.unit
+def test_adicionar_motorista_ja_associado_retorna_empresa():
+    mock_sessao = MagicMock()
+    mock_sessao.scalars.return_value.all.return_value = [10]
+
+    mock_empresa_logada = MagicMock(spec=PessoaJuridica)
+    mock_empresa_logada.id_pessoa = 1
 
     resultado = adicionar_motorista_empresa(
         empresa_logada=mock_empresa_logada,
@@ -57,21 +77,18 @@ def test_adicionar_motorista_ja_associado_retorna_empresa(mocker):
         sessao_banco=mock_sessao,
     )
 
-    assert resultado == mock_empresa_logada
-    mock_sessao.add.assert_not_called()
-    mock_sessao.commit.assert_not_called()
+    assert resultado == mock_sessao.get.return_value
+    mock_sessao.scalars.assert_called_once()
+    mock_sessao.execute.assert_not_called()
+    mock_sessao.commit.assert_called_once()
 
 
 @pytest.mark.unit
 def test_remover_motorista_nao_associado_falha():
-    mock_sessao = MagicMock()
-
-    mock_motorista = MagicMock(spec=PessoaFisica)
+    mock_sessao = _sessao_sem_motoristas_afetados(empresa_id_atual=None)
 
     mock_empresa_logada = MagicMock(spec=PessoaJuridica)
-    mock_empresa_logada.motoristas = []
-
-    mock_sessao.get.return_value = mock_motorista
+    mock_empresa_logada.id_pessoa = 1
 
     with pytest.raises(HTTPException) as exc_info:
         remover_motorista_empresa(
@@ -84,6 +101,12 @@ def test_remover_motorista_nao_associado_falha():
     assert "não está associado à sua empresa" in exc_info.value.detail
 
 
+def _erro_duplicidade(nome_indice: str) -> IntegrityError:
+    erro_banco = MagicMock()
+    erro_banco.diag.constraint_name = nome_indice
+    return IntegrityError("INSERT ...", {}, erro_banco)
+
+
 @pytest.mark.unit
 def test_criar_pessoa_fisica_email_duplicado_falha():
     mock_sessao = MagicMock()
@@ -105,15 +128,18 @@ def test_criar_pessoa_fisica_email_duplicado_falha():
         },
     )
 
-    mock_sessao.query.return_value.filter.return_value.first.return_value = MagicMock()
+    mock_sessao.commit.side_effect = _erro_duplicidade("ix_pessoas_email")
 
     with pytest.raises(HTTPException) as exc_info:
         criar_pessoa_fisica(
-            dados_entrada_cliente=dados_entrada, sessao_banco=mock_sessao
+            dados_entrada_cliente=dados_entrada,
+            sessao_banco=mock_sessao,
+            hash_senha="hash",
         )
 
     assert exc_info.value.status_code == 400
     assert "email já cadastrado" in exc_info.value.detail.lower()
+    mock_sessao.rollback.assert_called_once()
 
 
 @pytest.mark.unit
@@ -136,14 +162,13 @@ def test_criar_pessoa_fisica_cpf_duplicado_falha():
         },
     )
 
-    mock_sessao.query.return_value.filter.return_value.first.side_effect = [
-        None,
-        MagicMock(),
-    ]
+    mock_sessao.commit.side_effect = _erro_duplicidade("ix_pessoas_fisicas_cpf")
 
     with pytest.raises(HTTPException) as exc_info:
         criar_pessoa_fisica(
-            dados_entrada_cliente=dados_entrada, sessao_banco=mock_sessao
+            dados_entrada_cliente=dados_entrada,
+            sessao_banco=mock_sessao,
+            hash_senha="hash",
         )
 
     assert exc_info.value.status_code == 400
@@ -169,15 +194,79 @@ def test_criar_pessoa_juridica_cnpj_duplicado_falha():
         },
     )
 
-    mock_sessao.query.return_value.filter.return_value.first.side_effect = [
-        None,
-        MagicMock(),
-    ]
+    mock_sessao.commit.side_effect = _erro_duplicidade("ix_pessoas_juridicas_cnpj")
 
     with pytest.raises(HTTPException) as exc_info:
         criar_pessoa_juridica(
-            dados_entrada_empresa=dados_entrada, sessao_banco=mock_sessao
+            dados_entrada_empresa=dados_entrada,
+            sessao_banco=mock_sessao,
+            hash_senha="hash",
         )
 
     assert exc_info.value.status_code == 400
     assert "cnpj já cadastrado" in exc_info.value.detail.lower()
+
+
+@pytest.mark.unit
+def test_importacao_le_csv_com_colunas_de_endereco():
+    corpo = (
+        "\ufeffemail,telefone,nome_completo,cpf,cnh,senha_texto_puro,"
+        "endereco_rua,endereco_numero,endereco_complemento,endereco_bairro,"
+        "endereco_cidade,endereco_estado,endereco_cep\n"
+        "a@email.com,11,Cliente A,111,222,senhaValida1,Rua,1,,Centro,SP,SP,01000000\n"
+    ).encode()
+
+    (registro,) = importacao_service.ler_registros(corpo, "text/csv; charset=utf-8")
+
+    assert registro["email"] == "a@email.com"
+    assert registro["endereco"]["cidade"] == "SP"
+    assert "complemento" not in registro["endereco"]
+    assert cliente_schema.SchemaPessoaFisicaCriar.model_validate(registro).cpf == "111"
+
+
+@pytest.mark.unit
+def test_importacao_rejeita_corpo_fora_do_formato():
+    with pytest.raises(HTTPException) as exc_info:
+        importacao_service.ler_registros(b"<clientes/>", "application/xml")
+    assert exc_info.value.status_code == 415
+
+    with pytest.raises(HTTPException) as exc_info:
+        importacao_service.ler_registros(b'{"email": "a@email.com"}', "application/json")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_importacao_aponta_erros_por_registro():
+    endereco = {
+        "rua": "Rua",
+        "numero": "1",
+        "bairro": "Centro",
+        "cidade": "SP",
+        "estado": "SP",
+        "cep": "01000000",
+    }
+    valido = {
+        "email": "a@email.com",
+        "telefone": "11",
+        "nome_completo": "Cliente A",
+        "cpf": "111",
+        "cnh": "222",
+        "senha_texto_puro": "senhaValida1",
+        "endereco": endereco,
+    }
+    registros = [
+        valido,
+        {**valido, "email": "nao-e-email", "cpf": "333", "cnh": "444"},
+        {**valido, "email": "A@Email.com", "cnh": "555"},
+        {**valido, "email": "b@email.com", "cpf": "666", "cnh": "777"},
+    ]
+
+    validos, erros = importacao_service.validar_registros(registros)
+
+    assert [linha for linha, _ in validos] == [1, 4]
+    assert [erro["linha"] for erro in erros] == [2, 3]
+    assert erros[0]["erros"][0].startswith("email:")
+    assert erros[1]["erros"] == [
+        "Email repetido no lote (registro 1).",
+        "CPF repetido no lote (registro 1).",
+    ]
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+# Testes Unitários para o filtro de listas de ids.
+# Cobre: IN com parâmetros para listas curtas e '= ANY(:lista)' para as longas.
+from src import filtro_ids
+from src.filtro_ids import coluna_em_lista
+from src.models.pessoa import Pessoa
+
+
+def _compilar(valores) -> str:
+    consulta = select(Pessoa.id_pessoa).where(coluna_em_lista(Pessoa.id_pessoa, valores))
+    return str(consulta.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.unit
+def test_lista_curta_usa_in(monkeypatch):
+    monkeypatch.setattr(filtro_ids, "FILTRO_IDS_LIMITE_IN", 3)
+
+    assert "IN (__[POSTCOMPILE_id_pessoa_1])" in _compilar([1, 2, 3])
+
+
+@pytest.mark.unit
+def test_lista_longa_usa_any_com_um_parametro(monkeypatch):
+    monkeypatch.setattr(filtro_ids, "FILTRO_IDS_LIMITE_IN", 3)
+
+    sql_quatro = _compilar(range(4))
+    sql_mil = _compilar(range(1000))
+
+    assert "= ANY (%(param_1)s::INTEGER[])" in sql_quatro
+    assert sql_mil == sql_quatro
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import HTTPException
+
+from src import limitador_login
+from src.limitador_login import LimitadorJanelaDeslizante
+
+# Testes Unitários para o limitador de tentativas de login.
+# Cobre: Janela deslizante, troca de janela, isolamento entre chaves e o 429.
+
+
+@pytest.mark.unit
+def test_limitador_bloqueia_apos_limite_na_mesma_janela():
+    limitador = LimitadorJanelaDeslizante(limite=3, janela_segundos=60, num_posicoes=1024)
+
+    resultados = [
+        limitador.registrar_tentativa("alvo@email.com", agora=1000.0 + i)
+        for i in range(4)
+    ]
+
+    assert resultados[:3] == [0, 0, 0]
+    assert resultados[3] > 0
+    assert limitador.registrar_tentativa("outro@email.com", agora=1004.0) == 0
+
+
+@pytest.mark.unit
+def test_limitador_janela_anterior_pesa_proporcionalmente():
+    limitador = LimitadorJanelaDeslizante(limite=4, janela_segundos=60, num_posicoes=1024)
+    for _ in range(4):
+        assert limitador.registrar_tentativa("alvo", agora=120.0) == 0
+
+    # 10s depois da virada, as 4 anteriores ainda pesam 4 * 50/60 = 3.33.
+    assert limitador.registrar_tentativa("alvo", agora=190.0) == 0
+    assert limitador.registrar_tentativa("alvo", agora=190.0) > 0
+    # Duas janelas depois, nada da primeira sobra.
+    assert limitador.registrar_tentativa("alvo", agora=300.0) == 0
+
+
+@pytest.mark.unit
+def test_limitador_memoria_fixa_com_muitas_chaves():
+    limitador = LimitadorJanelaDeslizante(limite=1, janela_segundos=60, num_posicoes=64)
+
+    for i in range(10_000):
+        limitador.registrar_tentativa(f"ataque{i}@email.com", agora=10.0)
+
+    assert len(limitador._tabela) == 64
+
+
+@pytest.mark.unit
+def test_verificar_tentativa_login_levanta_429_com_retry_after(mocker):
+    limitador_ip = LimitadorJanelaDeslizante(limite=1, janela_segundos=60, num_posicoes=64)
+    mocker.patch.object(limitador_login, "limitador_por_ip", limitador_ip)
+
+    limitador_login.verificar_tentativa_login(email="a@email.com", ip="10.0.0.1")
+    with pytest.raises(HTTPException) as exc_info:
+        limitador_login.verificar_tentativa_login(email="b@email.com", ip="10.0.0.1")
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.unit
+def test_limitador_posicao_depende_da_chave_secreta():
+    limitador_a = LimitadorJanelaDeslizante(limite=1, janela_segundos=60, num_posicoes=1 << 20)
+    limitador_b = LimitadorJanelaDeslizante(limite=1, janela_segundos=60, num_posicoes=1 << 20)
+
+    # Com chaves de hash diferentes, a mesma chave cai em posições diferentes.
+    assert limitador_a._localizar("alvo@email.com") != limitador_b._localizar(
+        "alvo@email.com"
+    )
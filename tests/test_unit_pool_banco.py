@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+# Testes Unitários para o pool de conexões instrumentado.
+# Cobre: leitura da configuração do ambiente e métricas de checkout/timeout.
+from src import metricas, pool_banco
+from src.pool_banco import PoolInstrumentado
+
+
+@pytest.mark.unit
+def test_parametros_pool_lidos_do_ambiente(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("DB_POOL_USE_LIFO", "1")
+
+    parametros = pool_banco.parametros_pool()
+
+    assert parametros["poolclass"] is PoolInstrumentado
+    assert parametros["pool_size"] == 20
+    assert parametros["max_overflow"] == 5
+    assert parametros["pool_timeout"] == 2.5
+    assert parametros["pool_recycle"] == -1
+    assert parametros["pool_pre_ping"] is True
+    assert parametros["pool_use_lifo"] is True
+
+
+@pytest.fixture
+def engine_instrumentado():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=PoolInstrumentado,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    metricas_pool = pool_banco.instrumentar(engine, "teste_pool")
+    yield engine, metricas_pool
+    engine.dispose()
+    metricas.remover(*metricas_pool.todas)
+
+
+@pytest.mark.unit
+def test_pool_instrumentado_mede_checkout_e_timeout(engine_instrumentado):
+    engine, metricas_pool = engine_instrumentado
+
+    conexao = engine.connect()
+    assert metricas_pool.conexoes_emprestadas.valor == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    conexao.close()
+    assert metricas_pool.conexoes_emprestadas.valor == 0
+    assert metricas_pool.espera_checkout.contagem == 2
+    assert metricas_pool.timeouts_checkout.valor == 1
+
+    # O pool novo criado por 'dispose()' continua medindo nas mesmas métricas.
+    engine.dispose()
+    engine.connect().close()
+    assert metricas_pool.espera_checkout.contagem == 3
+    assert metricas_pool.tamanho.valor == 1
+
+
+@pytest.mark.unit
+def test_metricas_do_pool_sao_separadas_por_prefixo(engine_instrumentado):
+    engine, metricas_pool = engine_instrumentado
+    outro_engine = create_engine("sqlite://", poolclass=PoolInstrumentado)
+    metricas_outro = pool_banco.instrumentar(outro_engine, "teste_pool_outro")
+
+    engine.connect().close()
+
+    assert metricas_pool.espera_checkout.contagem == 1
+    assert metricas_outro.espera_checkout.contagem == 0
+
+    outro_engine.dispose()
+    metricas.remover(*metricas_outro.todas)
+    texto = metricas.renderizar_prometheus()
+    assert "teste_pool_espera_checkout_segundos_count 1" in texto
+    assert "teste_pool_outro_" not in texto
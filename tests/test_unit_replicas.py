@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Testes Unitários para o roteamento entre primário e réplicas.
+# Cobre: leituras na réplica, escrita recente no primário e o fallback sem réplicas.
+# Dois arquivos SQLite fazem o papel do primário e da réplica.
+from src import replicas
+from src.replicas import RoteadorSessoes
+
+
+def _fabrica_sqlite(caminho, origem: str):
+    engine = create_engine(f"sqlite:///{caminho}")
+    with engine.begin() as conexao:
+        conexao.execute(text("CREATE TABLE origem (nome TEXT)"))
+        conexao.execute(text("INSERT INTO origem VALUES (:nome)"), {"nome": origem})
+    return sessionmaker(bind=engine)
+
+
+def _ler_origem(fabrica) -> str:
+    with fabrica() as sessao:
+        return sessao.execute(text("SELECT nome FROM origem")).scalar_one()
+
+
+@pytest.mark.unit
+def test_leitura_vai_para_replica_e_escrita_para_primario(tmp_path):
+    primario = _fabrica_sqlite(tmp_path / "primario.db", "primario")
+    replica = _fabrica_sqlite(tmp_path / "replica.db", "replica")
+    roteador = RoteadorSessoes(primario, [replica], janela_escrita_segundos=5)
+
+    assert _ler_origem(roteador.fabrica_para("GET", None)) == "replica"
+    assert _ler_origem(roteador.fabrica_para("POST", None)) == "primario"
+    assert _ler_origem(roteador.fabrica_para("PUT", None)) == "primario"
+
+
+@pytest.mark.unit
+def test_leitura_apos_escrita_recente_fica_no_primario(tmp_path):
+    primario = _fabrica_sqlite(tmp_path / "primario.db", "primario")
+    replica = _fabrica_sqlite(tmp_path / "replica.db", "replica")
+    roteador = RoteadorSessoes(primario, [replica], janela_escrita_segundos=5)
+
+    assert _ler_origem(roteador.fabrica_leitura(100.0, agora=103.0)) == "primario"
+    assert _ler_origem(roteador.fabrica_leitura(100.0, agora=105.0)) == "replica"
+
+    sem_replicas = RoteadorSessoes(primario)
+    assert _ler_origem(sem_replicas.fabrica_leitura(None)) == "primario"
+
+    assert replicas.ler_ultima_escrita("100.5") == 100.5
+    assert replicas.ler_ultima_escrita("invalido") is None
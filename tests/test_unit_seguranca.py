@@ -1,10 +1,22 @@
+import asyncio
 from datetime import timedelta
 
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
 
 # Testes Unitários para as funções de Segurança.
 # Cobre: Hashing de senhas e criação/validação de tokens JWT.
+from src import seguranca
+from src.admissao import ControleAdmissao, HashSobrecarregado
+from src.cache import CacheTTL
+from src.chaves_jwt import ConjuntoChaves
+from src.metricas import Histograma, renderizar_prometheus
+from src.revogacao import RegistroRevogacao, registro_revogacao
 from src.seguranca import (
+    ExecutorHash,
+    cache_tokens,
     criar_token_acesso,
     obter_hash_senha,
     verificar_senha,
@@ -49,3 +61,285 @@ def test_verificar_token_invalido_retorna_none():
 
     assert verificar_token(token_falso) is None
     assert verificar_token(token_malformado) is None
+
+
+@pytest.mark.unit
+def test_hash_e_verificacao_async_no_pool_de_processos():
+    executor = ExecutorHash()
+    executor.iniciar(num_workers=1)
+
+    async def _roundtrip():
+        hash_da_senha = await executor.executar(obter_hash_senha, "SenhaPool@123")
+        valida = await executor.executar(verificar_senha, "SenhaPool@123", hash_da_senha)
+        invalida = await executor.executar(verificar_senha, "Errada", hash_da_senha)
+        return valida, invalida
+
+    try:
+        assert asyncio.run(_roundtrip()) == (True, False)
+    finally:
+        executor.encerrar()
+
+    assert executor.ativo is False
+
+
+@pytest.mark.unit
+def test_executor_hash_sem_workers_usa_threadpool():
+    executor = ExecutorHash()
+    executor.iniciar(num_workers=0)
+
+    hash_da_senha = asyncio.run(executor.executar(obter_hash_senha, "SenhaThread@1"))
+
+    assert executor.ativo is False
+    assert verificar_senha("SenhaThread@1", hash_da_senha) is True
+
+
+@pytest.mark.unit
+def test_hashes_em_lote_voltam_na_ordem_das_senhas(monkeypatch):
+    executor = ExecutorHash()
+    executor.iniciar(num_workers=2)
+    monkeypatch.setattr(seguranca, "executor_hash", executor)
+    monkeypatch.setattr(seguranca, "HASH_LOTE_IMPORTACAO", 2)
+    senhas = [f"SenhaLote@{indice}" for indice in range(5)]
+
+    try:
+        hashes = asyncio.run(seguranca.obter_hashes_senhas_async(senhas))
+    finally:
+        executor.encerrar()
+
+    assert len(hashes) == len(senhas)
+    for senha, hash_da_senha in zip(senhas, hashes):
+        assert verificar_senha(senha, hash_da_senha) is True
+
+
+class _ExecutorQueFalhaNoUltimoLote:
+    def __init__(self) -> None:
+        self.cancelados = 0
+
+    async def executar(self, _funcao, lote):
+        if "falha" in lote:
+            raise HashSobrecarregado(retry_after_segundos=1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelados += 1
+            raise
+        return lote
+
+
+@pytest.mark.unit
+def test_hashes_em_lote_cancelam_os_demais_lotes_no_primeiro_erro(monkeypatch):
+    executor = _ExecutorQueFalhaNoUltimoLote()
+    monkeypatch.setattr(seguranca, "executor_hash", executor)
+    monkeypatch.setattr(
+        seguranca, "controle_admissao_hash", _novo_controle(max_concorrentes=3)
+    )
+    monkeypatch.setattr(seguranca, "HASH_LOTE_IMPORTACAO", 1)
+
+    async def _cenario():
+        with pytest.raises(HashSobrecarregado):
+            await seguranca.obter_hashes_senhas_async(["a", "b", "falha"])
+        return executor.cancelados
+
+    assert asyncio.run(_cenario()) == 2
+
+
+def _novo_controle(**kwargs) -> ControleAdmissao:
+    parametros = {
+        "max_concorrentes": 1,
+        "max_fila": 1,
+        "timeout_fila_segundos": 0.05,
+        "retry_after_segundos": 3,
+        "prefixo_metricas": "teste_admissao",
+    }
+    parametros.update(kwargs)
+    return ControleAdmissao(**parametros)
+
+
+@pytest.mark.unit
+def test_controle_admissao_fila_cheia_rejeita_com_503():
+    controle = _novo_controle(timeout_fila_segundos=1.0)
+
+    async def _cenario():
+        liberar = asyncio.Event()
+
+        async def _ocupar():
+            async with controle.reservar():
+                await liberar.wait()
+
+        ocupante = asyncio.create_task(_ocupar())
+        await asyncio.sleep(0)
+        na_fila = asyncio.create_task(_ocupar())
+        await asyncio.sleep(0)
+
+        with pytest.raises(HashSobrecarregado) as exc_info:
+            async with controle.reservar():
+                pass
+
+        assert controle.profundidade_fila == 1
+        liberar.set()
+        await asyncio.gather(ocupante, na_fila)
+        return exc_info.value
+
+    erro = asyncio.run(_cenario())
+
+    assert erro.status_code == 503
+    assert erro.headers["Retry-After"] == "3"
+    assert controle.em_execucao == 0
+    assert controle.profundidade_fila == 0
+    assert controle.metricas.rejeitadas.valor == 1
+
+
+@pytest.mark.unit
+def test_controle_admissao_prazo_esgotado_rejeita_e_libera_fila():
+    controle = _novo_controle()
+
+    async def _cenario():
+        async with controle.reservar():
+            with pytest.raises(HashSobrecarregado):
+                async with controle.reservar():
+                    pass
+            assert controle.profundidade_fila == 0
+
+    asyncio.run(_cenario())
+
+    assert controle.em_execucao == 0
+    assert controle.metricas.espera.contagem == 2
+
+
+@pytest.mark.unit
+def test_metricas_renderizadas_no_formato_prometheus():
+    histograma = Histograma("teste_latencia_segundos", "Latência.", limites=(0.1, 1.0))
+    histograma.observar(0.05)
+    histograma.observar(0.5)
+
+    texto = renderizar_prometheus()
+
+    assert "# TYPE teste_latencia_segundos histogram" in texto
+    assert 'teste_latencia_segundos_bucket{le="0.1"} 1' in texto
+    assert 'teste_latencia_segundos_bucket{le="+Inf"} 2' in texto
+    assert "teste_latencia_segundos_count 2" in texto
+
+
+@pytest.mark.unit
+def test_verificar_token_usa_cache_na_segunda_chamada():
+    token_jwt = criar_token_acesso(dados={"sub": "cache@frotanext.com"})
+    acertos_antes = cache_tokens.acertos.valor
+    falhas_antes = cache_tokens.falhas.valor
+
+    primeiro = verificar_token(token_jwt)
+    segundo = verificar_token(token_jwt)
+
+    assert primeiro == segundo
+    assert cache_tokens.falhas.valor == falhas_antes + 1
+    assert cache_tokens.acertos.valor == acertos_antes + 1
+
+    segundo["sub"] = "alterado"
+    assert verificar_token(token_jwt)["sub"] == "cache@frotanext.com"
+
+
+@pytest.mark.unit
+def test_cache_ttl_respeita_expiracao_e_limite_de_itens():
+    cache = CacheTTL(max_itens=2, ttl_segundos=300, prefixo_metricas="teste_cache")
+
+    cache.guardar("a", 1, expira_em=110, agora=100)
+    cache.guardar("b", 2, agora=100)
+    assert cache.obter("a", agora=105) == 1
+    assert cache.obter("a", agora=111) is None
+
+    cache.guardar("c", 3, agora=100)
+    cache.guardar("d", 4, agora=100)
+    assert len(cache) == 2
+    assert cache.obter("b", agora=101) is None
+    assert cache.obter("d", agora=101) == 4
+
+
+def _gravar_chave_ec(diretorio, kid: str) -> None:
+    chave = ec.generate_private_key(ec.SECP256R1())
+    (diretorio / f"{kid}.pem").write_bytes(
+        chave.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+
+@pytest.fixture
+def seguranca_es256(tmp_path, monkeypatch):
+    _gravar_chave_ec(tmp_path, "2026-01")
+    conjunto = ConjuntoChaves(diretorio=str(tmp_path), algoritmo="ES256")
+    monkeypatch.setattr(seguranca, "ALGORITHM", "ES256")
+    monkeypatch.setattr(seguranca, "conjunto_chaves", conjunto)
+    cache_tokens.limpar()
+    yield conjunto
+    cache_tokens.limpar()
+
+
+@pytest.mark.unit
+def test_token_es256_leva_kid_e_valida_com_chave_publica(seguranca_es256):
+    token_jwt = criar_token_acesso(dados={"sub": "42"})
+
+    assert jwt.get_unverified_header(token_jwt)["kid"] == "2026-01"
+    assert verificar_token(token_jwt)["sub"] == "42"
+
+    jwks = seguranca.obter_jwks()
+    assert [chave["kid"] for chave in jwks["keys"]] == ["2026-01"]
+    assert "d" not in jwks["keys"][0]
+    assert jwt.decode(token_jwt, jwks["keys"][0], algorithms=["ES256"])["sub"] == "42"
+
+
+@pytest.mark.unit
+def test_rotacao_de_chaves_mantem_tokens_antigos_validos(seguranca_es256):
+    token_antigo = criar_token_acesso(dados={"sub": "antigo"})
+
+    _gravar_chave_ec(seguranca_es256.diretorio, "2026-02")
+    assert seguranca_es256.recarregar_se_alterado() is True
+    token_novo = criar_token_acesso(dados={"sub": "novo"})
+
+    assert jwt.get_unverified_header(token_novo)["kid"] == "2026-02"
+    assert verificar_token(token_antigo)["sub"] == "antigo"
+    assert verificar_token(token_novo)["sub"] == "novo"
+
+    (seguranca_es256.diretorio / "2026-01.pem").unlink()
+    seguranca_es256.recarregar_se_alterado()
+    cache_tokens.limpar()
+    assert verificar_token(token_antigo) is None
+
+
+@pytest.mark.unit
+def test_token_hs256_rejeitado_quando_servico_usa_es256(seguranca_es256):
+    token_hs = jwt.encode({"sub": "42"}, "segredo-qualquer", algorithm="HS256")
+
+    assert verificar_token(token_hs) is None
+
+
+@pytest.mark.unit
+def test_registro_revogacao_confirma_no_dicionario_e_compacta_expirados():
+    registro = RegistroRevogacao(num_bits=64, num_hashes=2)
+    registro.revogar("jti-antigo", expira_em=100)
+    registro.mesclar([("jti-novo", 200), ("jti-antigo", 100)])
+
+    assert registro.esta_revogado("jti-antigo") is True
+    assert registro.esta_revogado("jti-novo") is True
+    assert registro.esta_revogado(None) is False
+    assert not any(registro.esta_revogado(f"outro-{i}") for i in range(50))
+    assert registro.falsos_positivos.valor >= 0
+
+    assert registro.compactar(agora=150) == 1
+    assert len(registro) == 1
+    assert registro.esta_revogado("jti-antigo") is False
+    assert registro.esta_revogado("jti-novo") is True
+
+
+@pytest.mark.unit
+def test_verificar_token_recusa_jti_revogado_mesmo_em_cache():
+    token_jwt = criar_token_acesso(dados={"sub": "revogado@frotanext.com"})
+    payload = verificar_token(token_jwt)
+    assert payload["jti"]
+
+    registro_revogacao.revogar(payload["jti"], expira_em=payload["exp"])
+    try:
+        assert verificar_token(token_jwt) is None
+        assert verificar_token(criar_token_acesso(dados={"sub": "outro"})) is not None
+    finally:
+        registro_revogacao.limpar()